@@ -0,0 +1,80 @@
+"""
+Benchmark: storage and memory of stored orders, v1 layout vs the compact v2
+layout (backend/services/order_schema.py).
+
+storage: BSON size of each stored document (what the collection, the
+         WiredTiger cache and every cursor batch carry)
+memory:  Python heap held by the decoded documents, as a driver read
+         returns them, before any reconstruction
+decode:  reading the raw BSON back into order dicts; for v2 this includes
+         unpack_order() restoring the v1 shape
+
+Usage:
+    python -m backend.benchmark_order_schema [--orders 1000] [--repeat 20]
+"""
+
+from typing import List
+import argparse
+import gc
+import time
+import tracemalloc
+
+import bson
+
+from backend.benchmark_serialization import sample_orders
+from backend.models import OrderResponse
+from backend.services.order_schema import pack_order, unpack_order
+from backend.services.serialization import encode_json, project
+
+
+def held_bytes(raw: List[bytes]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    docs = [bson.decode(data) for data in raw]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del docs
+    return size
+
+
+def measure(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return sorted(timings)[len(timings) // 2] * 1000
+
+
+def main(count: int, repeat: int):
+    v1 = sample_orders(count)
+    names = sorted({item["item_name"] for doc in v1 for item in doc["cart_items"]})
+    codes = {name: code for code, name in enumerate(names, 1)}
+    by_code = {code: name for name, code in codes.items()}
+    v2 = [pack_order(doc, codes) for doc in v1]
+
+    raw_v1 = [bson.encode(doc) for doc in v1]
+    raw_v2 = [bson.encode(doc) for doc in v2]
+    assert encode_json(project(OrderResponse, [unpack_order(bson.decode(data), by_code) for data in raw_v2])) == \
+        encode_json(project(OrderResponse, [bson.decode(data) for data in raw_v1])), "responses differ"
+
+    bson_v1, bson_v2 = sum(map(len, raw_v1)), sum(map(len, raw_v2))
+    ram_v1, ram_v2 = held_bytes(raw_v1), held_bytes(raw_v2)
+    read_v1 = measure(lambda: [bson.decode(data) for data in raw_v1], repeat)
+    read_v2 = measure(lambda: [unpack_order(bson.decode(data), by_code) for data in raw_v2], repeat)
+
+    print(f"{count} orders, decode times median of {repeat} runs")
+    print(f"  BSON per order:    v1 {bson_v1 / count:7.0f} B   v2 {bson_v2 / count:7.0f} B   "
+          f"saved {1 - bson_v2 / bson_v1:.0%}")
+    print(f"  BSON total:        v1 {bson_v1 / 1024:7.1f} KB  v2 {bson_v2 / 1024:7.1f} KB")
+    print(f"  decoded heap:      v1 {ram_v1 / 1024:7.1f} KB  v2 {ram_v2 / 1024:7.1f} KB  "
+          f"saved {1 - ram_v2 / ram_v1:.0%}")
+    print(f"  read (to v1 dict): v1 {read_v1:7.2f} ms  v2 {read_v2:7.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    main(args.orders, args.repeat)
@@ -0,0 +1,101 @@
+"""
+Benchmark: encoding a 1000-order list response, before and after the fast
+response layer (backend/services/serialization.py).
+
+before: OrderResponse(**doc) per document, then FastAPI's response_model
+        validation + serialization and JSONResponse's json.dumps
+after:  project(OrderResponse, docs), FastJSONResponse (orjson)
+
+Usage:
+    python -m backend.benchmark_serialization [--orders 1000] [--repeat 20]
+"""
+
+from datetime import datetime, timedelta
+from typing import List
+import argparse
+import asyncio
+import time
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from backend.models import OrderResponse
+from backend.services.serialization import FastJSONResponse, project
+
+
+def sample_orders(count: int) -> List[dict]:
+    start = datetime(2024, 1, 1, 12)
+    return [
+        {
+            "_id": f"oid{n}",
+            "id": f"3f1c2a9e-0000-4000-8000-{n:012d}",
+            "order_number": f"ORD-20240101-{n:06d}",
+            "customer_name": f"Customer {n}",
+            "phone": "9123456789",
+            "address": "SRM University, Potheri, Chennai",
+            "landmark": "Near main gate",
+            "items": "2x Masala Dosa, 1x Filter Coffee, 1x Chicken Biryani",
+            "cart_items": [
+                {"item_name": "Masala Dosa", "quantity": 2, "price": 60.0, "subtotal": 120.0},
+                {"item_name": "Filter Coffee", "quantity": 1, "price": 30.0, "subtotal": 30.0},
+                {"item_name": "Chicken Biryani", "quantity": 1, "price": 180.0, "subtotal": 180.0},
+            ],
+            "notes": None,
+            "order_type": "delivery",
+            "delivery_area": "SRM",
+            "delivery_charge": 0.0,
+            "subtotal": 330.0,
+            "total": 330.0,
+            "status": "delivered",
+            "payment_method": "cod",
+            "payment_status": "paid",
+            "estimated_time": "20-35 minutes",
+            "estimated_delivery_time": "45-60 minutes",
+            "status_times": {"pending": start, "delivered": start + timedelta(minutes=50)},
+            "created_at": start + timedelta(seconds=n),
+            "updated_at": start + timedelta(seconds=n, minutes=50),
+        }
+        for n in range(count)
+    ]
+
+
+async def before(docs: List[dict], field) -> bytes:
+    models = [OrderResponse(**{k: v for k, v in doc.items() if k != "_id"}) for doc in docs]
+    content = await serialize_response(field=field, response_content=models)
+    return JSONResponse(content).body
+
+
+async def after(docs: List[dict], field) -> bytes:
+    return FastJSONResponse(project(OrderResponse, docs)).body
+
+
+async def measure(fn, docs: List[dict], field, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await fn(docs, field)
+        timings.append(time.perf_counter() - started)
+    return sorted(timings)[len(timings) // 2] * 1000
+
+
+async def main(count: int, repeat: int):
+    docs = sample_orders(count)
+    field = create_response_field(name="response", type_=List[OrderResponse])
+
+    assert await before(docs, field) == await after(docs, field), "outputs differ"
+
+    slow = await measure(before, docs, field, repeat)
+    fast = await measure(after, docs, field, repeat)
+    print(f"{count} orders, median of {repeat} runs")
+    print(f"  before (validate + jsonable_encoder + json): {slow:8.2f} ms")
+    print(f"  after  (field projection + orjson):         {fast:8.2f} ms")
+    print(f"  speedup: {slow / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.orders, args.repeat))
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List
 from datetime import datetime
 from enum import Enum
@@ -47,6 +47,8 @@ class OrderCreate(BaseModel):
 
 
 class OrderResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: str
     order_number: str
     customer_name: str
@@ -69,9 +71,6 @@ class OrderResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
-
 
 class OrderStatusUpdate(BaseModel):
     status: OrderStatus
@@ -87,6 +86,8 @@ class MenuItemCreate(BaseModel):
 
 
 class MenuItemResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: str
     category: str
     name: str
@@ -95,12 +96,28 @@ class MenuItemResponse(BaseModel):
     image: Optional[str] = None
     available: bool
 
-    class Config:
-        from_attributes = True
-
 
 class MenuItemUpdate(BaseModel):
     price: Optional[float] = None
     description: Optional[str] = None
     image: Optional[str] = None
     available: Optional[bool] = None
+
+
+class OrderBatchCreate(BaseModel):
+    # Raw dicts so one malformed order fails alone instead of the whole batch
+    orders: List[dict] = Field(..., min_length=1)
+
+
+class OrderBatchResult(BaseModel):
+    index: int
+    status: str  # created, error
+    id: Optional[str] = None
+    order_number: Optional[str] = None
+    errors: List[str] = []
+
+
+class OrderBatchResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[OrderBatchResult]
@@ -1,10 +1,51 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Header, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
-from backend.routes.auth import get_current_admin
+from backend.routes.auth import STREAM_TICKET_TTL_SECONDS, get_current_admin, get_stream_admin, issue_stream_ticket
+from backend.routes.orders import set_order_status
+from backend.services.admission import admission
+from backend.services.analytics import (
+    ITEM_SORTS,
+    analytics_refresh,
+    category_sales,
+    hour_of_week_heatmap,
+    item_sales,
+)
+from backend.services.archival import ARCHIVE_COLLECTION, archival_job, expand_order
+from backend.services.eta import eta_model
+from backend.services.events import sse_stream
+from backend.services.idempotency import idempotency
+from backend.services.kitchen_queue import kitchen_queue
+from backend.services.menu_cache import menu_cache
+from backend.services.order_events import order_feed
+from backend.services.order_export import (
+    EXPORT_BATCH_SIZE,
+    EXPORT_FORMATS,
+    export_chunks,
+    gzip_chunks,
+    parse_bound,
+    parse_fields,
+)
+from backend.services.order_journal import order_journal
+from backend.services.order_schema import decode_order, decode_orders, order_schema_migration, stored_projection
+from backend.services.order_numbers import order_numbers
+from backend.services.pagination import fetch_changes, fetch_page
+from backend.services.password_pool import password_pool
+from backend.services.sales_rollups import ROLLUP_COLLECTION, sales_rollups
+from backend.services.snapshots import accepts_gzip, snapshot_store
+from backend.services.ttl_cache import TTLCache
+import asyncio
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
+ADMIN_ORDERS_PAGE_SIZE = int(os.getenv('ADMIN_ORDERS_PAGE_SIZE', '100'))
+ADMIN_ORDERS_MAX_PAGE_SIZE = int(os.getenv('ADMIN_ORDERS_MAX_PAGE_SIZE', '500'))
+DASHBOARD_CACHE_TTL_SECONDS = float(os.getenv('DASHBOARD_CACHE_TTL_SECONDS', '5'))
+
+dashboard_cache = TTLCache(ttl_seconds=DASHBOARD_CACHE_TTL_SECONDS)
+
 router = APIRouter(prefix="/admin", tags=["admin"])
 
 # Database dependency will be injected
@@ -13,6 +54,8 @@ _db = None
 def set_database(database):
     global _db
     _db = database
+    dashboard_cache.clear()
+    sales_rollups.set_database(database)
 
 def get_db():
     return _db
@@ -31,40 +74,46 @@ class AdminOrderUpdate(BaseModel):
     status: str  # pending, preparing, ready, completed, cancelled
     notes: Optional[str] = None
 
+# Every dashboard figure from the sales rollups (a few rows per hour of trading)
+DASHBOARD_ROLLUP_PIPELINE = [
+    {"$group": {
+        "_id": None,
+        "total_orders": {"$sum": "$orders"},
+        "pending_orders": {"$sum": {"$cond": [{"$eq": ["$status", "pending"]}, "$orders", 0]}},
+        "completed_orders": {"$sum": {"$cond": [{"$eq": ["$status", "completed"]}, "$orders", 0]}},
+        "total_revenue": {"$sum": {"$cond": [{"$eq": ["$status", "completed"]}, "$revenue", 0]}},
+    }}
+]
+
+
+async def load_dashboard() -> AdminDashboard:
+    db = get_db()
+    # Include this worker's not yet flushed changes
+    await sales_rollups.flush()
+    order_stats, menu_items_count = await asyncio.gather(
+        db[ROLLUP_COLLECTION].aggregate(DASHBOARD_ROLLUP_PIPELINE).to_list(1),
+        db.menu.count_documents({})
+    )
+    stats = order_stats[0] if order_stats else {}
+    return AdminDashboard(
+        total_orders=stats.get("total_orders", 0),
+        pending_orders=stats.get("pending_orders", 0),
+        completed_orders=stats.get("completed_orders", 0),
+        total_revenue=stats.get("total_revenue", 0),
+        menu_items_count=menu_items_count
+    )
+
+
 # Admin Routes - ALL require authentication
 @router.get("/dashboard", response_model=AdminDashboard, description="Get dashboard statistics (Admin only)")
 async def get_dashboard(current_admin: dict = Depends(get_current_admin)):
-    """Get admin dashboard with statistics"""
+    """Get admin dashboard with statistics (shared across admins for a few seconds)"""
     try:
-        db = get_db()
-        
-        # Get order statistics
-        orders_collection = db.orders
-        total_orders = await orders_collection.count_documents({})
-        pending_orders = await orders_collection.count_documents({"status": "pending"})
-        completed_orders = await orders_collection.count_documents({"status": "completed"})
-        
-        # Calculate total revenue
-        pipeline = [
-            {"$match": {"status": "completed"}},
-            {"$group": {"_id": None, "total": {"$sum": "$total_amount"}}}
-        ]
-        revenue_result = await orders_collection.aggregate(pipeline).to_list(1)
-        total_revenue = revenue_result[0]['total'] if revenue_result else 0
-        
-        # Get menu items count
-        menu_collection = db.menu
-        menu_items_count = await menu_collection.count_documents({})
+        dashboard = await dashboard_cache.get_or_load("dashboard", load_dashboard)
         
         logger.info(f"Admin dashboard accessed by {current_admin['username']}")
         
-        return AdminDashboard(
-            total_orders=total_orders,
-            pending_orders=pending_orders,
-            completed_orders=completed_orders,
-            total_revenue=total_revenue,
-            menu_items_count=menu_items_count
-        )
+        return dashboard
     except Exception as e:
         logger.error(f"Error fetching admin dashboard: {str(e)}")
         raise HTTPException(
@@ -72,12 +121,167 @@ async def get_dashboard(current_admin: dict = Depends(get_current_admin)):
             detail=f"Error fetching dashboard: {str(e)}"
         )
 
-@router.get("/orders", description="Get all orders (Admin only)")
+def _day_bounds(date_from: Optional[str], date_to: Optional[str]):
+    start, end = parse_bound(date_from, "from"), parse_bound(date_to, "to")
+    return (start.strftime("%Y-%m-%d") if start else None, end.strftime("%Y-%m-%d") if end else None)
+
+@router.get("/sales", description="Daily or hourly sales from the rollups (Admin only)")
+async def get_sales(
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
+    group_by: str = "day",
+    current_admin: dict = Depends(get_current_admin)
+):
+    """
+    Sales per UTC day (or hour) for days in [from, to], oldest first.
+
+    `from` and `to` are YYYY-MM-DD. Revenue counts completed orders; paid
+    figures count orders paid online, whatever their status.
+    """
+    if group_by not in ("day", "hour"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid group_by. Must be one of: day, hour"
+        )
+    start, end = _day_bounds(date_from, date_to)
+    try:
+        db = get_db()
+        await sales_rollups.flush()
+        
+        query = {}
+        if start or end:
+            query["day"] = {}
+            if start:
+                query["day"]["$gte"] = start
+            if end:
+                query["day"]["$lte"] = end
+        group_id = {"day": "$day", "hour": "$hour"} if group_by == "hour" else {"day": "$day"}
+        
+        rows = await db[ROLLUP_COLLECTION].aggregate([
+            {"$match": query},
+            {"$group": {
+                "_id": group_id,
+                "orders": {"$sum": "$orders"},
+                "completed_orders": {"$sum": {"$cond": [{"$eq": ["$status", "completed"]}, "$orders", 0]}},
+                "cancelled_orders": {"$sum": {"$cond": [{"$eq": ["$status", "cancelled"]}, "$orders", 0]}},
+                "revenue": {"$sum": {"$cond": [{"$eq": ["$status", "completed"]}, "$revenue", 0]}},
+                "paid_orders": {"$sum": "$paid_orders"},
+                "paid_revenue": {"$sum": "$paid_revenue"},
+            }},
+        ]).to_list(None)
+        
+        sales = [{**row.pop("_id"), **row} for row in rows]
+        sales.sort(key=lambda row: (row["day"], row.get("hour", 0)))
+        
+        logger.info(f"Admin {current_admin['username']} accessed {group_by} sales")
+        
+        return sales
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching sales: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching sales: {str(e)}"
+        )
+
+@router.get("/analytics/items", description="Top-selling items from the item sales view (Admin only)")
+async def get_item_analytics(
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
+    sort: str = "quantity",
+    limit: int = Query(20, ge=1, le=500),
+    current_admin: dict = Depends(get_current_admin)
+):
+    """Items sold on days in [from, to], best first by quantity, revenue or orders"""
+    if sort not in ITEM_SORTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid sort. Must be one of: {', '.join(ITEM_SORTS)}"
+        )
+    start, end = _day_bounds(date_from, date_to)
+    try:
+        items = await item_sales(get_db(), start, end)
+        items.sort(key=lambda item: (-item[sort], item["item_name"]))
+        
+        logger.info(f"Admin {current_admin['username']} accessed item analytics")
+        
+        return items[:limit]
+    except Exception as e:
+        logger.error(f"Error fetching item analytics: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching item analytics: {str(e)}"
+        )
+
+@router.get("/analytics/categories", description="Sales by menu category from the item sales view (Admin only)")
+async def get_category_analytics(
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
+    current_admin: dict = Depends(get_current_admin)
+):
+    """Categories by revenue for days in [from, to]"""
+    start, end = _day_bounds(date_from, date_to)
+    try:
+        categories = category_sales(await item_sales(get_db(), start, end))
+        
+        logger.info(f"Admin {current_admin['username']} accessed category analytics")
+        
+        return categories
+    except Exception as e:
+        logger.error(f"Error fetching category analytics: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching category analytics: {str(e)}"
+        )
+
+@router.get("/analytics/heatmap", description="Orders by weekday and hour (Admin only)")
+async def get_heatmap(
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
+    current_admin: dict = Depends(get_current_admin)
+):
+    """Hour-of-week heatmap (UTC) for days in [from, to], from the sales rollups"""
+    start, end = _day_bounds(date_from, date_to)
+    try:
+        await sales_rollups.flush()
+        heatmap = await hour_of_week_heatmap(get_db(), start, end)
+        
+        logger.info(f"Admin {current_admin['username']} accessed the order heatmap")
+        
+        return heatmap
+    except Exception as e:
+        logger.error(f"Error fetching heatmap: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching heatmap: {str(e)}"
+        )
+
+@router.post("/analytics/refresh", description="Refresh the item sales view now (Admin only)")
+async def refresh_analytics(current_admin: dict = Depends(get_current_admin)):
+    """Recompute item sales for days changed since the last refresh"""
+    try:
+        summary = await analytics_refresh.run(get_db())
+        
+        logger.info(f"Admin {current_admin['username']} refreshed item analytics")
+        
+        return summary
+    except Exception as e:
+        logger.error(f"Error refreshing analytics: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error refreshing analytics: {str(e)}"
+        )
+
+@router.get("/orders", description="Get orders newest first, one page at a time (Admin only)")
 async def get_all_orders(
+    response: Response,
     status_filter: Optional[str] = None,
+    limit: int = Query(ADMIN_ORDERS_PAGE_SIZE, ge=1, le=ADMIN_ORDERS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     current_admin: dict = Depends(get_current_admin)
 ):
-    """Get all orders with optional status filter"""
+    """Get one page of orders with optional status filter; X-Next-Cursor points at the next page"""
     try:
         db = get_db()
         orders_collection = db.orders
@@ -86,14 +290,16 @@ async def get_all_orders(
         if status_filter:
             query["status"] = status_filter
         
-        orders = await orders_collection.find(query).sort("created_at", -1).to_list(1000)
-        
-        for order in orders:
-            order.pop("_id", None)
+        orders, next_cursor = await fetch_page(orders_collection, query, cursor, limit, {"_id": 0})
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        orders = await decode_orders(db, orders)
         
         logger.info(f"Admin {current_admin['username']} accessed all orders")
         
         return orders
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching admin orders: {str(e)}")
         raise HTTPException(
@@ -101,6 +307,131 @@ async def get_all_orders(
             detail=f"Error fetching orders: {str(e)}"
         )
 
+@router.get("/orders/export", description="Stream orders as NDJSON or CSV (Admin only)")
+async def export_orders(
+    export_format: str = Query("ndjson", alias="format"),
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
+    fields: Optional[str] = None,
+    status_filter: Optional[str] = None,
+    accept_encoding: Optional[str] = Header(None),
+    current_admin: dict = Depends(get_current_admin)
+):
+    """
+    Export orders created in [from, to), archived orders first, each part
+    oldest first.
+
+    `fields` is a comma-separated column list. Rows are streamed from the
+    database cursor, gzip-compressed when the client accepts it.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid format. Must be one of: {', '.join(EXPORT_FORMATS)}"
+        )
+    columns = parse_fields(fields)
+    start, end = parse_bound(date_from, "from"), parse_bound(date_to, "to")
+    
+    query = {}
+    if start or end:
+        query["created_at"] = {}
+        if start:
+            query["created_at"]["$gte"] = start
+        if end:
+            query["created_at"]["$lt"] = end
+    if status_filter:
+        query["status"] = status_filter
+    
+    projection = {field: 1 for field in columns}
+    projection["_id"] = 0
+    
+    async def archived_then_hot():
+        # Archived orders are older, so this stays close to date order
+        db = get_db()
+        archived = db[ARCHIVE_COLLECTION].find(query, projection) \
+            .sort("created_at", 1) \
+            .batch_size(EXPORT_BATCH_SIZE)
+        async for order in archived:
+            yield expand_order(order)
+        hot = db.orders.find(query, stored_projection(projection)) \
+            .sort([("created_at", 1), ("id", 1)]) \
+            .batch_size(EXPORT_BATCH_SIZE)
+        async for order in hot:
+            yield await decode_order(db, order)
+    
+    body = export_chunks(archived_then_hot(), export_format, columns)
+    span = f"{start.strftime('%Y%m%d') if start else 'all'}-{end.strftime('%Y%m%d') if end else 'now'}"
+    headers = {
+        "Content-Disposition": f'attachment; filename="orders-{span}.{export_format}"',
+        "Vary": "Accept-Encoding"
+    }
+    if accepts_gzip(accept_encoding):
+        body = gzip_chunks(body)
+        headers["Content-Encoding"] = "gzip"
+    
+    logger.info(f"Admin {current_admin['username']} exported orders as {export_format}")
+    
+    return StreamingResponse(body, media_type=EXPORT_FORMATS[export_format], headers=headers)
+
+@router.get("/orders/changes", description="Orders changed since a sync token (Admin only)")
+async def get_order_changes(
+    since: Optional[str] = None,
+    limit: int = Query(ADMIN_ORDERS_PAGE_SIZE, ge=1, le=ADMIN_ORDERS_MAX_PAGE_SIZE),
+    current_admin: dict = Depends(get_current_admin)
+):
+    """
+    Catch-up call for a reconnecting panel.
+
+    Call without `since` right after loading the order list to get a token,
+    then pass the latest token to receive only orders updated after it.
+    Repeat while `has_more` is true.
+    """
+    try:
+        db = get_db()
+        orders, token, has_more = await fetch_changes(db.orders, since, limit, {"_id": 0})
+        orders = await decode_orders(db, orders)
+        
+        logger.info(f"Admin {current_admin['username']} synced {len(orders)} changed orders")
+        
+        return {"orders": orders, "token": token, "has_more": has_more}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching order changes: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching order changes: {str(e)}"
+        )
+
+@router.post("/orders/stream-ticket", description="Single-use ticket for opening the order stream (Admin only)")
+async def create_stream_ticket(current_admin: dict = Depends(get_current_admin)):
+    """Exchange the bearer token for a short-lived ticket to pass as ?ticket= to /orders/stream"""
+    try:
+        ticket = await issue_stream_ticket(current_admin['username'])
+        return {"ticket": ticket, "expires_in": STREAM_TICKET_TTL_SECONDS}
+    except Exception as e:
+        logger.error(f"Error issuing stream ticket: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error issuing stream ticket: {str(e)}"
+        )
+
+@router.get("/orders/stream", description="Live order events over Server-Sent Events (Admin only)")
+async def stream_orders(request: Request, current_admin: dict = Depends(get_stream_admin)):
+    """
+    Push order_created and order_status_changed events as they happen.
+
+    Clients that fall behind get a `resync` event and should refetch
+    /api/admin/orders.
+    """
+    subscription = order_feed.subscribe()
+    logger.info(f"Admin {current_admin['username']} subscribed to the order feed")
+    return StreamingResponse(
+        sse_stream(subscription, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.put("/orders/{order_id}/status", description="Update order status (Admin only)")
 async def update_order_status(
     order_id: str,
@@ -109,9 +440,6 @@ async def update_order_status(
 ):
     """Update order status - Admin only"""
     try:
-        db = get_db()
-        orders_collection = db.orders
-        
         # Validate status
         valid_statuses = ["pending", "preparing", "ready", "completed", "cancelled"]
         if update.status not in valid_statuses:
@@ -121,12 +449,9 @@ async def update_order_status(
             )
         
         # Update order
-        result = await orders_collection.update_one(
-            {"order_id": order_id},
-            {"$set": {"status": update.status, "admin_notes": update.notes}}
-        )
+        updated = await set_order_status(order_id, update.status, {"admin_notes": update.notes})
         
-        if result.matched_count == 0:
+        if updated is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Order {order_id} not found"
@@ -187,3 +512,24 @@ async def admin_health_check(current_admin: dict = Depends(get_current_admin)):
         "admin": current_admin['username'],
         "message": "Admin API is operational"
     }
+
+@router.get("/metrics", description="In-process cache and worker metrics (Admin only)")
+async def get_metrics(current_admin: dict = Depends(get_current_admin)):
+    """Runtime metrics for the in-process performance layers"""
+    return {
+        "menu_cache": menu_cache.stats(),
+        "response_snapshots": snapshot_store.stats(),
+        "dashboard_cache": dashboard_cache.stats(),
+        "password_pool": password_pool.stats(),
+        "idempotency": idempotency.stats(),
+        "order_feed": order_feed.stats(),
+        "order_numbers": order_numbers.stats(),
+        "order_journal": order_journal.stats(),
+        "archival": archival_job.stats(),
+        "sales_rollups": sales_rollups.stats(),
+        "analytics_refresh": analytics_refresh.stats(),
+        "kitchen_queue": kitchen_queue.stats(),
+        "eta": eta_model.stats(),
+        "admission": admission.stats(),
+        "order_schema": order_schema_migration.stats()
+    }
@@ -1,11 +1,14 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Header
+from fastapi import APIRouter, HTTPException, status, Depends, Header, Query
 from pydantic import BaseModel
+import hashlib
 import jwt
 import os
+import secrets
 from datetime import datetime, timedelta, timezone
 import logging
 from typing import Optional
 import bcrypt
+from backend.services.password_pool import password_pool
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +18,8 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 JWT_SECRET = os.getenv('JWT_SECRET', 'change-this-in-production-secret-key-minimum-32-chars')
 ALGORITHM = "HS256"
 TOKEN_EXPIRE_HOURS = 1
+STREAM_TICKET_TTL_SECONDS = int(os.getenv('STREAM_TICKET_TTL_SECONDS', '30'))
+STREAM_TICKETS_COLLECTION = "stream_tickets"
 
 # Database dependency will be injected
 _db = None
@@ -56,6 +61,15 @@ def verify_password(password: str, password_hash: str) -> bool:
     """Verify a password against a bcrypt hash"""
     return bcrypt.checkpw(password.encode(), password_hash.encode())
 
+# bcrypt blocks for ~250 ms; handlers must use these instead of the above
+async def hash_password_async(password: str) -> str:
+    """Hash a password on the bounded password worker pool"""
+    return await password_pool.run(hash_password, password)
+
+async def verify_password_async(password: str, password_hash: str) -> bool:
+    """Verify a password on the bounded password worker pool"""
+    return await password_pool.run(verify_password, password, password_hash)
+
 # JWT Token Functions
 def create_access_token(username: str) -> str:
     """Create a JWT access token"""
@@ -127,6 +141,46 @@ async def get_current_admin(authorization: Optional[str] = Header(None)) -> dict
     """Dependency to verify admin authentication"""
     return verify_token(authorization)
 
+# Stream tickets: EventSource cannot send headers, and a JWT in the query
+# string ends up in access logs and browser history. A ticket is random,
+# single-use and expires within seconds; only its hash is stored, and it
+# lives in MongoDB so any worker can redeem it.
+def _ticket_digest(ticket: str) -> str:
+    return hashlib.sha256(ticket.encode()).hexdigest()
+
+async def issue_stream_ticket(username: str) -> str:
+    """Create a single-use ticket that opens one event stream for `username`"""
+    ticket = secrets.token_urlsafe(32)
+    await _db[STREAM_TICKETS_COLLECTION].insert_one({
+        "_id": _ticket_digest(ticket),
+        "username": username,
+        "expires_at": datetime.utcnow() + timedelta(seconds=STREAM_TICKET_TTL_SECONDS)
+    })
+    return ticket
+
+async def redeem_stream_ticket(ticket: str) -> Optional[str]:
+    """Consume a ticket; the username it was issued to, None if unknown, used or expired"""
+    record = await _db[STREAM_TICKETS_COLLECTION].find_one_and_delete({
+        "_id": _ticket_digest(ticket),
+        "expires_at": {"$gt": datetime.utcnow()}
+    })
+    return record["username"] if record else None
+
+async def get_stream_admin(
+    authorization: Optional[str] = Header(None),
+    ticket: Optional[str] = Query(None)
+) -> dict:
+    """Like get_current_admin, but also accepts a single-use ?ticket= since EventSource cannot send headers"""
+    if authorization or not ticket:
+        return verify_token(authorization)
+    username = await redeem_stream_ticket(ticket)
+    if username is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired stream ticket"
+        )
+    return {"username": username}
+
 # Routes
 @router.post("/login", response_model=LoginResponse)
 async def login(request: LoginRequest):
@@ -146,7 +200,7 @@ async def login(request: LoginRequest):
             )
         
         # Verify password using bcrypt
-        if not verify_password(request.password, admin['password_hash']):
+        if not await verify_password_async(request.password, admin['password_hash']):
             logger.warning(f"Login attempt with invalid password for user: {request.username}")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -207,7 +261,7 @@ async def change_password(
             )
         
         # Verify old password
-        if not verify_password(request.old_password, admin['password_hash']):
+        if not await verify_password_async(request.old_password, admin['password_hash']):
             logger.warning(f"Failed password change attempt for user: {current_admin['username']}")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -215,7 +269,7 @@ async def change_password(
             )
         
         # Hash new password
-        new_password_hash = hash_password(request.new_password)
+        new_password_hash = await hash_password_async(request.new_password)
         
         # Update password in database
         result = await admins_collection.update_one(
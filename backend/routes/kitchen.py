@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends, Header, Request
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from backend.routes.auth import get_current_admin, get_stream_admin
+from backend.services.events import sse_stream
+from backend.services.kitchen_queue import kitchen_queue
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/kitchen", tags=["kitchen"])
+
+
+def set_database(database):
+    kitchen_queue.set_database(database)
+
+
+@router.get("/queue", description="Active orders for the kitchen display, oldest first (Admin only)")
+async def get_kitchen_queue(
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+    current_admin: dict = Depends(get_current_admin)
+):
+    """Served from the in-memory queue; send If-None-Match to get 304 while nothing changed"""
+    await kitchen_queue.ensure_loaded()
+    return kitchen_queue.response(if_none_match, accept_encoding)
+
+
+@router.get("/stream", description="Kitchen queue changes over Server-Sent Events (Admin only)")
+async def stream_kitchen_queue(request: Request, current_admin: dict = Depends(get_stream_admin)):
+    """
+    Push order_added, order_updated and order_removed events.
+
+    On `resync`, refetch /api/kitchen/queue.
+    """
+    subscription = kitchen_queue.feed.subscribe()
+    logger.info(f"Admin {current_admin['username']} subscribed to the kitchen feed")
+    return StreamingResponse(
+        sse_stream(subscription, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
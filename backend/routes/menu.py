@@ -1,6 +1,11 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List
+from fastapi import APIRouter, HTTPException, status, Header
+from pymongo import ReturnDocument
+from typing import List, Optional
 from backend.models import MenuItemCreate, MenuItemResponse, MenuItemUpdate
+from backend.services.menu_cache import menu_cache
+from backend.services.content_versions import content_versions
+from backend.services.serialization import FastJSONResponse, construct, project
+from backend.services.snapshots import snapshot_response
 from datetime import datetime
 import uuid
 
@@ -12,30 +17,71 @@ _db = None
 def set_database(database):
     global _db
     _db = database
+    menu_changed()
 
 def get_db():
     return _db
 
+def menu_changed():
+    """Invalidate cached menu reads after any write to the menu collection"""
+    menu_cache.invalidate()
+    content_versions.bump("menu")
+
+
+async def load_menu_items(category: Optional[str], available_only: bool) -> List[dict]:
+    """Menu listing from the catalog cache, falling back to MongoDB"""
+    cached = menu_cache.get_items(category, available_only)
+    if cached is not None:
+        return cached
+
+    generation = menu_cache.generation
+    db = get_db()
+    menu_collection = db.menu
+    
+    query = {}
+    if category:
+        query["category"] = category
+    if available_only:
+        query["available"] = True
+
+    items = await menu_collection.find(query, {"_id": 0}).sort("category", 1).to_list(1000)
+    
+    menu_items = project(MenuItemResponse, items)
+    menu_cache.put_items(category, available_only, menu_items, generation)
+    return menu_items
+
+
+async def load_categories() -> dict:
+    """Category list from the catalog cache, falling back to MongoDB"""
+    cached = menu_cache.get_categories()
+    if cached is not None:
+        return {"categories": cached}
+
+    generation = menu_cache.generation
+    db = get_db()
+    menu_collection = db.menu
+    
+    categories = await menu_collection.distinct("category")
+    menu_cache.put_categories(categories, generation)
+    return {"categories": categories}
+
 
 @router.get("", response_model=List[MenuItemResponse])
-async def get_menu(category: str = None, available_only: bool = True):
+async def get_menu(
+    category: str = None,
+    available_only: bool = True,
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None)
+):
     """Get menu items with optional category filter"""
     try:
-        db = get_db()
-        menu_collection = db.menu
-        
-        query = {}
-        if category:
-            query["category"] = category
-        if available_only:
-            query["available"] = True
-
-        items = await menu_collection.find(query).sort("category", 1).to_list(1000)
-        
-        for item in items:
-            item.pop("_id", None)
-        
-        return [MenuItemResponse(**item) for item in items]
+        return await snapshot_response(
+            "menu",
+            (category, available_only),
+            lambda: load_menu_items(category, available_only),
+            if_none_match=if_none_match,
+            accept_encoding=accept_encoding
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -44,14 +90,19 @@ async def get_menu(category: str = None, available_only: bool = True):
 
 
 @router.get("/categories")
-async def get_categories():
+async def get_categories(
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None)
+):
     """Get all menu categories"""
     try:
-        db = get_db()
-        menu_collection = db.menu
-        
-        categories = await menu_collection.distinct("category")
-        return {"categories": categories}
+        return await snapshot_response(
+            "menu",
+            ("categories",),
+            load_categories,
+            if_none_match=if_none_match,
+            accept_encoding=accept_encoding
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -66,17 +117,17 @@ async def create_menu_item(item: MenuItemCreate):
         db = get_db()
         menu_collection = db.menu
         
-        item_dict = item.dict()
+        item_dict = item.model_dump()
         item_dict["id"] = str(uuid.uuid4())
         item_dict["created_at"] = datetime.utcnow()
         item_dict["updated_at"] = datetime.utcnow()
 
         result = await menu_collection.insert_one(item_dict)
+        menu_changed()
         
         if result.inserted_id:
-            created_item = await menu_collection.find_one({"id": item_dict["id"]})
-            created_item.pop("_id", None)
-            return MenuItemResponse(**created_item)
+            item_dict.pop("_id", None)
+            return FastJSONResponse(construct(MenuItemResponse, item_dict), status_code=status.HTTP_201_CREATED)
         else:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -96,7 +147,7 @@ async def get_menu_item(item_id: str):
         db = get_db()
         menu_collection = db.menu
         
-        item = await menu_collection.find_one({"id": item_id})
+        item = await menu_collection.find_one({"id": item_id}, {"_id": 0})
         
         if not item:
             raise HTTPException(
@@ -104,8 +155,7 @@ async def get_menu_item(item_id: str):
                 detail=f"Menu item with ID {item_id} not found"
             )
         
-        item.pop("_id", None)
-        return MenuItemResponse(**item)
+        return FastJSONResponse(construct(MenuItemResponse, item))
     except HTTPException:
         raise
     except Exception as e:
@@ -122,31 +172,24 @@ async def update_menu_item(item_id: str, item_update: MenuItemUpdate):
         db = get_db()
         menu_collection = db.menu
         
-        item = await menu_collection.find_one({"id": item_id})
-        
-        if not item:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Menu item with ID {item_id} not found"
-            )
-
-        update_data = {k: v for k, v in item_update.dict().items() if v is not None}
+        update_data = {k: v for k, v in item_update.model_dump().items() if v is not None}
         update_data["updated_at"] = datetime.utcnow()
 
-        result = await menu_collection.update_one(
+        updated_item = await menu_collection.find_one_and_update(
             {"id": item_id},
-            {"$set": update_data}
+            {"$set": update_data},
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
         )
 
-        if result.modified_count == 0 and len(update_data) > 1:
+        if not updated_item:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to update menu item"
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Menu item with ID {item_id} not found"
             )
 
-        updated_item = await menu_collection.find_one({"id": item_id})
-        updated_item.pop("_id", None)
-        return MenuItemResponse(**updated_item)
+        menu_changed()
+        return FastJSONResponse(construct(MenuItemResponse, updated_item))
     except HTTPException:
         raise
     except Exception as e:
@@ -164,6 +207,8 @@ async def delete_menu_item(item_id: str):
         menu_collection = db.menu
         
         result = await menu_collection.delete_one({"id": item_id})
+        if result.deleted_count:
+            menu_changed()
         
         if result.deleted_count == 0:
             raise HTTPException(
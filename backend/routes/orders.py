@@ -1,14 +1,36 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List
+from fastapi import APIRouter, HTTPException, status, Depends, Header, Query
+from fastapi.encoders import jsonable_encoder
+from pydantic import ValidationError
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
+from typing import List, Optional
 from backend.models import (
+    OrderBatchCreate,
+    OrderBatchResponse,
+    OrderBatchResult,
     OrderCreate,
     OrderResponse,
     OrderStatusUpdate,
     OrderStatus,
 )
+from backend.routes.auth import get_current_admin
+from backend.services.admission import admission
+from backend.services.archival import ARCHIVE_COLLECTION, expand_order
+from backend.services.eta import eta_model
+from backend.services.idempotency import idempotency, submission_fingerprint
+from backend.services.order_events import order_created, order_status_changed
+from backend.services.order_journal import order_journal
+from backend.services.order_numbers import order_numbers
+from backend.services.order_schema import decode_order, decode_orders, encode_order, encode_orders, item_names
+from backend.services.pagination import KEYSET_SORT, fetch_page
+from backend.services.sales_rollups import sales_rollups
+from backend.services.serialization import FastJSONResponse, construct, project
 from datetime import datetime
+import os
 import uuid
 
+ORDER_BATCH_MAX_SIZE = int(os.getenv('ORDER_BATCH_MAX_SIZE', '500'))
+
 router = APIRouter(prefix="/orders", tags=["orders"])
 
 # Database dependency
@@ -18,6 +40,12 @@ _db = None
 def set_database(database):
     global _db
     _db = database
+    idempotency.set_database(database)
+    admission.reset()
+    item_names.set_database(database)
+    order_numbers.set_database(database)
+    eta_model.set_database(database)
+    sales_rollups.set_database(database)
 
 
 def get_db():
@@ -29,10 +57,40 @@ def get_db():
     return _db
 
 
-def generate_order_number():
-    timestamp = datetime.utcnow().strftime("%Y%m%d")
-    random_suffix = str(uuid.uuid4())[:6].upper()
-    return f"ORD-{timestamp}-{random_suffix}"
+async def set_order_status(order_id: str, new_status: str, extra: Optional[dict] = None) -> Optional[dict]:
+    """
+    Set an order's status and announce it on the order feed.
+
+    Accepts the application `id` or a legacy `order_id`; returns the updated
+    order, or None when no order matches. An order still waiting in the
+    journal cannot change yet and gets a 409 with Retry-After.
+    """
+    now = datetime.utcnow()
+    fields = {"status": new_status, "updated_at": now}
+    if extra:
+        fields.update(extra)
+
+    # The previous version moves the order between sales rollup buckets;
+    # status_times feeds the ETA model
+    previous = await get_db().orders.find_one_and_update(
+        {"$or": [{"id": order_id}, {"order_id": order_id}]},
+        {"$set": {**fields, f"status_times.{new_status}": now}},
+        projection={"_id": 0},
+        return_document=ReturnDocument.BEFORE
+    )
+    if previous is None:
+        if order_journal.find_pending({"id": order_id}) is not None:
+            retry_after = order_journal.retry_after_seconds
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Order {order_id} is still being saved, retry in {retry_after}s",
+                headers={"Retry-After": str(retry_after)}
+            )
+        return None
+    previous = await decode_order(get_db(), previous)
+    updated = {**previous, **fields, "status_times": {**(previous.get("status_times") or {}), new_status: now}}
+    order_status_changed(updated, previous)
+    return updated
 
 
 def calculate_delivery_charge(area: str, order_type: str) -> float:
@@ -107,53 +165,177 @@ def validate_order_data(order: OrderCreate) -> dict:
     }
 
 
+def build_order_document(order: OrderCreate, validated_data: dict, order_number: str) -> dict:
+    order_dict = order.model_dump()
+    order_dict["id"] = str(uuid.uuid4())
+    order_dict["order_number"] = order_number
+    order_dict["status"] = OrderStatus.PENDING.value
+    order_dict["created_at"] = datetime.utcnow()
+    order_dict["updated_at"] = order_dict["created_at"]
+    order_dict["status_times"] = {OrderStatus.PENDING.value: order_dict["created_at"]}
+
+    order_dict["subtotal"] = validated_data["subtotal"]
+    order_dict["delivery_charge"] = validated_data["delivery_charge"]
+    order_dict["total"] = validated_data["total"]
+    order_dict["payment_status"] = "pending"
+
+    estimate = eta_model.estimate(order.order_type, order.delivery_area)
+    order_dict["estimated_time"] = estimate["estimated_time"]
+    order_dict["estimated_delivery_time"] = estimate["estimated_delivery_time"]
+
+    if order_dict.get("cart_items"):
+        order_dict["cart_items"] = [item.model_dump() for item in order.cart_items]
+
+    return order_dict
+
+
 @router.post("", response_model=OrderResponse, status_code=status.HTTP_201_CREATED)
-async def create_order(order: OrderCreate):
+async def create_order(
+    order: OrderCreate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    fingerprint = submission_fingerprint(
+        "orders", order.phone, order.cart_items, order.order_type, order.delivery_area
+    )
+    replay = await idempotency.replay_or_reserve("orders", idempotency_key, fingerprint)
+    if replay is not None:
+        return replay
+
+    slot = None
     try:
         db = get_db()
         orders_collection = db.orders
 
         validated_data = validate_order_data(order)
+        # Turn away before any database work when the kitchen is full
+        slot = await admission.admit()
+
+        order_dict = build_order_document(order, validated_data, await order_numbers.next_number())
+
+        stored = await encode_order(db, order_dict)
+        if order_journal.enabled:
+            # Durable on local disk now, written to MongoDB in the next batch
+            await order_journal.append(stored)
+        else:
+            result = await orders_collection.insert_one(stored)
+
+            if not result.inserted_id:
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="Failed to create order"
+                )
+
+        response = construct(OrderResponse, order_dict)
+        order_created(order_dict)
+        await idempotency.complete(
+            "orders", idempotency_key, fingerprint,
+            status.HTTP_201_CREATED, jsonable_encoder(response)
+        )
+        return FastJSONResponse(response, status_code=status.HTTP_201_CREATED)
 
-        order_dict = order.dict()
-        order_dict["id"] = str(uuid.uuid4())
-        order_dict["order_number"] = generate_order_number()
-        order_dict["status"] = OrderStatus.PENDING.value
-        order_dict["created_at"] = datetime.utcnow()
-        order_dict["updated_at"] = datetime.utcnow()
+    except HTTPException:
+        admission.release(slot)
+        await idempotency.release("orders", idempotency_key, fingerprint)
+        raise
+    except Exception as e:
+        admission.release(slot)
+        await idempotency.release("orders", idempotency_key, fingerprint)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Unexpected error creating order: {str(e)}"
+        )
 
-        order_dict["subtotal"] = validated_data["subtotal"]
-        order_dict["delivery_charge"] = validated_data["delivery_charge"]
-        order_dict["total"] = validated_data["total"]
-        order_dict["payment_status"] = "pending"
 
-        if order_dict.get("cart_items"):
-            order_dict["cart_items"] = [item.dict() for item in order.cart_items]
+def _validation_messages(error: ValidationError) -> List[str]:
+    return [
+        f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" if err["loc"] else err["msg"]
+        for err in error.errors()
+    ]
 
-        result = await orders_collection.insert_one(order_dict)
 
-        if not result.inserted_id:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to create order"
-            )
+@router.post("/batch", response_model=OrderBatchResponse)
+async def create_orders_batch(
+    batch: OrderBatchCreate,
+    current_admin: dict = Depends(get_current_admin)
+):
+    """
+    Import many orders at once (phone orders, aggregator backlogs).
+
+    Each order is validated on its own and all valid ones are written with
+    one unordered insert_many. The response has one result per submitted
+    order, in the same order.
+    """
+    if len(batch.orders) > ORDER_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {ORDER_BATCH_MAX_SIZE} orders per batch"
+        )
 
-        created_order = await orders_collection.find_one({"id": order_dict["id"]})
-        created_order.pop("_id", None)
+    try:
+        results: List[Optional[OrderBatchResult]] = [None] * len(batch.orders)
+        accepted = []
+
+        for index, raw in enumerate(batch.orders):
+            try:
+                order = OrderCreate.model_validate(raw)
+                validated_data = validate_order_data(order)
+            except ValidationError as e:
+                results[index] = OrderBatchResult(index=index, status="error", errors=_validation_messages(e))
+                continue
+            except HTTPException as e:
+                results[index] = OrderBatchResult(index=index, status="error", errors=e.detail["errors"])
+                continue
+            accepted.append((index, order, validated_data))
+
+        numbers = await order_numbers.next_numbers(len(accepted))
+        docs = [
+            build_order_document(order, validated_data, number)
+            for (_, order, validated_data), number in zip(accepted, numbers)
+        ]
+
+        write_errors = {}
+        if docs:
+            try:
+                await get_db().orders.insert_many(await encode_orders(get_db(), docs), ordered=False)
+            except BulkWriteError as e:
+                write_errors = {err["index"]: err.get("errmsg", "Write failed") for err in e.details.get("writeErrors", [])}
+
+        for position, ((index, _, _), doc) in enumerate(zip(accepted, docs)):
+            if position in write_errors:
+                results[index] = OrderBatchResult(index=index, status="error", errors=[write_errors[position]])
+                continue
+            doc.pop("_id", None)
+            order_created(doc)
+            results[index] = OrderBatchResult(
+                index=index, status="created", id=doc["id"], order_number=doc["order_number"]
+            )
 
-        return OrderResponse(**created_order)
+        created = sum(1 for result in results if result.status == "created")
+        return OrderBatchResponse(created=created, failed=len(results) - created, results=results)
 
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Unexpected error creating order: {str(e)}"
+            detail=f"Unexpected error importing orders: {str(e)}"
         )
 
 
 @router.get("", response_model=List[OrderResponse])
-async def get_all_orders(status_filter: str = None, limit: int = 50, skip: int = 0):
+async def get_all_orders(
+    status_filter: str = None,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    skip: int = Query(0, ge=0, deprecated=True)
+):
+    """
+    List orders newest first.
+
+    Pass the X-Next-Cursor header of one page as `cursor` to get the next;
+    the header is absent on the last page. `skip` is kept for old clients
+    and ignored once a cursor is given.
+    """
     try:
         db = get_db()
         orders_collection = db.orders
@@ -162,16 +344,18 @@ async def get_all_orders(status_filter: str = None, limit: int = 50, skip: int =
         if status_filter:
             query["status"] = status_filter
 
-        orders = await orders_collection.find(query) \
-            .sort("created_at", -1) \
-            .skip(skip) \
-            .limit(limit) \
-            .to_list(limit)
-
-        for order in orders:
-            order.pop("_id", None)
+        if skip and not cursor:
+            orders = await orders_collection.find(query) \
+                .sort(KEYSET_SORT) \
+                .skip(skip) \
+                .limit(limit) \
+                .to_list(limit)
+            next_cursor = None
+        else:
+            orders, next_cursor = await fetch_page(orders_collection, query, cursor, limit)
 
-        return [OrderResponse(**order) for order in orders]
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+        return FastJSONResponse(project(OrderResponse, await decode_orders(db, orders)), headers=headers)
 
     except HTTPException:
         raise
@@ -179,4 +363,99 @@ async def get_all_orders(status_filter: str = None, limit: int = 50, skip: int =
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Unexpected error fetching orders: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+async def find_order(query: dict) -> Optional[dict]:
+    """Look an order up in the journal, the hot collection, then the archive"""
+    db = get_db()
+    # Acknowledged orders still waiting for the next journal flush
+    pending = order_journal.find_pending(query)
+    if pending is not None:
+        return await decode_order(db, {k: v for k, v in pending.items() if k != "_id"})
+    order = await decode_order(db, await db.orders.find_one(query, {"_id": 0}))
+    if order is None:
+        archived = await db[ARCHIVE_COLLECTION].find_one(query, {"_id": 0})
+        if archived is not None:
+            order = expand_order(archived)
+    return order
+
+
+@router.get("/eta")
+async def get_eta(order_type: str = "delivery", delivery_area: Optional[str] = None):
+    """Current estimate for a new order, from the in-memory ETA model"""
+    return eta_model.estimate(order_type, delivery_area)
+
+
+@router.get("/number/{order_number}", response_model=OrderResponse)
+async def get_order_by_number(order_number: str):
+    try:
+        order = await find_order({"order_number": order_number})
+
+        if order is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Order {order_number} not found"
+            )
+
+        return FastJSONResponse(construct(OrderResponse, order))
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Unexpected error fetching order: {str(e)}"
+        )
+
+
+@router.get("/{order_id}", response_model=OrderResponse)
+async def get_order(order_id: str):
+    try:
+        order = await find_order({"id": order_id})
+
+        if order is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Order {order_id} not found"
+            )
+
+        return FastJSONResponse(construct(OrderResponse, order))
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Unexpected error fetching order: {str(e)}"
+        )
+
+
+@router.patch("/{order_id}/status")
+async def update_order_status(
+    order_id: str,
+    update: OrderStatusUpdate,
+    current_admin: dict = Depends(get_current_admin)
+):
+    try:
+        updated = await set_order_status(order_id, update.status.value)
+
+        if updated is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Order {order_id} not found"
+            )
+
+        return {
+            "message": "Order updated successfully",
+            "order_id": order_id,
+            "new_status": update.status.value
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Unexpected error updating order: {str(e)}"
+        )
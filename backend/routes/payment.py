@@ -1,26 +1,30 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, status, Header
 from pydantic import BaseModel
-from typing import List
-import razorpay
-import os
-import hmac
-import hashlib
+from pymongo import ReturnDocument
+from typing import List, Optional
 from datetime import datetime
+from backend.services.admission import admission
+from backend.services.eta import eta_model
+from backend.services.idempotency import idempotency, submission_fingerprint
+from backend.services.order_events import order_created, order_status_changed
+from backend.services.order_numbers import order_numbers
+from backend.services.order_schema import decode_order, encode_order
+from backend.services.payment_gateway import PaymentGatewayError, get_gateway
+from backend.services.sales_rollups import sales_rollups
 
 router = APIRouter(prefix="/payment", tags=["payment"])
 
-# Razorpay client
-RAZORPAY_KEY_ID = os.getenv("RAZORPAY_KEY_ID", "")
-RAZORPAY_KEY_SECRET = os.getenv("RAZORPAY_KEY_SECRET", "")
-
-client = razorpay.Client(auth=(RAZORPAY_KEY_ID, RAZORPAY_KEY_SECRET)) if RAZORPAY_KEY_ID else None
-
 # Database dependency
 _db = None
 
 def set_database(database):
     global _db
     _db = database
+    idempotency.set_database(database)
+    admission.reset()
+    order_numbers.set_database(database)
+    eta_model.set_database(database)
+    sales_rollups.set_database(database)
 
 
 class CartItemPayment(BaseModel):
@@ -63,14 +67,27 @@ def calculate_delivery_charge(area: str, order_type: str) -> float:
 
 
 @router.post("/create-razorpay-order")
-async def create_razorpay_order(order_data: CreateRazorpayOrder):
+async def create_razorpay_order(
+    order_data: CreateRazorpayOrder,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
     """Create Razorpay order with server-side validation"""
-    if not client:
+    gateway = get_gateway()
+    if not gateway.configured:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Payment gateway not configured. Please contact restaurant."
         )
     
+    # A replayed retry must not create a second gateway order
+    fingerprint = submission_fingerprint(
+        "payment", order_data.phone, order_data.cart_items, order_data.order_type, order_data.delivery_area
+    )
+    replay = await idempotency.replay_or_reserve("payment", idempotency_key, fingerprint)
+    if replay is not None:
+        return replay
+    
+    slot = None
     try:
         # Server-side calculation
         subtotal = sum(item.price * item.quantity for item in order_data.cart_items)
@@ -92,16 +109,17 @@ async def create_razorpay_order(order_data: CreateRazorpayOrder):
                 detail=f"Minimum order amount is ₹{min_order}"
             )
         
+        slot = await admission.admit()
+        
         # Create order in database first
         db = _db
         orders_collection = db.orders
         
         import uuid
         order_id = str(uuid.uuid4())
-        timestamp = datetime.utcnow().strftime("%Y%m%d")
-        random_suffix = str(uuid.uuid4())[:6].upper()
-        order_number = f"ORD-{timestamp}-{random_suffix}"
+        order_number = await order_numbers.next_number()
         
+        now = datetime.utcnow()
         order_dict = {
             "id": order_id,
             "order_number": order_number,
@@ -120,36 +138,48 @@ async def create_razorpay_order(order_data: CreateRazorpayOrder):
             "payment_method": "razorpay",
             "payment_status": "pending",
             "status": "pending",
-            "estimated_delivery_time": "45-60 minutes",
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
+            "created_at": now,
+            "updated_at": now,
+            "status_times": {"pending": now}
         }
+        estimate = eta_model.estimate(order_data.order_type, order_data.delivery_area)
+        order_dict["estimated_time"] = estimate["estimated_time"]
+        order_dict["estimated_delivery_time"] = estimate["estimated_delivery_time"]
         
         # Create Razorpay order
         amount_paise = int(total * 100)
-        razorpay_order = client.order.create({
-            "amount": amount_paise,
-            "currency": "INR",
-            "receipt": order_number,
-            "payment_capture": 1
-        })
+        razorpay_order = await gateway.create_order(amount_paise, receipt=order_number)
         
         # Update order with razorpay_order_id
         order_dict["razorpay_order_id"] = razorpay_order["id"]
         
-        await orders_collection.insert_one(order_dict)
+        await orders_collection.insert_one(await encode_order(db, order_dict))
+        order_created(order_dict)
         
-        return {
+        result = {
             "razorpay_order_id": razorpay_order["id"],
             "order_number": order_number,
             "amount": total,
             "currency": "INR",
-            "key_id": RAZORPAY_KEY_ID
+            "key_id": gateway.key_id
         }
+        await idempotency.complete("payment", idempotency_key, fingerprint, status.HTTP_200_OK, result)
+        return result
     
     except HTTPException:
+        admission.release(slot)
+        await idempotency.release("payment", idempotency_key, fingerprint)
         raise
+    except PaymentGatewayError as e:
+        admission.release(slot)
+        await idempotency.release("payment", idempotency_key, fingerprint)
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Payment gateway unavailable: {str(e)}"
+        )
     except Exception as e:
+        admission.release(slot)
+        await idempotency.release("payment", idempotency_key, fingerprint)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to create order: {str(e)}"
@@ -159,53 +189,62 @@ async def create_razorpay_order(order_data: CreateRazorpayOrder):
 @router.post("/verify-payment")
 async def verify_payment(verification: VerifyPaymentRequest):
     """Verify Razorpay payment and update order"""
-    if not client:
+    gateway = get_gateway()
+    if not gateway.configured:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Payment gateway not configured"
         )
     
     try:
-        # Verify signature
-        generated_signature = hmac.new(
-            RAZORPAY_KEY_SECRET.encode(),
-            f"{verification.razorpay_order_id}|{verification.razorpay_payment_id}".encode(),
-            hashlib.sha256
-        ).hexdigest()
-        
         db = _db
         orders_collection = db.orders
         
-        if generated_signature != verification.razorpay_signature:
+        # Verify signature
+        if not gateway.verify_signature(
+            verification.razorpay_order_id,
+            verification.razorpay_payment_id,
+            verification.razorpay_signature
+        ):
             # Mark as failed
-            await orders_collection.update_one(
+            fields = {"payment_status": "failed", "updated_at": datetime.utcnow()}
+            previous = await orders_collection.find_one_and_update(
                 {"order_number": verification.order_number},
-                {"$set": {"payment_status": "failed", "updated_at": datetime.utcnow()}}
+                {"$set": fields},
+                projection={"_id": 0},
+                return_document=ReturnDocument.BEFORE
             )
+            if previous is not None:
+                previous = await decode_order(db, previous)
+                order_status_changed({**previous, **fields}, previous)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Invalid payment signature"
             )
         
         # Update order as paid
-        result = await orders_collection.update_one(
+        fields = {
+            "payment_status": "paid",
+            "razorpay_payment_id": verification.razorpay_payment_id,
+            "status": "pending",
+            "updated_at": datetime.utcnow()
+        }
+        previous = await orders_collection.find_one_and_update(
             {"order_number": verification.order_number},
-            {
-                "$set": {
-                    "payment_status": "paid",
-                    "razorpay_payment_id": verification.razorpay_payment_id,
-                    "status": "pending",
-                    "updated_at": datetime.utcnow()
-                }
-            }
+            {"$set": fields},
+            projection={"_id": 0},
+            return_document=ReturnDocument.BEFORE
         )
         
-        if result.modified_count == 0:
+        if previous is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Order not found"
             )
         
+        previous = await decode_order(db, previous)
+        order_status_changed({**previous, **fields}, previous)
+        
         return {"status": "success", "message": "Payment verified successfully"}
     
     except HTTPException:
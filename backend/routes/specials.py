@@ -1,17 +1,25 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Header
 from pydantic import BaseModel, Field
+from pymongo import ReturnDocument
 from typing import Optional, List
 from datetime import datetime, timezone
+from backend.services.content_versions import content_versions
+from backend.services.datetime_migration import DATETIME_FIELDS, parse_unmigrated, utc_collection
+from backend.services.serialization import FastJSONResponse, construct, project
+from backend.services.snapshots import snapshot_response
 import uuid
 
 router = APIRouter(prefix="/specials", tags=["specials"])
 
+SPECIAL_DATETIME_FIELDS = DATETIME_FIELDS["specials"]
+
 # Database reference (will be set from server.py)
 db = None
 
 def set_database(database):
     global db
     db = database
+    content_versions.bump("specials")
 
 
 class SpecialCreate(BaseModel):
@@ -48,36 +56,36 @@ class SpecialUpdate(BaseModel):
     badge: Optional[str] = None
 
 
-@router.get("", response_model=List[SpecialResponse])
-async def get_specials(active_only: bool = True):
-    """Get all specials (optionally only active ones)"""
+async def load_specials(active_only: bool) -> List[dict]:
     query = {"active": True} if active_only else {}
-    specials = await db.specials.find(query, {"_id": 0}).to_list(100)
+    specials = await utc_collection(db, "specials").find(query, {"_id": 0}).to_list(100)
+    return project(SpecialResponse, [parse_unmigrated(special, SPECIAL_DATETIME_FIELDS) for special in specials])
 
-    # Convert ISO string timestamps back to datetime
-    for special in specials:
-        if isinstance(special.get('created_at'), str):
-            special['created_at'] = datetime.fromisoformat(special['created_at'])
-        if isinstance(special.get('updated_at'), str):
-            special['updated_at'] = datetime.fromisoformat(special['updated_at'])
 
-    return specials
+@router.get("", response_model=List[SpecialResponse])
+async def get_specials(
+    active_only: bool = True,
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None)
+):
+    """Get all specials (optionally only active ones)"""
+    return await snapshot_response(
+        "specials",
+        (active_only,),
+        lambda: load_specials(active_only),
+        if_none_match=if_none_match,
+        accept_encoding=accept_encoding
+    )
 
 
 @router.get("/{special_id}", response_model=SpecialResponse)
 async def get_special(special_id: str):
     """Get a specific special by ID"""
-    special = await db.specials.find_one({"id": special_id}, {"_id": 0})
+    special = await utc_collection(db, "specials").find_one({"id": special_id}, {"_id": 0})
     if not special:
         raise HTTPException(status_code=404, detail="Special not found")
     
-    # Convert timestamps
-    if isinstance(special.get('created_at'), str):
-        special['created_at'] = datetime.fromisoformat(special['created_at'])
-    if isinstance(special.get('updated_at'), str):
-        special['updated_at'] = datetime.fromisoformat(special['updated_at'])
-    
-    return special
+    return FastJSONResponse(construct(SpecialResponse, parse_unmigrated(special, SPECIAL_DATETIME_FIELDS)))
 
 
 @router.post("", response_model=SpecialResponse)
@@ -98,54 +106,56 @@ async def create_special(special: SpecialCreate):
         "image": special.image,
         "is_active": special.is_active,
         "badge": special.badge,
-        "created_at": now.isoformat(),
-        "updated_at": now.isoformat()
+        "created_at": now,
+        "updated_at": now
     }
     
     await db.specials.insert_one(special_doc)
+    content_versions.bump("specials")
     
-    # Return with datetime objects
-    special_doc['created_at'] = now
-    special_doc['updated_at'] = now
     if '_id' in special_doc:
         del special_doc['_id']
     
     return special_doc
 
 
+# discount_percent derived from the stored prices, truncated like int()
+DISCOUNT_PERCENT_EXPR = {"$toInt": {"$trunc": {"$multiply": [
+    {"$divide": [{"$subtract": ["$original_price", "$special_price"]}, "$original_price"]},
+    100
+]}}}
+
+
 @router.put("/{special_id}", response_model=SpecialResponse)
 async def update_special(special_id: str, update_data: SpecialUpdate):
     """Update a special offer"""
-    special = await db.specials.find_one({"id": special_id})
-    if not special:
-        raise HTTPException(status_code=404, detail="Special not found")
-    
     # Build update dict with only provided fields
     update_dict = {k: v for k, v in update_data.model_dump().items() if v is not None}
+    specials = utc_collection(db, "specials")
     
     if update_dict:
-        update_dict["updated_at"] = datetime.now(timezone.utc).isoformat()
-        
-        # Recalculate discount if prices changed
-        original = update_dict.get('original_price', special.get('original_price'))
-        special_price = update_dict.get('special_price', special.get('special_price'))
-        update_dict['discount_percent'] = int(((original - special_price) / original) * 100)
+        update_dict["updated_at"] = datetime.now(timezone.utc)
         
-        await db.specials.update_one(
+        # One pipeline update sets the fields and recalculates the discount
+        # from the resulting prices, so concurrent edits cannot mix
+        updated = await specials.find_one_and_update(
             {"id": special_id},
-            {"$set": update_dict}
+            [
+                {"$set": {k: {"$literal": v} for k, v in update_dict.items()}},
+                {"$set": {"discount_percent": DISCOUNT_PERCENT_EXPR}}
+            ],
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
         )
+    else:
+        updated = await specials.find_one({"id": special_id}, {"_id": 0})
     
-    # Fetch updated document
-    updated = await db.specials.find_one({"id": special_id}, {"_id": 0})
-    
-    # Convert timestamps
-    if isinstance(updated.get('created_at'), str):
-        updated['created_at'] = datetime.fromisoformat(updated['created_at'])
-    if isinstance(updated.get('updated_at'), str):
-        updated['updated_at'] = datetime.fromisoformat(updated['updated_at'])
+    if not updated:
+        raise HTTPException(status_code=404, detail="Special not found")
+    if update_dict:
+        content_versions.bump("specials")
     
-    return updated
+    return FastJSONResponse(construct(SpecialResponse, parse_unmigrated(updated, SPECIAL_DATETIME_FIELDS)))
 
 
 @router.delete("/{special_id}")
@@ -154,20 +164,26 @@ async def delete_special(special_id: str):
     result = await db.specials.delete_one({"id": special_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Special not found")
+    content_versions.bump("specials")
     return {"message": "Special deleted successfully"}
 
 
 @router.patch("/{special_id}/toggle")
 async def toggle_special(special_id: str):
     """Toggle the active status of a special"""
-    special = await db.specials.find_one({"id": special_id})
-    if not special:
-        raise HTTPException(status_code=404, detail="Special not found")
-    
-    new_status = not special.get('is_active', True)
-    await db.specials.update_one(
+    # Flipped server-side so two quick toggles cannot both read the old value
+    updated = await db.specials.find_one_and_update(
         {"id": special_id},
-        {"$set": {"is_active": new_status, "updated_at": datetime.now(timezone.utc).isoformat()}}
+        [{"$set": {
+            "is_active": {"$eq": [{"$ifNull": ["$is_active", True]}, False]},
+            "updated_at": datetime.now(timezone.utc)
+        }}],
+        projection={"_id": 0, "is_active": 1},
+        return_document=ReturnDocument.AFTER
     )
+    if not updated:
+        raise HTTPException(status_code=404, detail="Special not found")
+    content_versions.bump("specials")
     
+    new_status = updated["is_active"]
     return {"message": f"Special {'activated' if new_status else 'deactivated'}", "is_active": new_status}
@@ -11,7 +11,19 @@ import uuid
 from datetime import datetime, timezone
 
 # Import route modules
-from backend.routes import orders, menu, payment, specials, auth, admin
+from backend.routes import orders, menu, payment, specials, auth, admin, kitchen
+from backend.services.analytics import analytics_refresh
+from backend.services.archival import archival_job
+from backend.services.datetime_migration import DATETIME_FIELDS, parse_unmigrated, utc_collection
+from backend.services.eta import eta_model
+from backend.services.indexes import ensure_indexes
+from backend.services.kitchen_queue import kitchen_queue
+from backend.services.order_journal import order_journal
+from backend.services.order_schema import order_schema_migration
+from backend.services.password_pool import password_pool
+from backend.services.payment_gateway import get_gateway
+from backend.services.sales_rollups import sales_rollups
+from backend.services.serialization import FastJSONResponse, project
 
 
 ROOT_DIR = Path(__file__).parent
@@ -21,6 +33,7 @@ load_dotenv(ROOT_DIR / '.env')
 MONGO_URL = os.getenv('MONGO_URL', 'mongodb://localhost:27017')
 DB_NAME = os.getenv('DB_NAME', 'restaurant_db')
 ENVIRONMENT = os.getenv('ENVIRONMENT', 'development')
+ENSURE_INDEXES_ON_STARTUP = os.getenv('ENSURE_INDEXES_ON_STARTUP', 'true').lower() == 'true'
 
 # Validate required environment variables
 if MONGO_URL == 'mongodb://localhost:27017' and ENVIRONMENT == 'production':
@@ -40,7 +53,8 @@ except Exception as e:
 app = FastAPI(
     title="Restaurant Ordering API",
     description="Production-ready restaurant ordering system",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
 
 # Create a router with the /api prefix
@@ -68,24 +82,17 @@ async def create_status_check(input: StatusCheckCreate):
     status_dict = input.model_dump()
     status_obj = StatusCheck(**status_dict)
     
-    # Convert to dict and serialize datetime to ISO string for MongoDB
     doc = status_obj.model_dump()
-    doc['timestamp'] = doc['timestamp'].isoformat()
-    
     _ = await db.status_checks.insert_one(doc)
     return status_obj
 
 @api_router.get("/status", response_model=List[StatusCheck])
 async def get_status_checks():
     # Exclude MongoDB's _id field from the query results
-    status_checks = await db.status_checks.find({}, {"_id": 0}).to_list(1000)
-    
-    # Convert ISO string timestamps back to datetime objects
-    for check in status_checks:
-        if isinstance(check['timestamp'], str):
-            check['timestamp'] = datetime.fromisoformat(check['timestamp'])
-    
-    return status_checks
+    status_checks = await utc_collection(db, "status_checks").find({}, {"_id": 0}).to_list(1000)
+    return FastJSONResponse(project(
+        StatusCheck, [parse_unmigrated(check, DATETIME_FIELDS["status_checks"]) for check in status_checks]
+    ))
 
 # Set database for route modules
 orders.set_database(db)
@@ -94,6 +101,7 @@ payment.set_database(db)
 specials.set_database(db)
 admin.set_database(db)
 auth.set_database(db)
+kitchen.set_database(db)
 
 # Include all routes (Auth must be first)
 api_router.include_router(auth.router)
@@ -102,6 +110,7 @@ api_router.include_router(menu.router)
 api_router.include_router(payment.router)
 api_router.include_router(specials.router)
 api_router.include_router(admin.router)
+api_router.include_router(kitchen.router)
 
 # Include the router in the main app
 app.include_router(api_router)
@@ -128,6 +137,7 @@ app.add_middleware(
     allow_origins=get_cors_origins(),
     allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
 # Configure logging
@@ -138,8 +148,60 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def create_indexes():
+    if not ENSURE_INDEXES_ON_STARTUP:
+        return
+    try:
+        await ensure_indexes(db)
+    except Exception as e:
+        # Never block startup on index creation; the report CLI shows the drift
+        logger.error(f"Index creation failed: {str(e)}")
+
+@app.on_event("startup")
+async def start_order_journal():
+    if order_journal.enabled:
+        # Replays orders journaled before a crash before taking new ones
+        await order_journal.start(db)
+
+@app.on_event("startup")
+async def start_archival():
+    if archival_job.enabled:
+        archival_job.start(db)
+
+@app.on_event("startup")
+async def start_order_schema_migration():
+    if order_schema_migration.enabled:
+        order_schema_migration.start(db)
+
+@app.on_event("startup")
+async def start_sales_rollups():
+    sales_rollups.start(db)
+
+@app.on_event("startup")
+async def start_kitchen_queue():
+    kitchen_queue.start(db)
+
+@app.on_event("startup")
+async def start_eta_model():
+    eta_model.start(db)
+
+@app.on_event("startup")
+async def start_analytics_refresh():
+    analytics_refresh.start(db)
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await eta_model.stop()
+    await kitchen_queue.stop()
+    await analytics_refresh.stop()
+    await archival_job.stop()
+    await order_schema_migration.stop()
+    if order_journal.enabled:
+        await order_journal.stop()
+    await sales_rollups.stop()
+    password_pool.shutdown()
+    await get_gateway().close()
     client.close()
 
 if __name__ == "__main__":
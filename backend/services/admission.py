@@ -0,0 +1,155 @@
+"""
+Kitchen-capacity admission control for order intake.
+
+New orders are turned away with a 503 "busy, try again in N minutes" once
+either limit is reached:
+
+- the kitchen already has ADMISSION_MAX_ACTIVE_ORDERS active orders placed
+  in the last ADMISSION_ACTIVE_MAX_AGE_MINUTES (the kitchen queue's
+  in-memory index, synced across workers), or
+- this worker admitted ADMISSION_MAX_ORDERS_PER_WINDOW orders in the last
+  ADMISSION_WINDOW_MINUTES, which catches a burst before it shows up in
+  the queue (online orders only reach the kitchen once paid).
+
+The decision is made in memory before the order touches MongoDB, so a
+rejected order costs no database work and intake latency stays flat under
+a spike. N comes from the ETA model's kitchen time, and the response also
+offers the first pickup slot the kitchen can be expected to make.
+A limit of 0 turns that check off. The active-order check is off by
+default: it is only meaningful once staff move orders through their
+statuses, and older orders never moved on would otherwise count as work.
+
+A window slot is reserved when an order is admitted and handed back with
+release() if the order then fails, so failed requests use no quota.
+"""
+
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from fastapi import HTTPException, status
+from backend.services.eta import ETA_KITCHEN_CAPACITY, eta_model
+from backend.services.kitchen_queue import kitchen_queue
+import logging
+import math
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+ADMISSION_MAX_ACTIVE_ORDERS = int(os.getenv('ADMISSION_MAX_ACTIVE_ORDERS', '0'))
+ADMISSION_ACTIVE_MAX_AGE_MINUTES = float(os.getenv('ADMISSION_ACTIVE_MAX_AGE_MINUTES', '120'))
+ADMISSION_MAX_ORDERS_PER_WINDOW = int(os.getenv('ADMISSION_MAX_ORDERS_PER_WINDOW', '60'))
+ADMISSION_WINDOW_MINUTES = float(os.getenv('ADMISSION_WINDOW_MINUTES', '15'))
+ADMISSION_SLOT_MINUTES = int(os.getenv('ADMISSION_SLOT_MINUTES', '15'))
+
+KITCHEN_FULL = "kitchen_full"
+INTAKE_RATE = "intake_rate"
+
+
+def next_slot(at: datetime, slot_minutes: int = ADMISSION_SLOT_MINUTES) -> datetime:
+    """`at` rounded up to the next slot boundary, e.g. 12:07 -> 12:15"""
+    slot = timedelta(minutes=max(1, slot_minutes))
+    start = at.replace(minute=0, second=0, microsecond=0)
+    return start + math.ceil((at - start) / slot) * slot
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_active: int = ADMISSION_MAX_ACTIVE_ORDERS,
+        max_per_window: int = ADMISSION_MAX_ORDERS_PER_WINDOW,
+        window_minutes: float = ADMISSION_WINDOW_MINUTES,
+        active_max_age_minutes: float = ADMISSION_ACTIVE_MAX_AGE_MINUTES,
+    ):
+        self.max_active = max_active
+        self.active_max_age_minutes = active_max_age_minutes
+        self.max_per_window = max_per_window
+        self.window_seconds = window_minutes * 60
+        self.reset()
+
+    def reset(self):
+        self._admitted = deque()
+        self.admitted = 0
+        self.rejected = {KITCHEN_FULL: 0, INTAKE_RATE: 0}
+
+    def _prune(self, now: float):
+        while self._admitted and now - self._admitted[0] >= self.window_seconds:
+            self._admitted.popleft()
+
+    def active_orders(self) -> int:
+        """Kitchen orders recent enough to be real work"""
+        return kitchen_queue.count_since(datetime.utcnow() - timedelta(minutes=self.active_max_age_minutes))
+
+    def _retry_minutes(self, reason: str, now: float) -> int:
+        if reason == KITCHEN_FULL:
+            # The kitchen works ETA_KITCHEN_CAPACITY orders per kitchen time
+            excess = self.active_orders() - self.max_active + 1
+            minutes = math.ceil(excess / max(1, ETA_KITCHEN_CAPACITY)) * eta_model.kitchen_minutes()
+        else:
+            minutes = (self._admitted[0] + self.window_seconds - now) / 60
+        return max(1, math.ceil(minutes))
+
+    def check(self) -> Tuple[Optional[float], Optional[dict]]:
+        """
+        Admit one order: its reserved window slot and None, or no slot and
+        why not and when to come back.
+        """
+        now = time.monotonic()
+        self._prune(now)
+        reason = None
+        if self.max_active and self.active_orders() >= self.max_active:
+            reason = KITCHEN_FULL
+        elif self.max_per_window and len(self._admitted) >= self.max_per_window:
+            reason = INTAKE_RATE
+
+        if reason is None:
+            self._admitted.append(now)
+            self.admitted += 1
+            return now, None
+
+        self.rejected[reason] += 1
+        retry_after = self._retry_minutes(reason, now)
+        ready_at = datetime.utcnow() + timedelta(minutes=retry_after + eta_model.kitchen_minutes())
+        return None, {
+            "message": f"We're at kitchen capacity right now. Please try again in {retry_after} minutes.",
+            "reason": reason,
+            "retry_after_minutes": retry_after,
+            "pickup_slot": next_slot(ready_at).isoformat(),
+        }
+
+    def release(self, slot: Optional[float]):
+        """Hand back the window slot of an admitted order that then failed"""
+        if slot is None:
+            return
+        try:
+            self._admitted.remove(slot)
+        except ValueError:
+            return  # already outside the window
+        self.admitted -= 1
+
+    async def admit(self) -> float:
+        """Reserve a window slot, or raise a 503 with a structured detail when the kitchen is full"""
+        await kitchen_queue.ensure_loaded()
+        slot, busy = self.check()
+        if busy is not None:
+            logger.warning(f"Order rejected ({busy['reason']}), retry in {busy['retry_after_minutes']} minutes")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=busy,
+                headers={"Retry-After": str(busy["retry_after_minutes"] * 60)}
+            )
+        return slot
+
+    def stats(self) -> dict:
+        self._prune(time.monotonic())
+        return {
+            "active_orders": self.active_orders(),
+            "max_active_orders": self.max_active,
+            "window_orders": len(self._admitted),
+            "max_orders_per_window": self.max_per_window,
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+        }
+
+
+admission = AdmissionController()
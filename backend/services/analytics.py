@@ -0,0 +1,255 @@
+"""
+Materialized sales analytics.
+
+Item sales are kept in `item_sales_daily`, one row per (day, item_name,
+source) with quantity, revenue and order lines, written by aggregation
+pipelines ending in $merge. A refresh only recomputes the UTC days that
+contain orders changed since the stored watermark (orders.updated_at),
+replacing those days' rows, so it is idempotent and never unwinds the
+whole order history. `source` separates rows computed from `orders` and
+from `orders_archive`; both are recomputed for every refreshed day, so an
+order counts once wherever it lives.
+
+Sold means not cancelled, and paid when paid online. Orders stored in the
+compact v2 layout carry item name codes instead of names; lines are grouped
+by code and the names looked up in `order_item_names` once per group. The
+hour-of-week heatmap needs no view of its own: it reads the hourly sales
+rollups.
+"""
+
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+from backend.services.archival import ARCHIVE_COLLECTION
+from backend.services.indexes import INDEXES
+from backend.services.order_schema import CART_FIELD, ITEM_NAMES_COLLECTION
+from backend.services.sales_rollups import ROLLUP_COLLECTION
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+ANALYTICS_REFRESH_SECONDS = float(os.getenv('ANALYTICS_REFRESH_SECONDS', '300'))
+# Orders stamped just before a refresh may commit just after it; look back this far
+ANALYTICS_WATERMARK_LAG_SECONDS = float(os.getenv('ANALYTICS_WATERMARK_LAG_SECONDS', '60'))
+
+ITEM_SALES_COLLECTION = "item_sales_daily"
+WATERMARK_ID = "item_sales_daily:watermark"
+ITEM_SALES_KEY = ["day", "item_name", "source"]
+SOURCES = {"orders": "orders", "archive": ARCHIVE_COLLECTION}
+ITEM_SORTS = ("quantity", "revenue", "orders")
+
+SOLD_MATCH = {
+    "status": {"$ne": "cancelled"},
+    "$or": [{"payment_method": {"$ne": "razorpay"}}, {"payment_status": "paid"}],
+}
+DAY_EXPR = {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}}
+# Cart lines of either order layout as {item_name | code, quantity, price}
+CART_LINES_EXPR = {"$ifNull": ["$cart_items", {"$map": {
+    "input": {"$ifNull": [f"${CART_FIELD}", []]},
+    "as": "line",
+    "in": {
+        "code": {"$arrayElemAt": ["$$line", 0]},
+        "quantity": {"$arrayElemAt": ["$$line", 1]},
+        "price": {"$arrayElemAt": ["$$line", 2]},
+    },
+}}]}
+
+
+def _day_range(day: str) -> dict:
+    start = datetime.strptime(day, "%Y-%m-%d")
+    return {"created_at": {"$gte": start, "$lt": start + timedelta(days=1)}}
+
+
+def _range_query(field: str, start: Optional[str], end: Optional[str]) -> dict:
+    if not (start or end):
+        return {}
+    bounds = {}
+    if start:
+        bounds["$gte"] = start
+    if end:
+        bounds["$lte"] = end
+    return {field: bounds}
+
+
+def item_sales_pipeline(match: dict, source: str, refreshed_at: datetime) -> List[dict]:
+    return [
+        {"$match": {"$and": [match, SOLD_MATCH, {"created_at": {"$type": "date"}}]}},
+        {"$project": {"created_at": 1, "lines": CART_LINES_EXPR}},
+        {"$unwind": "$lines"},
+        {"$group": {
+            "_id": {"day": DAY_EXPR, "item_name": "$lines.item_name", "code": "$lines.code"},
+            "quantity": {"$sum": "$lines.quantity"},
+            "revenue": {"$sum": {"$multiply": ["$lines.price", "$lines.quantity"]}},
+            "orders": {"$sum": 1},
+        }},
+        {"$lookup": {
+            "from": ITEM_NAMES_COLLECTION,
+            "localField": "_id.code",
+            "foreignField": "_id",
+            "as": "interned",
+        }},
+        # A name can arrive both spelled out and as a code
+        {"$group": {
+            "_id": {
+                "day": "$_id.day",
+                "item_name": {"$ifNull": ["$_id.item_name", {"$arrayElemAt": ["$interned.name", 0]}]},
+            },
+            "quantity": {"$sum": "$quantity"},
+            "revenue": {"$sum": "$revenue"},
+            "orders": {"$sum": "$orders"},
+        }},
+        {"$project": {
+            "_id": 0,
+            "day": "$_id.day",
+            "item_name": "$_id.item_name",
+            "source": {"$literal": source},
+            "quantity": 1,
+            "revenue": 1,
+            "orders": 1,
+            "refreshed_at": {"$literal": refreshed_at},
+        }},
+        {"$merge": {
+            "into": ITEM_SALES_COLLECTION,
+            "on": ITEM_SALES_KEY,
+            "whenMatched": "replace",
+            "whenNotMatched": "insert",
+        }},
+    ]
+
+
+async def refresh_item_sales(db) -> dict:
+    """Recompute the item sales of every day with orders changed since the watermark"""
+    # $merge needs the unique index on its `on` fields, even if startup skipped indexes
+    await db[ITEM_SALES_COLLECTION].create_indexes(
+        [spec.to_model() for spec in INDEXES if spec.collection == ITEM_SALES_COLLECTION]
+    )
+    refreshed_at = datetime.utcnow()
+    mark = await db.counters.find_one({"_id": WATERMARK_ID})
+
+    if mark is None:
+        days = None
+        match = {}
+    else:
+        changed = await db.orders.aggregate([
+            {"$match": {"updated_at": {"$gte": mark["updated_at"]}, "created_at": {"$type": "date"}}},
+            {"$group": {"_id": DAY_EXPR}},
+        ]).to_list(None)
+        days = sorted(row["_id"] for row in changed)
+        match = {"$or": [_day_range(day) for day in days]}
+
+    if days != []:
+        for source, collection in SOURCES.items():
+            await db[collection].aggregate(item_sales_pipeline(match, source, refreshed_at)).to_list(None)
+        # Rows of refreshed days that no longer have sales
+        stale = {"refreshed_at": {"$lt": refreshed_at}}
+        if days is not None:
+            stale["day"] = {"$in": days}
+        await db[ITEM_SALES_COLLECTION].delete_many(stale)
+
+    await db.counters.update_one(
+        {"_id": WATERMARK_ID},
+        {"$set": {"updated_at": refreshed_at - timedelta(seconds=ANALYTICS_WATERMARK_LAG_SECONDS)}},
+        upsert=True
+    )
+    summary = {"full": days is None, "days": len(days) if days is not None else None}
+    logger.info(f"Refreshed item sales: {summary}")
+    return summary
+
+
+async def item_sales(db, start: Optional[str] = None, end: Optional[str] = None) -> List[dict]:
+    """Per-item totals for days in [start, end] (YYYY-MM-DD), with menu categories"""
+    rows, menu = await asyncio.gather(
+        db[ITEM_SALES_COLLECTION].aggregate([
+            {"$match": _range_query("day", start, end)},
+            {"$group": {
+                "_id": "$item_name",
+                "quantity": {"$sum": "$quantity"},
+                "revenue": {"$sum": "$revenue"},
+                "orders": {"$sum": "$orders"},
+            }},
+        ]).to_list(None),
+        db.menu.find({}, {"_id": 0, "name": 1, "category": 1}).to_list(None)
+    )
+    categories = {item.get("name"): item.get("category") for item in menu}
+    return [
+        {"item_name": row["_id"], "category": categories.get(row["_id"]),
+         "quantity": row["quantity"], "revenue": row["revenue"], "orders": row["orders"]}
+        for row in rows
+    ]
+
+
+def category_sales(items: List[dict]) -> List[dict]:
+    """Fold item totals into categories; items no longer on the menu have category None"""
+    categories = {}
+    for item in items:
+        totals = categories.setdefault(item["category"], {"quantity": 0, "revenue": 0, "orders": 0})
+        for field in totals:
+            totals[field] += item[field]
+    return sorted(
+        ({"category": category, **totals} for category, totals in categories.items()),
+        key=lambda row: -row["revenue"]
+    )
+
+
+async def hour_of_week_heatmap(db, start: Optional[str] = None, end: Optional[str] = None) -> List[dict]:
+    """168 cells (weekday 0 = Monday, UTC hour) of orders and revenue, cancelled orders excluded"""
+    query = _range_query("day", start, end)
+    query["status"] = {"$ne": "cancelled"}
+    rows = await db[ROLLUP_COLLECTION].aggregate([
+        {"$match": query},
+        {"$group": {"_id": {"day": "$day", "hour": "$hour"}, "orders": {"$sum": "$orders"}, "revenue": {"$sum": "$revenue"}}},
+    ]).to_list(None)
+
+    cells = {(weekday, hour): {"orders": 0, "revenue": 0} for weekday in range(7) for hour in range(24)}
+    for row in rows:
+        cell = cells[(date.fromisoformat(row["_id"]["day"]).weekday(), row["_id"]["hour"])]
+        cell["orders"] += row["orders"]
+        cell["revenue"] += row["revenue"]
+    return [{"weekday": weekday, "hour": hour, **totals} for (weekday, hour), totals in sorted(cells.items())]
+
+
+class AnalyticsRefreshJob:
+    def __init__(self, interval_seconds: float = ANALYTICS_REFRESH_SECONDS):
+        self.interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.last_run: Optional[datetime] = None
+        self.last_summary: Optional[dict] = None
+
+    def start(self, db):
+        self._task = asyncio.create_task(self._loop(db))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run(self, db) -> dict:
+        self.last_summary = await refresh_item_sales(db)
+        self.runs += 1
+        self.last_run = datetime.utcnow()
+        return self.last_summary
+
+    async def _loop(self, db):
+        while True:
+            try:
+                await self.run(db)
+            except Exception as e:
+                logger.error(f"Item sales refresh failed: {str(e)}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def stats(self) -> dict:
+        return {
+            "interval_seconds": self.interval_seconds,
+            "runs": self.runs,
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+            "last_summary": self.last_summary,
+        }
+
+
+analytics_refresh = AnalyticsRefreshJob()
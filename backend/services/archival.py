@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Hot/cold archival of finished orders.
+
+Orders in a terminal status older than ARCHIVE_AFTER_DAYS are moved from
+`orders` into `orders_archive` in batches: copy, then delete. A crash
+between the two steps is harmless because the next run finds the copies
+already archived (same _id) and only finishes the delete.
+
+Archived documents are compacted: values equal to the order defaults and
+the per-item subtotals are dropped, and expand_order() puts them back on
+read, so an archived order reads back as it was stored. Hot orders stored in the v2 layout (order_schema) are
+decoded first, so the archive holds one layout. On MongoDB the archive
+collection is also created with zstd block compression.
+
+Archiving leaves the sales rollups untouched, so dashboard totals keep
+counting archived orders.
+
+Usage:
+    python -m backend.services.archival --run-once
+"""
+
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+from pymongo.errors import BulkWriteError, CollectionInvalid
+import argparse
+import asyncio
+import copy
+import logging
+import os
+
+from backend.services.order_schema import ORDER_DEFAULTS, decode_orders
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_ENABLED = os.getenv('ARCHIVE_ENABLED', 'false').lower() == 'true'
+ARCHIVE_AFTER_DAYS = int(os.getenv('ARCHIVE_AFTER_DAYS', '30'))
+ARCHIVE_BATCH_SIZE = int(os.getenv('ARCHIVE_BATCH_SIZE', '500'))
+ARCHIVE_INTERVAL_SECONDS = float(os.getenv('ARCHIVE_INTERVAL_SECONDS', '3600'))
+ARCHIVE_STATUSES = [s.strip() for s in os.getenv('ARCHIVE_STATUSES', 'delivered,cancelled,completed').split(',') if s.strip()]
+
+ARCHIVE_COLLECTION = "orders_archive"
+# Pause between batches so archiving never monopolises the database
+BATCH_PAUSE_SECONDS = 0.05
+DUPLICATE_KEY = 11000
+
+
+def _derived(value, expected) -> bool:
+    # Same type too, so 0 never stands in for 0.0 or "" for None
+    return type(value) is type(expected) and value == expected
+
+
+def compact_order(order: dict) -> dict:
+    compact = {
+        key: value for key, value in order.items()
+        if not (key in ORDER_DEFAULTS and _derived(value, ORDER_DEFAULTS[key]))
+    }
+    if compact.get("cart_items"):
+        compact["cart_items"] = [
+            {k: v for k, v in item.items() if not (k == "subtotal" and _derived(v, item.get("price", 0) * item.get("quantity", 0)))}
+            for item in compact["cart_items"]
+        ]
+    return compact
+
+
+def expand_order(order: dict) -> dict:
+    for key, default in ORDER_DEFAULTS.items():
+        order.setdefault(key, copy.copy(default))
+    for item in order["cart_items"]:
+        if "subtotal" not in item and "price" in item and "quantity" in item:
+            item["subtotal"] = item["price"] * item["quantity"]
+    return order
+
+
+async def ensure_archive_collection(db):
+    try:
+        await db.create_collection(
+            ARCHIVE_COLLECTION,
+            storageEngine={"wiredTiger": {"configString": "block_compressor=zstd"}}
+        )
+    except CollectionInvalid:
+        pass  # already exists
+    except Exception as e:
+        # e.g. a server without zstd; the collection is then created on first insert
+        logger.warning(f"Could not create compressed {ARCHIVE_COLLECTION}: {str(e)}")
+
+
+async def archive_batch(db, cutoff: datetime, batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+    """Move one batch of finished orders older than cutoff; returns how many moved"""
+    orders = await db.orders.find(
+        {"status": {"$in": ARCHIVE_STATUSES}, "created_at": {"$lt": cutoff}}
+    ).sort("created_at", 1).limit(batch_size).to_list(batch_size)
+    if not orders:
+        return 0
+
+    archived_ids = set()
+    try:
+        await db[ARCHIVE_COLLECTION].insert_many(
+            [compact_order(order) for order in await decode_orders(db, orders)], ordered=False
+        )
+        archived_ids = {order["_id"] for order in orders}
+    except BulkWriteError as e:
+        errors = e.details.get("writeErrors", [])
+        failed = {err["index"] for err in errors if err.get("code") != DUPLICATE_KEY}
+        # Duplicates were copied by an earlier run that stopped before deleting
+        archived_ids = {order["_id"] for i, order in enumerate(orders) if i not in failed}
+        if failed:
+            logger.error(f"{len(failed)} orders could not be archived: {errors[0].get('errmsg')}")
+
+    moved = [order for order in orders if order["_id"] in archived_ids]
+    if not moved:
+        return 0
+    result = await db.orders.delete_many({"_id": {"$in": [order["_id"] for order in moved]}})
+    return result.deleted_count
+
+
+async def run_archival(db, after_days: int = ARCHIVE_AFTER_DAYS, batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+    """Archive every eligible order, one batch at a time"""
+    await ensure_archive_collection(db)
+    cutoff = datetime.utcnow() - timedelta(days=after_days)
+    total = 0
+    while True:
+        moved = await archive_batch(db, cutoff, batch_size)
+        total += moved
+        if moved < batch_size:
+            break
+        await asyncio.sleep(BATCH_PAUSE_SECONDS)
+    if total:
+        logger.info(f"Archived {total} orders older than {cutoff.isoformat()}")
+    return total
+
+
+class ArchivalJob:
+    def __init__(self, interval_seconds: float = ARCHIVE_INTERVAL_SECONDS, enabled: bool = ARCHIVE_ENABLED):
+        self.interval_seconds = interval_seconds
+        self.enabled = enabled
+        self._task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.archived = 0
+        self.last_run: Optional[datetime] = None
+
+    def start(self, db):
+        self._task = asyncio.create_task(self._loop(db))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self, db):
+        while True:
+            try:
+                self.archived += await run_archival(db)
+                self.runs += 1
+                self.last_run = datetime.utcnow()
+            except Exception as e:
+                logger.error(f"Order archival failed: {str(e)}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "runs": self.runs,
+            "archived": self.archived,
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+        }
+
+
+archival_job = ArchivalJob()
+
+
+async def main():
+    """CLI: archive eligible orders once"""
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Move finished orders into orders_archive")
+    parser.add_argument("--run-once", action="store_true", help="Archive eligible orders and exit")
+    parser.add_argument("--after-days", type=int, default=ARCHIVE_AFTER_DAYS, help="Minimum order age in days")
+    args = parser.parse_args()
+
+    load_dotenv(Path(__file__).parent.parent / '.env')
+    client = AsyncIOMotorClient(os.getenv('MONGO_URL', 'mongodb://localhost:27017'))
+    db = client[os.getenv('DB_NAME', 'restaurant_db')]
+
+    moved = await run_archival(db, after_days=args.after_days)
+    print(f"✅ Archived {moved} orders older than {args.after_days} days")
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
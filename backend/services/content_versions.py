@@ -0,0 +1,52 @@
+"""
+Per-collection content versions and strong ETags.
+
+Every write to a cached collection bumps its version. Read endpoints derive
+their ETag from (collection, version, query parameters), so a matching
+If-None-Match can be answered with 304 before any database or
+serialization work happens. The per-process nonce keeps tags from two
+server processes (or two restarts) from ever colliding.
+"""
+
+from typing import Optional
+import hashlib
+import uuid
+
+
+class ContentVersions:
+    """Monotonic version counter per collection"""
+
+    def __init__(self):
+        self._versions = {}
+        self._nonce = uuid.uuid4().hex[:12]
+
+    def current(self, collection: str) -> int:
+        return self._versions.get(collection, 0)
+
+    def bump(self, collection: str) -> int:
+        version = self.current(collection) + 1
+        self._versions[collection] = version
+        return version
+
+    def etag(self, collection: str, *parts) -> str:
+        """Strong ETag for a read of `collection` with the given query parameters"""
+        raw = f"{self._nonce}:{collection}:{self.current(collection)}:{parts!r}"
+        return '"' + hashlib.sha1(raw.encode()).hexdigest()[:24] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Evaluate an If-None-Match header against an ETag (RFC 9110 weak comparison)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+content_versions = ContentVersions()
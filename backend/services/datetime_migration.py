@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+One-shot migration of ISO string timestamps to BSON dates.
+
+`specials` (created_at, updated_at) and `status_checks` (timestamp) used to
+store their times as ISO 8601 strings, which every read then had to parse
+and which sort and range-query as text. New writes store dates; this
+converts what is already stored.
+
+Documents are converted in `_id` order, one bulk write per batch. Each
+update only applies if the field still holds the string that was read, so
+the migration is safe to run while the API is serving.
+
+Read paths go through utc_collection(), which has the driver return the
+dates already marked UTC, so responses keep the offset the strings had.
+After every batch the last `_id` is checkpointed in `counters`, so an
+interrupted run resumes where it stopped; `--restart` scans from the
+beginning again. Strings that do not parse are left as they are and
+counted.
+
+Usage:
+    python -m backend.services.datetime_migration
+    python -m backend.services.datetime_migration --collection specials --batch-size 200
+    python -m backend.services.datetime_migration --restart
+"""
+
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+from bson.codec_options import CodecOptions
+from pymongo import UpdateOne
+import argparse
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+DATETIME_FIELDS = {
+    "specials": ("created_at", "updated_at"),
+    "status_checks": ("timestamp",),
+}
+MIGRATION_BATCH_SIZE = 500
+CHECKPOINT_PREFIX = "datetime_migration:"
+# Aware datetimes in UTC, the driver's default zone when tz_aware is set
+UTC_CODEC_OPTIONS = CodecOptions(tz_aware=True)
+
+
+def parse_timestamp(value: str) -> Optional[datetime]:
+    """An ISO 8601 string as the naive UTC datetime MongoDB stores, None if unparseable"""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def utc_collection(db, name: str):
+    """`db[name]` returning its dates as aware UTC datetimes"""
+    return db.get_collection(name, codec_options=UTC_CODEC_OPTIONS)
+
+
+def parse_unmigrated(doc: dict, fields: Tuple[str, ...]) -> dict:
+    """Parse timestamps in `fields` still stored as strings, as aware UTC"""
+    # Only documents the migration has not reached yet; remove once it has
+    # run on every deployment
+    for field in fields:
+        value = doc.get(field)
+        if isinstance(value, str):
+            parsed = parse_timestamp(value)
+            if parsed is not None:
+                doc[field] = parsed.replace(tzinfo=timezone.utc)
+    return doc
+
+
+async def migrate_collection(
+    db,
+    collection: str,
+    fields: Tuple[str, ...],
+    batch_size: int = MIGRATION_BATCH_SIZE,
+    restart: bool = False,
+    progress: Optional[Callable[[str, dict], None]] = None,
+) -> dict:
+    """Convert string timestamps in `fields` of one collection, resuming from its checkpoint"""
+    checkpoint_id = f"{CHECKPOINT_PREFIX}{collection}"
+    checkpoint = None if restart else await db.counters.find_one({"_id": checkpoint_id})
+    last_id = checkpoint.get("last_id") if checkpoint else None
+    totals = {
+        key: checkpoint.get(key, 0) if checkpoint else 0
+        for key in ("scanned", "converted", "unparseable")
+    }
+
+    has_strings = {"$or": [{field: {"$type": "string"}} for field in fields]}
+    while True:
+        query = has_strings if last_id is None else {**has_strings, "_id": {"$gt": last_id}}
+        docs = await db[collection].find(query, {field: 1 for field in fields}) \
+            .sort("_id", 1).limit(batch_size).to_list(batch_size)
+        if not docs:
+            break
+
+        operations = []
+        for doc in docs:
+            match, converted = {"_id": doc["_id"]}, {}
+            for field in fields:
+                value = doc.get(field)
+                if not isinstance(value, str):
+                    continue
+                parsed = parse_timestamp(value)
+                if parsed is None:
+                    totals["unparseable"] += 1
+                    logger.warning(f"{collection} {doc['_id']}: cannot parse {field}={value!r}")
+                    continue
+                # Only if no one rewrote the field since it was read
+                match[field] = value
+                converted[field] = parsed
+            if converted:
+                operations.append(UpdateOne(match, {"$set": converted}))
+
+        if operations:
+            result = await db[collection].bulk_write(operations, ordered=False)
+            totals["converted"] += result.modified_count
+        totals["scanned"] += len(docs)
+        last_id = docs[-1]["_id"]
+        await db.counters.update_one(
+            {"_id": checkpoint_id},
+            {"$set": {"last_id": last_id, **totals, "updated_at": datetime.utcnow()}},
+            upsert=True
+        )
+        if progress is not None:
+            progress(collection, totals)
+
+    logger.info(
+        f"{collection}: {totals['converted']} documents converted, "
+        f"{totals['unparseable']} unparseable timestamps left as strings"
+    )
+    return totals
+
+
+async def migrate_datetimes(db, collections=None, batch_size: int = MIGRATION_BATCH_SIZE,
+                            restart: bool = False, progress=None) -> dict:
+    """Run the migration for every (or the named) collection"""
+    return {
+        collection: await migrate_collection(db, collection, fields, batch_size, restart, progress)
+        for collection, fields in DATETIME_FIELDS.items()
+        if not collections or collection in collections
+    }
+
+
+async def main():
+    """CLI: convert stored timestamp strings to dates"""
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Convert ISO string timestamps to BSON dates")
+    parser.add_argument("--collection", action="append", choices=sorted(DATETIME_FIELDS),
+                        help="Only migrate this collection (repeatable)")
+    parser.add_argument("--batch-size", type=int, default=MIGRATION_BATCH_SIZE, help="Documents per bulk write")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and scan from the start")
+    args = parser.parse_args()
+
+    load_dotenv(Path(__file__).parent.parent / '.env')
+    client = AsyncIOMotorClient(os.getenv('MONGO_URL', 'mongodb://localhost:27017'))
+    db = client[os.getenv('DB_NAME', 'restaurant_db')]
+
+    def report(collection: str, totals: dict):
+        print(f"⏳ {collection}: {totals['scanned']} scanned, {totals['converted']} converted, "
+              f"{totals['unparseable']} unparseable")
+
+    results = await migrate_datetimes(db, args.collection, max(1, args.batch_size), args.restart, report)
+    for collection, totals in results.items():
+        print(f"✅ {collection}: {totals['converted']} documents converted")
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,188 @@
+"""
+Queue-aware delivery time estimates.
+
+The model lives in memory and is cheap to query (dictionary lookups and a
+little arithmetic), so an estimate is computed for every new order:
+
+    kitchen = median time from pending to the first "done" status (ready, out_for_delivery, ...)
+    wait    = kitchen * (active kitchen orders // ETA_KITCHEN_CAPACITY), at most ETA_MAX_WAIT_MINUTES
+    travel  = median out_for_delivery -> delivered for the delivery area (0 for pickup)
+
+Durations come from the `status_times` every status change stamps on the
+order, and the median of every status transition is kept for the metrics
+endpoint. They are learned live from this worker's status changes and
+reloaded every ETA_REFRESH_SECONDS from recently updated orders, which
+also brings in other workers' changes. Until a figure has ETA_MIN_SAMPLES
+observations, its ETA_DEFAULT_* value is used.
+
+Active kitchen orders are the kitchen queue's, which only holds orders
+placed in the last KITCHEN_MAX_AGE_MINUTES; the wait cap keeps a bad count
+from promising a multi-hour delivery.
+"""
+
+from collections import deque
+from datetime import datetime, timedelta
+from statistics import median
+from typing import Optional
+from backend.services.kitchen_queue import kitchen_queue
+import asyncio
+import logging
+import math
+import os
+
+logger = logging.getLogger(__name__)
+
+ETA_REFRESH_SECONDS = float(os.getenv('ETA_REFRESH_SECONDS', '300'))
+ETA_HISTORY_DAYS = int(os.getenv('ETA_HISTORY_DAYS', '7'))
+ETA_WINDOW_SIZE = int(os.getenv('ETA_WINDOW_SIZE', '50'))
+ETA_MIN_SAMPLES = int(os.getenv('ETA_MIN_SAMPLES', '5'))
+ETA_KITCHEN_CAPACITY = int(os.getenv('ETA_KITCHEN_CAPACITY', '4'))
+ETA_DEFAULT_PREP_MINUTES = float(os.getenv('ETA_DEFAULT_PREP_MINUTES', '20'))
+ETA_DEFAULT_DELIVERY_MINUTES = float(os.getenv('ETA_DEFAULT_DELIVERY_MINUTES', '25'))
+ETA_MAX_WAIT_MINUTES = float(os.getenv('ETA_MAX_WAIT_MINUTES', '60'))
+ETA_HISTORY_LIMIT = 5000
+# Width of the range shown to customers, e.g. "35-50 minutes"
+ETA_RANGE_MINUTES = 15
+
+KITCHEN = ("kitchen",)
+KITCHEN_DONE_STATUSES = ("ready", "out_for_delivery", "completed", "delivered")
+DELIVERY_STEP = ("out_for_delivery", "delivered")
+PICKUP_ORDER_TYPES = ("pickup", "takeaway", "dine_in")
+
+
+def _minutes(start, end) -> Optional[float]:
+    if not isinstance(start, datetime) or not isinstance(end, datetime):
+        return None
+    minutes = (end - start) / timedelta(minutes=1)
+    # Clock skew or a reopened order; not a real duration
+    return minutes if minutes >= 0 else None
+
+
+def format_range(minutes: float) -> str:
+    low = max(5, int(math.floor(minutes / 5) * 5))
+    return f"{low}-{low + ETA_RANGE_MINUTES} minutes"
+
+
+class EtaModel:
+    def __init__(self, window_size: int = ETA_WINDOW_SIZE, refresh_seconds: float = ETA_REFRESH_SECONDS):
+        self.window_size = window_size
+        self.refresh_seconds = refresh_seconds
+        self._db = None
+        self._task: Optional[asyncio.Task] = None
+        self._reset()
+        self.observed = 0
+        self.refreshes = 0
+        self.last_refresh: Optional[datetime] = None
+
+    def _reset(self):
+        self._windows = {}
+        self._medians = {}
+
+    def set_database(self, database):
+        self._db = database
+        self._reset()
+
+    def _record(self, key: tuple, minutes: Optional[float]):
+        if minutes is None:
+            return
+        window = self._windows.setdefault(key, deque(maxlen=self.window_size))
+        window.append(minutes)
+        # Keep estimates to lookups: the median is recomputed here, not per estimate
+        self._medians[key] = median(window) if len(window) >= ETA_MIN_SAMPLES else None
+
+    def _kitchen_done_at(self, times: dict) -> Optional[datetime]:
+        done = [times[status] for status in KITCHEN_DONE_STATUSES if isinstance(times.get(status), datetime)]
+        return min(done) if done else None
+
+    def _record_order(self, order: dict):
+        times = order.get("status_times") or {}
+        self._record(KITCHEN, _minutes(times.get("pending"), self._kitchen_done_at(times)))
+        travel = _minutes(times.get(DELIVERY_STEP[0]), times.get(DELIVERY_STEP[1]))
+        self._record(("delivery", order.get("delivery_area") or ""), travel)
+        ordered = sorted((at, status) for status, at in times.items() if isinstance(at, datetime))
+        for (start, before), (end, after) in zip(ordered, ordered[1:]):
+            self._record((before, after), _minutes(start, end))
+
+    def observe(self, previous: dict, order: dict):
+        """Learn from one status change (`previous` is the order before it)"""
+        before, after = previous.get("status"), order.get("status")
+        if before == after:
+            return
+        times = previous.get("status_times") or {}
+        now = order.get("updated_at")
+        self._record((before, after), _minutes(times.get(before) or previous.get("updated_at"), now))
+        if after in KITCHEN_DONE_STATUSES and self._kitchen_done_at(times) is None:
+            self._record(KITCHEN, _minutes(times.get("pending") or previous.get("created_at"), now))
+        if (before, after) == DELIVERY_STEP:
+            self._record(("delivery", order.get("delivery_area") or ""), _minutes(times.get(before) or previous.get("updated_at"), now))
+        self.observed += 1
+
+    def kitchen_minutes(self) -> float:
+        learned = self._medians.get(KITCHEN)
+        return learned if learned is not None else ETA_DEFAULT_PREP_MINUTES
+
+    def _delivery_minutes(self, delivery_area: Optional[str]) -> float:
+        learned = self._medians.get(("delivery", delivery_area or ""))
+        return learned if learned is not None else ETA_DEFAULT_DELIVERY_MINUTES
+
+    def estimate(self, order_type: str = "delivery", delivery_area: Optional[str] = None) -> dict:
+        kitchen = self.kitchen_minutes()
+        kitchen_queue.expire()
+        queue_depth = len(kitchen_queue)
+        wait = min(kitchen * (queue_depth // max(1, ETA_KITCHEN_CAPACITY)), ETA_MAX_WAIT_MINUTES)
+        travel = 0 if order_type in PICKUP_ORDER_TYPES else self._delivery_minutes(delivery_area)
+        return {
+            "estimated_time": format_range(kitchen + wait),
+            "estimated_delivery_time": format_range(kitchen + wait + travel),
+            "kitchen_minutes": round(kitchen + wait, 1),
+            "delivery_minutes": round(travel, 1),
+            "queue_depth": queue_depth,
+        }
+
+    async def refresh(self) -> int:
+        """Rebuild the duration windows from recently updated orders"""
+        since = datetime.utcnow() - timedelta(days=ETA_HISTORY_DAYS)
+        orders = await self._db.orders.find(
+            {"updated_at": {"$gte": since}, "status_times": {"$exists": True}},
+            {"_id": 0, "status_times": 1, "delivery_area": 1}
+        ).sort([("updated_at", -1), ("id", -1)]).limit(ETA_HISTORY_LIMIT).to_list(ETA_HISTORY_LIMIT)
+        self._reset()
+        # Oldest first, so each window ends up holding the most recent durations
+        for order in reversed(orders):
+            self._record_order(order)
+        self.refreshes += 1
+        self.last_refresh = datetime.utcnow()
+        return len(orders)
+
+    def start(self, db):
+        self._db = db
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"ETA model refresh failed: {str(e)}")
+            await asyncio.sleep(self.refresh_seconds)
+
+    def stats(self) -> dict:
+        return {
+            "observed": self.observed,
+            "refreshes": self.refreshes,
+            "last_refresh": self.last_refresh.isoformat() if self.last_refresh else None,
+            "kitchen_minutes": round(self.kitchen_minutes(), 1),
+            "learned": {"/".join(key): round(value, 1) for key, value in self._medians.items() if value is not None},
+        }
+
+
+eta_model = EtaModel()
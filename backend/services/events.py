@@ -0,0 +1,114 @@
+"""
+In-process publish/subscribe for Server-Sent Events.
+
+Publishing never blocks: each subscriber owns a bounded queue. A subscriber
+that falls behind (a slow tablet on bad Wi-Fi) has its backlog dropped and
+receives a single `resync` event telling it to refetch, so one slow client
+can neither stall publishers nor pile up memory.
+"""
+
+from typing import AsyncIterator, Callable, Awaitable, Optional, Set
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+import asyncio
+import itertools
+import json
+import os
+
+EVENT_STREAM_BUFFER = int(os.getenv('EVENT_STREAM_BUFFER', '100'))
+EVENT_STREAM_MAX_CLIENTS = int(os.getenv('EVENT_STREAM_MAX_CLIENTS', '50'))
+EVENT_STREAM_HEARTBEAT_SECONDS = float(os.getenv('EVENT_STREAM_HEARTBEAT_SECONDS', '15'))
+
+RESYNC = "resync"
+
+
+class Subscription:
+    def __init__(self, broker: "EventBroker", buffer_size: int):
+        self.broker = broker
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max(2, buffer_size))
+        self.dropped = 0
+
+    def offer(self, event: tuple):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Too far behind: discard the backlog and ask the client to refetch
+            self.dropped += self.queue.qsize()
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait((event[0], RESYNC, {}))
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class EventBroker:
+    def __init__(self, name: str, buffer_size: int = EVENT_STREAM_BUFFER,
+                 max_clients: int = EVENT_STREAM_MAX_CLIENTS):
+        self.name = name
+        self.buffer_size = buffer_size
+        self.max_clients = max_clients
+        self._subscribers: Set[Subscription] = set()
+        self._ids = itertools.count(1)
+        self.published = 0
+
+    def subscribe(self) -> Subscription:
+        if len(self._subscribers) >= self.max_clients:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Too many {self.name} stream clients",
+                headers={"Retry-After": "10"}
+            )
+        subscription = Subscription(self, self.buffer_size)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self._subscribers.discard(subscription)
+
+    def publish(self, event_type: str, data: dict):
+        """Queue an event for every subscriber; never awaits"""
+        self.published += 1
+        if not self._subscribers:
+            return
+        event = (next(self._ids), event_type, jsonable_encoder(data))
+        for subscription in list(self._subscribers):
+            subscription.offer(event)
+
+    def stats(self) -> dict:
+        return {
+            "clients": len(self._subscribers),
+            "published": self.published,
+            "buffered": sum(s.queue.qsize() for s in self._subscribers),
+            "dropped": sum(s.dropped for s in self._subscribers),
+        }
+
+
+def format_sse(event_id: Optional[int], event_type: str, data: dict) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event_type}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def sse_stream(
+    subscription: Subscription,
+    is_disconnected: Callable[[], Awaitable[bool]],
+    heartbeat_seconds: float = EVENT_STREAM_HEARTBEAT_SECONDS
+) -> AsyncIterator[str]:
+    """Yield SSE frames for a subscription until the client goes away"""
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                event_id, event_type, data = await asyncio.wait_for(subscription.queue.get(), heartbeat_seconds)
+            except asyncio.TimeoutError:
+                if await is_disconnected():
+                    break
+                yield ": ping\n\n"
+                continue
+            yield format_sse(event_id, event_type, data)
+    finally:
+        subscription.close()
@@ -0,0 +1,209 @@
+"""
+Idempotency keys and duplicate-submit suppression for order creation.
+
+Checkout on a flaky connection retries POST /api/orders and
+/api/payment/create-razorpay-order. Two layers keep those retries from
+writing twice:
+
+1. Idempotency-Key header: the first request reserves the key in MongoDB
+   (TTL-indexed `idempotency_keys` collection) and stores its response when
+   done; retries replay that response. Completed keys are also kept in a
+   bounded in-memory map so replays usually skip the database.
+2. Duplicate window: identical submissions (same phone, cart, order type
+   and area) within DUPLICATE_SUBMIT_WINDOW_SECONDS replay the first
+   response even without a key.
+"""
+
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+from fastapi import HTTPException, status
+from fastapi.responses import JSONResponse
+from pymongo.errors import DuplicateKeyError
+import hashlib
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv('IDEMPOTENCY_TTL_SECONDS', str(24 * 3600)))
+IDEMPOTENCY_PENDING_TTL_SECONDS = 120
+IDEMPOTENCY_MEMORY_ENTRIES = int(os.getenv('IDEMPOTENCY_MEMORY_ENTRIES', '4096'))
+DUPLICATE_SUBMIT_WINDOW_SECONDS = float(os.getenv('DUPLICATE_SUBMIT_WINDOW_SECONDS', '30'))
+MAX_KEY_LENGTH = 128
+
+PENDING = "pending"
+DONE = "done"
+
+
+def submission_fingerprint(scope: str, phone: str, cart_items: Iterable, order_type: str,
+                           delivery_area: Optional[str]) -> str:
+    """Hash of everything that makes two submissions 'the same order'"""
+    digits = "".join(ch for ch in (phone or "") if ch.isdigit())
+    cart = sorted(
+        (item.item_name.strip().lower(), int(item.quantity), round(float(item.price), 2))
+        for item in cart_items or []
+    )
+    raw = json.dumps([scope, digits[-10:], cart, order_type, (delivery_area or "").strip().lower()])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _replay(record: dict) -> JSONResponse:
+    return JSONResponse(
+        status_code=record["status_code"],
+        content=record["body"],
+        headers={"Idempotent-Replayed": "true"}
+    )
+
+
+def _in_progress() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="An identical order is already being processed",
+        headers={"Retry-After": "1"}
+    )
+
+
+class IdempotencyStore:
+    def __init__(self, memory_entries: int = IDEMPOTENCY_MEMORY_ENTRIES,
+                 window_seconds: float = DUPLICATE_SUBMIT_WINDOW_SECONDS):
+        self.memory_entries = max(1, memory_entries)
+        self.window_seconds = window_seconds
+        self._db = None
+        # "scope:key" -> completed record
+        self._keys: "OrderedDict[str, dict]" = OrderedDict()
+        # fingerprint -> (monotonic expiry, record or None while pending)
+        self._recent: "OrderedDict[str, tuple]" = OrderedDict()
+        self.replays = 0
+        self.duplicates_suppressed = 0
+
+    def set_database(self, database):
+        self._db = database
+        self._keys.clear()
+        self._recent.clear()
+
+    @property
+    def collection(self):
+        return self._db.idempotency_keys
+
+    def _remember_key(self, record_id: str, record: dict):
+        self._keys[record_id] = record
+        self._keys.move_to_end(record_id)
+        while len(self._keys) > self.memory_entries:
+            self._keys.popitem(last=False)
+
+    def _sweep_recent(self, now: float):
+        while self._recent:
+            _, (expires, _) = next(iter(self._recent.items()))
+            if expires > now:
+                break
+            self._recent.popitem(last=False)
+
+    async def replay_or_reserve(self, scope: str, key: Optional[str], fingerprint: str) -> Optional[JSONResponse]:
+        """
+        Return the stored response for a retry, or None after reserving the
+        submission for the caller, who must then call complete() or release().
+        """
+        now = time.monotonic()
+        self._sweep_recent(now)
+
+        if key is not None:
+            if not key or len(key) > MAX_KEY_LENGTH:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters"
+                )
+            record_id = f"{scope}:{key}"
+            record = self._keys.get(record_id)
+            if record is None:
+                record = await self._reserve_key(record_id, fingerprint)
+            if record is not None:
+                if record.get("fingerprint") != fingerprint:
+                    raise HTTPException(
+                        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                        detail="Idempotency-Key was already used for a different order"
+                    )
+                if record.get("state") != DONE:
+                    raise _in_progress()
+                self.replays += 1
+                return _replay(record)
+
+        recent = self._recent.get(fingerprint)
+        if recent is not None:
+            if recent[1] is None:
+                await self.release(scope, key)
+                raise _in_progress()
+            self.duplicates_suppressed += 1
+            if key is not None:
+                # Bind the key to the first order so its own retries replay it too
+                await self.complete(scope, key, fingerprint, recent[1]["status_code"], recent[1]["body"])
+            return _replay(recent[1])
+
+        if self.window_seconds > 0:
+            self._recent[fingerprint] = (now + self.window_seconds, None)
+        return None
+
+    async def _reserve_key(self, record_id: str, fingerprint: str) -> Optional[dict]:
+        """Insert a pending record; return the existing one if the key is taken"""
+        try:
+            await self.collection.insert_one({
+                "_id": record_id,
+                "state": PENDING,
+                "fingerprint": fingerprint,
+                "expires_at": datetime.utcnow() + timedelta(seconds=IDEMPOTENCY_PENDING_TTL_SECONDS)
+            })
+            return None
+        except DuplicateKeyError:
+            existing = await self.collection.find_one({"_id": record_id})
+            if existing is None:
+                # Expired between the insert and the read; treat as a conflict
+                return {"fingerprint": fingerprint, "state": PENDING}
+            if existing.get("state") == DONE:
+                self._remember_key(record_id, existing)
+            return existing
+
+    async def complete(self, scope: str, key: Optional[str], fingerprint: str, status_code: int, body):
+        """Store the response so retries replay it"""
+        record = {"state": DONE, "fingerprint": fingerprint, "status_code": status_code, "body": body}
+        if self.window_seconds > 0:
+            self._recent[fingerprint] = (time.monotonic() + self.window_seconds, record)
+            self._recent.move_to_end(fingerprint)
+        if key is None:
+            return
+        record_id = f"{scope}:{key}"
+        self._remember_key(record_id, record)
+        try:
+            await self.collection.update_one(
+                {"_id": record_id},
+                {"$set": {**record, "expires_at": datetime.utcnow() + timedelta(seconds=IDEMPOTENCY_TTL_SECONDS)}},
+                upsert=True
+            )
+        except Exception as e:
+            # The order exists; losing the replay record only weakens dedup
+            logger.error(f"Failed to store idempotency record {record_id}: {str(e)}")
+
+    async def release(self, scope: str, key: Optional[str], fingerprint: Optional[str] = None):
+        """Drop a reservation after a failed attempt so the client can retry"""
+        if fingerprint is not None:
+            recent = self._recent.get(fingerprint)
+            if recent is not None and recent[1] is None:
+                self._recent.pop(fingerprint, None)
+        if key is None:
+            return
+        try:
+            await self.collection.delete_one({"_id": f"{scope}:{key}", "state": PENDING})
+        except Exception as e:
+            logger.error(f"Failed to release idempotency key {scope}:{key}: {str(e)}")
+
+    def stats(self) -> dict:
+        return {
+            "keys_in_memory": len(self._keys),
+            "recent_submissions": len(self._recent),
+            "replays": self.replays,
+            "duplicates_suppressed": self.duplicates_suppressed,
+        }
+
+
+idempotency = IdempotencyStore()
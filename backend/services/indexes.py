@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Declarative index registry for every MongoDB collection the API queries.
+
+server.py applies the registry at startup. The same module doubles as a
+CLI that diffs the declared indexes against the live database:
+
+Usage:
+    python -m backend.services.indexes --report
+    python -m backend.services.indexes --apply
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Tuple
+from pymongo import IndexModel
+from pymongo.errors import OperationFailure
+import argparse
+import asyncio
+import logging
+import os
+import sys
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    collection: str
+    keys: Tuple[Tuple[str, int], ...]
+    name: str
+    unique: bool = False
+    sparse: bool = False
+    options: dict = field(default_factory=dict, hash=False, compare=False)
+
+    def to_model(self) -> IndexModel:
+        kwargs = dict(self.options)
+        if self.unique:
+            kwargs["unique"] = True
+        if self.sparse:
+            kwargs["sparse"] = True
+        return IndexModel(list(self.keys), name=self.name, **kwargs)
+
+
+# Legacy documents (and the test fixtures) may lack `id`, so the unique
+# indexes on application ids are sparse.
+INDEXES: List[IndexSpec] = [
+    # orders
+    IndexSpec("orders", (("id", 1),), "orders_id_unique", unique=True, sparse=True),
+    IndexSpec("orders", (("order_number", 1),), "orders_order_number_unique", unique=True, sparse=True),
+    # status updates also match legacy documents keyed by order_id
+    IndexSpec("orders", (("order_id", 1),), "orders_order_id", sparse=True),
+    # keyset pagination: (created_at, id) newest first, optionally per status
+    IndexSpec("orders", (("status", 1), ("created_at", -1), ("id", -1)), "orders_status_created_at_id"),
+    IndexSpec("orders", (("created_at", -1), ("id", -1)), "orders_created_at_id"),
+    # kitchen queue rebuild: open statuses placed since the age cutoff, paid check in the index
+    IndexSpec(
+        "orders", (("status", 1), ("created_at", 1), ("payment_method", 1), ("payment_status", 1)),
+        "orders_kitchen_active"
+    ),
+    # delta sync: changes since an (updated_at, id) token
+    IndexSpec("orders", (("updated_at", 1), ("id", 1)), "orders_updated_at_id"),
+    # archived orders: point lookups and exports by date
+    IndexSpec("orders_archive", (("id", 1),), "orders_archive_id_unique", unique=True, sparse=True),
+    IndexSpec("orders_archive", (("order_number", 1),), "orders_archive_order_number_unique", unique=True, sparse=True),
+    IndexSpec("orders_archive", (("created_at", 1),), "orders_archive_created_at"),
+    # sales rollups: one row per bucket, upserted by the full key
+    IndexSpec("sales_rollups", (("day", 1), ("hour", 1), ("status", 1), ("payment_method", 1), ("order_type", 1)),
+              "sales_rollups_bucket_unique", unique=True),
+    # item sales view: $merge target, so the merge key must be unique
+    IndexSpec("item_sales_daily", (("day", 1), ("item_name", 1), ("source", 1)), "item_sales_daily_key_unique", unique=True),
+    # order item names: interned once per distinct name
+    IndexSpec("order_item_names", (("name", 1),), "order_item_names_name_unique", unique=True),
+    # menu
+    IndexSpec("menu", (("category", 1), ("available", 1)), "menu_category_available"),
+    IndexSpec("menu", (("id", 1),), "menu_id_unique", unique=True, sparse=True),
+    # specials
+    IndexSpec("specials", (("id", 1),), "specials_id_unique", unique=True),
+    IndexSpec("specials", (("created_at", -1),), "specials_created_at"),
+    # status checks: time-range reads (timestamps are dates since the datetime migration)
+    IndexSpec("status_checks", (("timestamp", -1),), "status_checks_timestamp"),
+    # admins
+    IndexSpec("admins", (("username", 1),), "admins_username_unique", unique=True),
+    # idempotency keys expire on their own
+    IndexSpec("idempotency_keys", (("expires_at", 1),), "idempotency_keys_ttl", options={"expireAfterSeconds": 0}),
+    # unredeemed stream tickets too
+    IndexSpec("stream_tickets", (("expires_at", 1),), "stream_tickets_ttl", options={"expireAfterSeconds": 0}),
+]
+
+
+def _collections() -> List[str]:
+    return sorted({spec.collection for spec in INDEXES})
+
+
+async def ensure_indexes(db) -> dict:
+    """Create every declared index; failures are logged and reported, never raised"""
+    summary = {"created": [], "failed": []}
+    for spec in INDEXES:
+        try:
+            await db[spec.collection].create_indexes([spec.to_model()])
+            summary["created"].append(spec.name)
+        except OperationFailure as e:
+            # Typically an index with the same keys but other options, or a
+            # unique index over duplicated data; needs a human either way
+            logger.error(f"Index {spec.collection}.{spec.name} could not be created: {str(e)}")
+            summary["failed"].append(spec.name)
+    logger.info(f"Indexes ensured: {len(summary['created'])} ok, {len(summary['failed'])} failed")
+    return summary
+
+
+def _live_key(info: dict) -> Tuple[Tuple[str, int], ...]:
+    return tuple((name, int(direction) if isinstance(direction, (int, float)) else direction)
+                 for name, direction in info["key"])
+
+
+async def diff_indexes(db) -> dict:
+    """Compare declared indexes with the live ones, per collection"""
+    report = {}
+    for collection in _collections():
+        declared = [spec for spec in INDEXES if spec.collection == collection]
+        try:
+            live = await db[collection].index_information()
+        except OperationFailure:
+            live = {}
+        live_by_key = {_live_key(info): (name, info) for name, info in live.items()}
+
+        missing, mismatched = [], []
+        for spec in declared:
+            found = live_by_key.get(spec.keys)
+            if found is None:
+                missing.append(spec.name)
+                continue
+            name, info = found
+            if bool(info.get("unique")) != spec.unique or bool(info.get("sparse")) != spec.sparse:
+                mismatched.append(f"{spec.name} (live: {name}, unique={bool(info.get('unique'))}, sparse={bool(info.get('sparse'))})")
+
+        declared_keys = {spec.keys for spec in declared}
+        extra = [name for key, (name, _) in live_by_key.items() if key not in declared_keys and name != "_id_"]
+
+        report[collection] = {"missing": missing, "mismatched": mismatched, "extra": sorted(extra)}
+    return report
+
+
+async def main():
+    """CLI: print or apply the index diff"""
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Create or verify MongoDB indexes")
+    parser.add_argument("--apply", action="store_true", help="Create missing indexes before reporting")
+    parser.add_argument("--report", action="store_true", help="Report declared vs live indexes (default)")
+    args = parser.parse_args()
+
+    load_dotenv(Path(__file__).parent.parent / '.env')
+    client = AsyncIOMotorClient(os.getenv('MONGO_URL', 'mongodb://localhost:27017'))
+    db = client[os.getenv('DB_NAME', 'restaurant_db')]
+
+    if args.apply:
+        summary = await ensure_indexes(db)
+        print(f"✅ Created/verified {len(summary['created'])} indexes")
+        for name in summary["failed"]:
+            print(f"❌ Failed: {name}")
+
+    report = await diff_indexes(db)
+    drift = False
+    for collection, result in report.items():
+        print(f"\n📂 {collection}")
+        for name in result["missing"]:
+            drift = True
+            print(f"   ❌ missing     {name}")
+        for name in result["mismatched"]:
+            drift = True
+            print(f"   ⚠️  mismatched  {name}")
+        for name in result["extra"]:
+            print(f"   ℹ️  undeclared  {name}")
+        if not any(result.values()):
+            print("   ✅ in sync")
+
+    client.close()
+    sys.exit(1 if drift else 0)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
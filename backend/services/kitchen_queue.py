@@ -0,0 +1,261 @@
+"""
+In-memory index of the orders the kitchen is working on.
+
+Active orders (KITCHEN_STATUSES, and paid when paid online, placed within
+the last KITCHEN_MAX_AGE_MINUTES) are kept in a dict plus a list sorted by
+age, so the kitchen display reads its queue and its push stream without
+touching MongoDB. Older orders still in an open status were abandoned, not
+cooked, and are left out. The index is:
+
+- rebuilt from MongoDB when first needed and at startup,
+- updated in place by this worker's order write paths (order_events),
+- synced every KITCHEN_SYNC_SECONDS from the (updated_at, id) change feed,
+  which picks up writes made by other workers,
+- trimmed of orders that age past the cutoff.
+
+The encoded queue is kept alongside as a snapshot, so repeated polls cost
+a 304 or a copy of stored bytes.
+"""
+
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from fastapi import Response, status
+from backend.services.content_versions import content_versions, etag_matches
+from backend.services.events import RESYNC, EventBroker
+from backend.services.order_schema import decode_orders, stored_projection
+from backend.services.pagination import fetch_changes
+from backend.services.serialization import encode_json
+from backend.services.snapshots import Snapshot
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+KITCHEN_STATUSES = [s.strip() for s in os.getenv('KITCHEN_STATUSES', 'pending,confirmed,preparing').split(',') if s.strip()]
+KITCHEN_SYNC_SECONDS = float(os.getenv('KITCHEN_SYNC_SECONDS', '2'))
+KITCHEN_MAX_AGE_MINUTES = float(os.getenv('KITCHEN_MAX_AGE_MINUTES', '720'))
+KITCHEN_SYNC_BATCH = 500
+
+QUEUE_VERSION_KEY = "kitchen_queue"
+KITCHEN_FIELDS = (
+    "id", "order_number", "customer_name", "order_type", "items", "cart_items",
+    "notes", "status", "created_at", "updated_at",
+)
+# What the index needs from MongoDB: the display fields plus what decides activity
+KITCHEN_PROJECTION = stored_projection({
+    "_id": 0, "order_id": 1, "payment_method": 1, "payment_status": 1,
+    **{field: 1 for field in KITCHEN_FIELDS},
+})
+ACTIVE_QUERY = {
+    "status": {"$in": KITCHEN_STATUSES},
+    "$or": [{"payment_method": {"$ne": "razorpay"}}, {"payment_status": "paid"}],
+}
+
+ORDER_ADDED = "order_added"
+ORDER_UPDATED = "order_updated"
+ORDER_REMOVED = "order_removed"
+
+
+def active_cutoff() -> datetime:
+    """Orders placed before this are no longer on the kitchen's list"""
+    return datetime.utcnow() - timedelta(minutes=KITCHEN_MAX_AGE_MINUTES)
+
+
+def active_query() -> dict:
+    """ACTIVE_QUERY bounded by age; served by the orders_kitchen_active index"""
+    return {**ACTIVE_QUERY, "created_at": {"$gte": active_cutoff()}}
+
+
+def is_active(order: dict) -> bool:
+    if order.get("status") not in KITCHEN_STATUSES:
+        return False
+    created_at = _utc(order.get("created_at"))
+    if created_at is None or created_at < _utc(active_cutoff()):
+        return False
+    # Online orders reach the kitchen once paid
+    return order.get("payment_method") != "razorpay" or order.get("payment_status") == "paid"
+
+
+def kitchen_view(order: dict) -> dict:
+    """What a kitchen screen shows; no phone numbers or addresses"""
+    view = {field: order.get(field) for field in KITCHEN_FIELDS}
+    view["id"] = order.get("id") or order.get("order_id")
+    view["cart_items"] = [
+        {"item_name": item.get("item_name"), "quantity": item.get("quantity")}
+        for item in order.get("cart_items") or []
+    ]
+    return view
+
+
+def _utc(value) -> Optional[datetime]:
+    if not isinstance(value, datetime):
+        return None
+    # MongoDB hands back naive datetimes that are UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def _age_key(view: dict) -> tuple:
+    created_at = _utc(view.get("created_at"))
+    return (created_at.timestamp() if created_at else float("inf"), view["id"])
+
+
+class KitchenQueue:
+    def __init__(self, sync_seconds: float = KITCHEN_SYNC_SECONDS):
+        self.sync_seconds = sync_seconds
+        self.feed = EventBroker("kitchen feed")
+        self._db = None
+        self._task: Optional[asyncio.Task] = None
+        self._reset()
+        self.rebuilds = 0
+        self.syncs = 0
+
+    def _reset(self):
+        self._orders = {}
+        self._keys = []
+        self._token = None
+        self._loaded = False
+        self._snapshot: Optional[Snapshot] = None
+        self._lock = asyncio.Lock()
+
+    def set_database(self, database):
+        self._db = database
+        self._reset()
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    def orders(self) -> List[dict]:
+        """Active orders, oldest first"""
+        return [self._orders[order_id] for _, order_id in self._keys]
+
+    def count_since(self, since: datetime) -> int:
+        """Active orders placed at or after `since`"""
+        return len(self._keys) - bisect_left(self._keys, (_utc(since).timestamp(),))
+
+    def _remove(self, order_id: str) -> Optional[dict]:
+        view = self._orders.pop(order_id, None)
+        if view is not None:
+            del self._keys[bisect_left(self._keys, _age_key(view))]
+        return view
+
+    def _add(self, view: dict):
+        self._orders[view["id"]] = view
+        insort(self._keys, _age_key(view))
+
+    def apply(self, order: dict):
+        """Bring one order's entry up to date with `order`"""
+        view = kitchen_view(order)
+        if not view["id"]:
+            return
+        current = self._orders.get(view["id"])
+        if current is not None:
+            if current == view:
+                return
+            # The change feed may replay a version older than a local write
+            current_at, incoming_at = _utc(current.get("updated_at")), _utc(view.get("updated_at"))
+            if current_at and incoming_at and incoming_at < current_at:
+                return
+
+        if is_active(order):
+            self._remove(view["id"])
+            self._add(view)
+            self.feed.publish(ORDER_UPDATED if current is not None else ORDER_ADDED, view)
+        elif current is not None:
+            self._remove(view["id"])
+            self.feed.publish(ORDER_REMOVED, {"id": view["id"], "status": view["status"]})
+        else:
+            return
+        content_versions.bump(QUEUE_VERSION_KEY)
+
+    async def _rebuild(self):
+        # Take the change token first so writes made during the load are synced after it
+        _, token, _ = await fetch_changes(self._db.orders, None, 1)
+        docs = await self._db.orders.find(active_query(), KITCHEN_PROJECTION).to_list(None)
+        docs = await decode_orders(self._db, docs)
+        self._orders = {}
+        self._keys = []
+        for doc in docs:
+            view = kitchen_view(doc)
+            if view["id"]:
+                self._add(view)
+        self._token = token
+        self._loaded = True
+        self.rebuilds += 1
+        content_versions.bump(QUEUE_VERSION_KEY)
+        self.feed.publish(RESYNC, {})
+        logger.info(f"Kitchen queue rebuilt with {len(self._orders)} active orders")
+
+    def expire(self):
+        """Drop entries that have aged past the cutoff"""
+        cutoff = _utc(active_cutoff()).timestamp()
+        while self._keys and self._keys[0][0] < cutoff:
+            view = self._remove(self._keys[0][1])
+            self.feed.publish(ORDER_REMOVED, {"id": view["id"], "status": view["status"]})
+            content_versions.bump(QUEUE_VERSION_KEY)
+
+    async def ensure_loaded(self):
+        if self._loaded:
+            self.expire()
+            return
+        async with self._lock:
+            if not self._loaded:
+                await self._rebuild()
+
+    async def sync(self):
+        """Apply every order change made since the last sync"""
+        await self.ensure_loaded()
+        async with self._lock:
+            has_more = True
+            while has_more:
+                docs, self._token, has_more = await fetch_changes(
+                    self._db.orders, self._token, KITCHEN_SYNC_BATCH, KITCHEN_PROJECTION
+                )
+                for doc in await decode_orders(self._db, docs):
+                    self.apply(doc)
+            self.expire()
+        self.syncs += 1
+
+    def response(self, if_none_match: Optional[str] = None, accept_encoding: Optional[str] = None) -> Response:
+        """The queue as JSON, a 304 when the screen already has it"""
+        etag = content_versions.etag(QUEUE_VERSION_KEY)
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        version = content_versions.current(QUEUE_VERSION_KEY)
+        if self._snapshot is None or self._snapshot.version != version:
+            self._snapshot = Snapshot(version, etag, encode_json(self.orders()))
+        return self._snapshot.to_response(accept_encoding)
+
+    def start(self, db):
+        self._db = db
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.error(f"Kitchen queue sync failed: {str(e)}")
+            await asyncio.sleep(self.sync_seconds)
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self._loaded,
+            "active_orders": len(self._orders),
+            "rebuilds": self.rebuilds,
+            "syncs": self.syncs,
+            "feed": self.feed.stats(),
+        }
+
+
+kitchen_queue = KitchenQueue()
@@ -0,0 +1,95 @@
+"""
+In-process menu catalog cache.
+
+The menu changes a few times a day but is read on every page load, so
+GET /api/menu and GET /api/menu/categories are served from memory. Entries
+are keyed by (category, available_only); the menu write handlers call
+invalidate() after every successful mutation.
+"""
+
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional
+import os
+
+MENU_CACHE_ENABLED = os.getenv('MENU_CACHE_ENABLED', 'true').lower() == 'true'
+MENU_CACHE_MAX_ENTRIES = int(os.getenv('MENU_CACHE_MAX_ENTRIES', '64'))
+
+
+class MenuCatalogCache:
+    """Bounded LRU cache for menu listings with hit/miss counters"""
+
+    def __init__(self, max_entries: int = MENU_CACHE_MAX_ENTRIES, enabled: bool = MENU_CACHE_ENABLED):
+        self.max_entries = max(1, max_entries)
+        self.enabled = enabled
+        self._items: "OrderedDict[Hashable, List[Any]]" = OrderedDict()
+        self._categories: Optional[List[str]] = None
+        # Bumped on every invalidation so a read that started before a write
+        # cannot store its (now stale) result afterwards
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(category: Optional[str], available_only: bool) -> tuple:
+        return (category or None, bool(available_only))
+
+    def get_items(self, category: Optional[str], available_only: bool) -> Optional[List[Any]]:
+        if not self.enabled:
+            return None
+        key = self.make_key(category, available_only)
+        items = self._items.get(key)
+        if items is None:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return items
+
+    def put_items(self, category: Optional[str], available_only: bool, items: List[Any], generation: int):
+        if not self.enabled or generation != self.generation:
+            return
+        key = self.make_key(category, available_only)
+        self._items[key] = items
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_entries:
+            self._items.popitem(last=False)
+            self.evictions += 1
+
+    def get_categories(self) -> Optional[List[str]]:
+        if not self.enabled:
+            return None
+        if self._categories is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self._categories
+
+    def put_categories(self, categories: List[str], generation: int):
+        if not self.enabled or generation != self.generation:
+            return
+        self._categories = categories
+
+    def invalidate(self):
+        """Drop every cached listing (called after any menu write)"""
+        self._items.clear()
+        self._categories = None
+        self.generation += 1
+        self.invalidations += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._items),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+menu_cache = MenuCatalogCache()
@@ -0,0 +1,38 @@
+"""
+Order lifecycle events.
+
+Every write path that creates an order or changes its status reports it
+here; the admin order feed (GET /api/admin/orders/stream) relays the events
+to connected panels so they can stop polling, the sales rollups count
+them, the kitchen queue follows them and the ETA model learns from them.
+"""
+
+from typing import Optional
+from backend.services.eta import eta_model
+from backend.services.events import EventBroker
+from backend.services.kitchen_queue import kitchen_queue
+from backend.services.sales_rollups import sales_rollups
+
+ORDER_CREATED = "order_created"
+ORDER_STATUS_CHANGED = "order_status_changed"
+
+order_feed = EventBroker("order feed")
+
+
+def _public(order: dict) -> dict:
+    return {key: value for key, value in order.items() if key != "_id"}
+
+
+def order_created(order: dict):
+    sales_rollups.record(None, order)
+    kitchen_queue.apply(order)
+    order_feed.publish(ORDER_CREATED, _public(order))
+
+
+def order_status_changed(order: dict, previous: Optional[dict] = None):
+    """`previous` is the order before the change, when the caller has it"""
+    if previous is not None:
+        sales_rollups.record(previous, order)
+        eta_model.observe(previous, order)
+    kitchen_queue.apply(order)
+    order_feed.publish(ORDER_STATUS_CHANGED, _public(order))
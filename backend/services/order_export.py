@@ -0,0 +1,111 @@
+"""
+Streaming order export (NDJSON or CSV).
+
+Rows are read from a Motor cursor in batches and encoded into chunks of
+about EXPORT_CHUNK_BYTES, optionally gzip-compressed on the fly, so memory
+stays flat no matter how many orders are exported.
+"""
+
+from datetime import date, datetime
+from typing import AsyncIterator, List, Optional
+from fastapi import HTTPException, status
+import csv
+import io
+import json
+import os
+import zlib
+
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '1000'))
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+DEFAULT_EXPORT_FIELDS = [
+    "order_number", "id", "created_at", "customer_name", "phone", "order_type", "delivery_area",
+    "items", "subtotal", "delivery_charge", "total", "payment_method", "payment_status", "status",
+]
+
+EXPORTABLE_FIELDS = set(DEFAULT_EXPORT_FIELDS) | {
+    "address", "landmark", "cart_items", "notes", "admin_notes", "updated_at",
+    "estimated_delivery_time", "razorpay_order_id", "razorpay_payment_id",
+}
+
+
+def parse_fields(fields: Optional[str]) -> List[str]:
+    if not fields:
+        return list(DEFAULT_EXPORT_FIELDS)
+    selected = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in selected if field not in EXPORTABLE_FIELDS]
+    if unknown or not selected:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown export fields: {', '.join(unknown) or '(none given)'}"
+        )
+    return list(dict.fromkeys(selected))
+
+
+def parse_bound(value: Optional[str], name: str) -> Optional[datetime]:
+    """Accept a date (2024-01-31) or a naive UTC datetime (2024-01-31T18:30:00)"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid '{name}' date: {value}"
+        )
+
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def _ndjson(doc: dict, fields: List[str]) -> str:
+    return json.dumps({field: doc.get(field) for field in fields}, default=_plain, ensure_ascii=False) + "\n"
+
+
+def _csv_cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, default=_plain, ensure_ascii=False)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+async def export_chunks(cursor, fmt: str, fields: List[str],
+                        chunk_bytes: int = EXPORT_CHUNK_BYTES) -> AsyncIterator[bytes]:
+    """Encode the cursor's documents into byte chunks of roughly chunk_bytes"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == "csv" else None
+    if writer is not None:
+        writer.writerow(fields)
+
+    async for doc in cursor:
+        if writer is not None:
+            writer.writerow([_csv_cell(doc.get(field)) for field in fields])
+        else:
+            buffer.write(_ndjson(doc, fields))
+        if buffer.tell() >= chunk_bytes:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+async def gzip_chunks(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -0,0 +1,257 @@
+"""
+Write-behind order ingestion through a local durable journal.
+
+With ORDER_INGEST_MODE=journal, create_order appends the validated order to
+a journal segment on local disk and returns once the line is fsync'd; a
+background task then writes journaled orders to MongoDB with insert_many,
+every ORDER_JOURNAL_FLUSH_SECONDS or as soon as ORDER_JOURNAL_BATCH_SIZE
+orders are waiting. Concurrent appends share one fsync (group commit).
+
+Each flush closes the current segment and deletes it only after its orders
+are in MongoDB; a failed flush keeps them and retries, so orders keep being
+accepted through short MongoDB stalls. Segments left over from a crash are
+replayed on startup. Orders already inserted before the crash are skipped
+by the unique `id` index.
+
+Journaled orders reach MongoDB (and admin lists) up to one flush interval
+after the customer is acknowledged. Until then find_pending() serves them
+to order lookups on this worker, and status changes are refused with a
+retry hint. `updated_at` is stamped again when an order is written, so
+change feeds see it commit at the time it carries.
+"""
+
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+from bson import json_util
+from pymongo.errors import BulkWriteError
+import asyncio
+import itertools
+import logging
+import math
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+ORDER_INGEST_MODE = os.getenv('ORDER_INGEST_MODE', 'direct').lower()
+ORDER_JOURNAL_DIR = os.getenv('ORDER_JOURNAL_DIR', str(Path(__file__).parent.parent / 'data' / 'order_journal'))
+ORDER_JOURNAL_BATCH_SIZE = int(os.getenv('ORDER_JOURNAL_BATCH_SIZE', '100'))
+ORDER_JOURNAL_FLUSH_SECONDS = float(os.getenv('ORDER_JOURNAL_FLUSH_SECONDS', '0.5'))
+
+SEGMENT_PREFIX = "orders-"
+SEGMENT_SUFFIX = ".jsonl"
+DUPLICATE_KEY = 11000
+
+
+def _segment_number(path: Path) -> int:
+    return int(path.name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+
+
+def read_segment(path: Path) -> List[dict]:
+    """Orders in a segment; a torn last line from a crash mid-write is skipped"""
+    docs = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                docs.append(json_util.loads(line))
+            except ValueError:
+                logger.warning(f"Skipping unreadable journal line in {path.name}")
+    return docs
+
+
+class OrderJournal:
+    def __init__(self, directory: str = ORDER_JOURNAL_DIR, batch_size: int = ORDER_JOURNAL_BATCH_SIZE,
+                 flush_seconds: float = ORDER_JOURNAL_FLUSH_SECONDS,
+                 enabled: bool = ORDER_INGEST_MODE == 'journal'):
+        self.directory = Path(directory)
+        self.batch_size = max(1, batch_size)
+        self.flush_seconds = flush_seconds
+        self.enabled = enabled
+        self._db = None
+        self._file = None
+        self._segment: Optional[Path] = None
+        # journaled but not yet in MongoDB, and the closed segments holding them
+        self._buffer: List[dict] = []
+        self._closed: List[Path] = []
+        self._unflushed: List[dict] = []
+        self._writes: list = []
+        self._writer: Optional[asyncio.Task] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self.appended = 0
+        self.flushed = 0
+        self.flush_failures = 0
+        self.last_flush_ms = 0.0
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer) + len(self._unflushed)
+
+    @property
+    def retry_after_seconds(self) -> int:
+        """How long a caller waiting for a pending order to be written should wait"""
+        return max(1, math.ceil(self.flush_seconds))
+
+    def find_pending(self, query: dict) -> Optional[dict]:
+        """The journaled order not yet in MongoDB whose fields equal `query`'s, if any"""
+        for doc in itertools.chain(self._unflushed, self._buffer):
+            if all(doc.get(field) == value for field, value in query.items()):
+                return doc
+        return None
+
+    def _segments(self) -> List[Path]:
+        return sorted(self.directory.glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}"), key=_segment_number)
+
+    def _open_segment(self):
+        existing = self._segments()
+        number = _segment_number(existing[-1]) + 1 if existing else 1
+        self._segment = self.directory / f"{SEGMENT_PREFIX}{number:08d}{SEGMENT_SUFFIX}"
+        self._file = open(self._segment, "a", encoding="utf-8")
+
+    def _close_segment(self) -> Optional[Path]:
+        if self._file is None:
+            return None
+        self._file.close()
+        closed, self._file, self._segment = self._segment, None, None
+        return closed
+
+    async def start(self, database):
+        """Replay leftover segments, then start the background flusher"""
+        self._db = database
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for segment in self._segments():
+            docs = read_segment(segment)
+            self._closed.append(segment)
+            self._unflushed.extend(docs)
+            logger.info(f"Replaying {len(docs)} journaled orders from {segment.name}")
+        if self._unflushed:
+            await self.flush()
+        self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        """Stop the flusher and write whatever is still journaled"""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        if self._writer is not None:
+            await self._writer
+        await self.flush()
+        async with self._lock:
+            closed = self._close_segment()
+            if closed is not None and closed.stat().st_size == 0:
+                closed.unlink()
+
+    async def append(self, doc: dict):
+        """Return once `doc` is durable in the journal"""
+        future = asyncio.get_running_loop().create_future()
+        self._writes.append((dict(doc), json_util.dumps(doc) + "\n", future))
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._write_loop())
+        await future
+
+    async def _write_loop(self):
+        # Everything queued while one fsync runs goes out in the next one
+        while self._writes:
+            writes, self._writes = self._writes, []
+            try:
+                async with self._lock:
+                    if self._file is None:
+                        self._open_segment()
+                    await asyncio.to_thread(self._write_lines, [line for _, line, _ in writes])
+                    self._buffer.extend(doc for doc, _, _ in writes)
+            except Exception as e:
+                logger.error(f"Order journal write failed: {str(e)}")
+                for _, _, future in writes:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.appended += len(writes)
+            for _, _, future in writes:
+                if not future.done():
+                    future.set_result(None)
+            if len(self._buffer) >= self.batch_size:
+                self._wakeup.set()
+
+    def _write_lines(self, lines: List[str]):
+        self._file.write("".join(lines))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Order journal flush failed: {str(e)}")
+
+    async def flush(self) -> int:
+        """Write journaled orders to MongoDB; returns how many were written"""
+        async with self._lock:
+            if self._buffer:
+                closed = self._close_segment()
+                if closed is not None:
+                    self._closed.append(closed)
+                self._unflushed.extend(self._buffer)
+                self._buffer = []
+            docs, segments = list(self._unflushed), list(self._closed)
+        if not docs:
+            return 0
+
+        started = time.perf_counter()
+        failed = []
+        # Stamped at intake; a change token may have moved past that since
+        now = datetime.utcnow()
+        for doc in docs:
+            doc["updated_at"] = now
+        try:
+            await self._db.orders.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            # Duplicates were already inserted before a crash and count as written
+            errors = [err for err in e.details.get("writeErrors", []) if err.get("code") != DUPLICATE_KEY]
+            failed = sorted({err["index"] for err in errors})
+            if failed:
+                self.flush_failures += 1
+                logger.error(f"Order journal flush kept {len(failed)} orders for retry: {errors[0].get('errmsg')}")
+        except Exception as e:
+            self.flush_failures += 1
+            logger.error(f"Order journal flush kept {len(docs)} orders for retry: {str(e)}")
+            return 0
+
+        self.last_flush_ms = (time.perf_counter() - started) * 1000
+        async with self._lock:
+            self._unflushed = [docs[i] for i in failed] + self._unflushed[len(docs):]
+            if not failed:
+                self._closed = [s for s in self._closed if s not in segments]
+        if not failed:
+            # Only now is it safe to forget the journaled copies
+            for segment in segments:
+                segment.unlink(missing_ok=True)
+        self.flushed += len(docs) - len(failed)
+        return len(docs) - len(failed)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "appended": self.appended,
+            "flushed": self.flushed,
+            "pending": self.pending,
+            "flush_failures": self.flush_failures,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+        }
+
+
+order_journal = OrderJournal()
@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Compact (v2) storage layout for orders, and the reader for both layouts.
+
+A v1 order stores the cart twice (the `items` text and `cart_items` dicts
+repeating "item_name"/"quantity"/"price"/"subtotal" per line) plus every
+defaulted field. A v2 order (`"v": 2`):
+
+- keeps every field that is queried, indexed, aggregated or updated in
+  place under its own name (id, order_number, status, created_at,
+  updated_at, status_times, payment_*, order_type, delivery_area, total,
+  customer_name, phone, razorpay_*, admin_notes),
+- stores the other fields under short keys (SHORT_KEYS),
+- stores the cart as `ci: [[name_code, quantity, price], ...]`, where the
+  code points into `order_item_names`, an append-only table of item names.
+  Codes are small integers and never change, so a renamed or deleted menu
+  item leaves old orders as they were,
+- drops `items` (generated from the cart on read), per-line subtotals,
+  and values equal to the order defaults.
+
+Every read path hands raw documents to decode_orders(), which returns v1
+dicts whichever layout they were stored in, so the rest of the code and the
+API see one shape. New orders are written as v2 when ORDER_SCHEMA_VERSION
+is 2; existing ones are converted in the background by
+OrderSchemaMigration (ORDER_SCHEMA_MIGRATION_ENABLED) or by hand:
+
+Usage:
+    python -m backend.services.order_schema --stats
+    python -m backend.services.order_schema --migrate
+"""
+
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from pymongo import ReplaceOne, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+import argparse
+import asyncio
+import copy
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+ORDER_SCHEMA_VERSION = int(os.getenv('ORDER_SCHEMA_VERSION', '2'))
+ORDER_SCHEMA_MIGRATION_ENABLED = os.getenv('ORDER_SCHEMA_MIGRATION_ENABLED', 'false').lower() == 'true'
+ORDER_SCHEMA_MIGRATION_BATCH_SIZE = int(os.getenv('ORDER_SCHEMA_MIGRATION_BATCH_SIZE', '500'))
+ORDER_SCHEMA_MIGRATION_INTERVAL_SECONDS = float(os.getenv('ORDER_SCHEMA_MIGRATION_INTERVAL_SECONDS', '3600'))
+
+ITEM_NAMES_COLLECTION = "order_item_names"
+ITEM_NAMES_COUNTER_ID = "order_item_names"
+SCHEMA_FIELD = "v"
+CART_FIELD = "ci"
+# Pause between batches so migrating never monopolises the database
+BATCH_PAUSE_SECONDS = 0.05
+
+# Values OrderResponse falls back to; not worth storing per order
+ORDER_DEFAULTS = {
+    "landmark": None,
+    "notes": None,
+    "admin_notes": None,
+    "delivery_area": None,
+    "cart_items": [],
+    "delivery_charge": 0.0,
+    "subtotal": 0.0,
+    "total": 0.0,
+    "payment_method": "cod",
+    "payment_status": "pending",
+    "estimated_delivery_time": "45-60 minutes",
+}
+
+SHORT_KEYS = {
+    "address": "ad",
+    "landmark": "lm",
+    "notes": "nt",
+    "subtotal": "st",
+    "delivery_charge": "dc",
+    "estimated_time": "et",
+    "estimated_delivery_time": "edt",
+}
+LONG_KEYS = {short: long for long, short in SHORT_KEYS.items()}
+CART_KEYS = ("items", "cart_items")
+
+
+def _line_subtotal(item: dict) -> float:
+    return item.get("price", 0) * item.get("quantity", 0)
+
+
+def items_text(cart_items: List[dict]) -> str:
+    """The `items` summary written for every order, e.g. "2x Masala Dosa, 1x Filter Coffee" """
+    return ", ".join(f"{item['quantity']}x {item['item_name']}" for item in cart_items)
+
+
+class ItemNames:
+    """Append-only item name <-> code table, cached in memory"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._codes: Dict[str, int] = {}
+        self._names: Dict[int, str] = {}
+        self.interned = 0
+
+    def set_database(self, database):
+        self.reset()
+
+    def _remember(self, code: int, name: str):
+        self._codes[name] = code
+        self._names[code] = name
+
+    async def codes(self, db, names: Iterable[str]) -> Dict[str, int]:
+        missing = {name for name in names if name not in self._codes}
+        if missing:
+            async for row in db[ITEM_NAMES_COLLECTION].find({"name": {"$in": list(missing)}}):
+                self._remember(row["_id"], row["name"])
+            for name in sorted(missing - set(self._codes)):
+                await self._intern(db, name)
+        return self._codes
+
+    async def _intern(self, db, name: str):
+        counter = await db.counters.find_one_and_update(
+            {"_id": ITEM_NAMES_COUNTER_ID},
+            {"$inc": {"seq": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        try:
+            await db[ITEM_NAMES_COLLECTION].insert_one({"_id": counter["seq"], "name": name})
+            self._remember(counter["seq"], name)
+            self.interned += 1
+        except DuplicateKeyError:
+            # Another worker interned the same name first (unique name index)
+            row = await db[ITEM_NAMES_COLLECTION].find_one({"name": name})
+            self._remember(row["_id"], row["name"])
+
+    async def names(self, db, codes: Iterable[int]) -> Dict[int, str]:
+        missing = [code for code in set(codes) if code not in self._names]
+        if missing:
+            async for row in db[ITEM_NAMES_COLLECTION].find({"_id": {"$in": missing}}):
+                self._remember(row["_id"], row["name"])
+        return self._names
+
+    def stats(self) -> dict:
+        return {"cached": len(self._names), "interned": self.interned}
+
+
+item_names = ItemNames()
+
+
+def pack_order(order: dict, codes: Dict[str, int]) -> dict:
+    """v1 order -> v2 document; `codes` must hold every cart item name"""
+    packed = {SCHEMA_FIELD: 2}
+    cart = order.get("cart_items") or []
+    for key, value in order.items():
+        if key in CART_KEYS or key == SCHEMA_FIELD:
+            continue
+        if value is None or value == [] or value == {}:
+            continue
+        # Same type too, so an int 0 is not read back as 0.0
+        if key in ORDER_DEFAULTS and type(value) is type(ORDER_DEFAULTS[key]) and value == ORDER_DEFAULTS[key]:
+            continue
+        packed[SHORT_KEYS.get(key, key)] = value
+    if cart:
+        packed[CART_FIELD] = [[codes[item["item_name"]], item["quantity"], item["price"]] for item in cart]
+        # Only lines whose subtotal is not simply price x quantity keep it
+        for line, item in zip(packed[CART_FIELD], cart):
+            if item.get("subtotal", _line_subtotal(item)) != _line_subtotal(item):
+                line.append(item["subtotal"])
+        if order.get("items") not in (None, items_text(cart)):
+            packed["items"] = order["items"]
+    elif order.get("items"):
+        packed["items"] = order["items"]
+    return packed
+
+
+def unpack_order(doc: dict, names: Dict[int, str]) -> dict:
+    """v2 document -> v1 order; `names` must hold every code in the cart"""
+    order = {}
+    for key, value in doc.items():
+        if key in (SCHEMA_FIELD, CART_FIELD):
+            continue
+        order[LONG_KEYS.get(key, key)] = value
+    for key, default in ORDER_DEFAULTS.items():
+        if key not in order:
+            order[key] = copy.copy(default)
+    if CART_FIELD in doc:
+        order["cart_items"] = [
+            {
+                "item_name": names.get(line[0], ""),
+                "quantity": line[1],
+                "price": line[2],
+                "subtotal": line[3] if len(line) > 3 else line[1] * line[2],
+            }
+            for line in doc[CART_FIELD]
+        ]
+    order.setdefault("items", items_text(order["cart_items"]))
+    return order
+
+
+async def encode_orders(db, orders: List[dict]) -> List[dict]:
+    """Documents to store for new v1-shaped orders (unchanged below ORDER_SCHEMA_VERSION 2)"""
+    if ORDER_SCHEMA_VERSION < 2:
+        return [dict(order) for order in orders]
+    codes = await item_names.codes(
+        db, {item["item_name"] for order in orders for item in order.get("cart_items") or []}
+    )
+    return [pack_order(order, codes) for order in orders]
+
+
+async def encode_order(db, order: dict) -> dict:
+    return (await encode_orders(db, [order]))[0]
+
+
+async def decode_orders(db, docs: List[dict]) -> List[dict]:
+    """Stored orders in either layout -> v1 orders"""
+    if not any(doc.get(SCHEMA_FIELD) == 2 for doc in docs):
+        return docs
+    names = await item_names.names(
+        db, {line[0] for doc in docs if doc.get(SCHEMA_FIELD) == 2 for line in doc.get(CART_FIELD) or []}
+    )
+    return [unpack_order(doc, names) if doc.get(SCHEMA_FIELD) == 2 else doc for doc in docs]
+
+
+async def decode_order(db, doc: Optional[dict]) -> Optional[dict]:
+    if doc is None:
+        return None
+    return (await decode_orders(db, [doc]))[0]
+
+
+def stored_projection(projection: dict) -> dict:
+    """A projection over v1 field names, widened to cover v2 documents"""
+    widened = dict(projection)
+    for field, include in projection.items():
+        if not include or field == "_id":
+            continue
+        if field in SHORT_KEYS:
+            widened[SHORT_KEYS[field]] = 1
+        if field in CART_KEYS:
+            widened.update({"items": 1, "cart_items": 1, CART_FIELD: 1})
+    widened[SCHEMA_FIELD] = 1
+    return widened
+
+
+async def migrate_batch(db, after_id=None, batch_size: int = ORDER_SCHEMA_MIGRATION_BATCH_SIZE) -> tuple:
+    """
+    Convert one batch of v1 orders after `after_id`; returns (scanned,
+    converted, last _id). A document is only replaced if its updated_at is
+    unchanged since it was read, so a concurrent status change wins and
+    the order is picked up again by the next run.
+    """
+    query = {SCHEMA_FIELD: {"$exists": False}}
+    if after_id is not None:
+        query["_id"] = {"$gt": after_id}
+    docs = await db.orders.find(query).sort("_id", 1).limit(batch_size).to_list(batch_size)
+    if not docs:
+        return 0, 0, after_id
+
+    packed = await encode_orders(db, [{k: v for k, v in doc.items() if k != "_id"} for doc in docs])
+    result = await db.orders.bulk_write([
+        ReplaceOne(
+            {"_id": doc["_id"], "updated_at": doc.get("updated_at"), SCHEMA_FIELD: {"$exists": False}},
+            new_doc
+        )
+        for doc, new_doc in zip(docs, packed)
+    ], ordered=False)
+    return len(docs), result.modified_count, docs[-1]["_id"]
+
+
+async def run_migration(db, batch_size: int = ORDER_SCHEMA_MIGRATION_BATCH_SIZE, progress=None) -> dict:
+    """Convert every v1 order, one batch at a time"""
+    totals = {"scanned": 0, "converted": 0}
+    if ORDER_SCHEMA_VERSION < 2:
+        return totals
+    last_id = None
+    while True:
+        scanned, converted, last_id = await migrate_batch(db, last_id, batch_size)
+        totals["scanned"] += scanned
+        totals["converted"] += converted
+        if scanned and progress is not None:
+            progress(totals)
+        if scanned < batch_size:
+            break
+        await asyncio.sleep(BATCH_PAUSE_SECONDS)
+    if totals["converted"]:
+        logger.info(f"Converted {totals['converted']} orders to schema v2")
+    return totals
+
+
+class OrderSchemaMigration:
+    def __init__(self, interval_seconds: float = ORDER_SCHEMA_MIGRATION_INTERVAL_SECONDS,
+                 enabled: bool = ORDER_SCHEMA_MIGRATION_ENABLED):
+        self.interval_seconds = interval_seconds
+        self.enabled = enabled
+        self._task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.converted = 0
+        self.last_run: Optional[datetime] = None
+
+    def start(self, db):
+        self._task = asyncio.create_task(self._loop(db))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self, db):
+        while True:
+            try:
+                self.converted += (await run_migration(db))["converted"]
+                self.runs += 1
+                self.last_run = datetime.utcnow()
+            except Exception as e:
+                logger.error(f"Order schema migration failed: {str(e)}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def stats(self) -> dict:
+        return {
+            "write_version": ORDER_SCHEMA_VERSION,
+            "migration_enabled": self.enabled,
+            "runs": self.runs,
+            "converted": self.converted,
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+            "item_names": item_names.stats(),
+        }
+
+
+order_schema_migration = OrderSchemaMigration()
+
+
+async def collection_stats(db) -> dict:
+    """Size figures of the orders collection, and how many orders use each layout"""
+    stats = await db.command("collStats", "orders")
+    return {
+        "count": stats.get("count", 0),
+        "v2": await db.orders.count_documents({SCHEMA_FIELD: 2}),
+        "avg_obj_size": stats.get("avgObjSize", 0),
+        "size": stats.get("size", 0),
+        "storage_size": stats.get("storageSize", 0),
+    }
+
+
+async def main():
+    """CLI: report or migrate the orders storage layout"""
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Convert stored orders to the compact v2 layout")
+    parser.add_argument("--migrate", action="store_true", help="Convert every v1 order, then report sizes")
+    parser.add_argument("--stats", action="store_true", help="Report the orders collection size (default)")
+    parser.add_argument("--batch-size", type=int, default=ORDER_SCHEMA_MIGRATION_BATCH_SIZE)
+    args = parser.parse_args()
+
+    load_dotenv(Path(__file__).parent.parent / '.env')
+    client = AsyncIOMotorClient(os.getenv('MONGO_URL', 'mongodb://localhost:27017'))
+    db = client[os.getenv('DB_NAME', 'restaurant_db')]
+
+    def report(stats: dict, label: str):
+        print(f"📦 {label}: {stats['count']} orders ({stats['v2']} v2), "
+              f"avg {stats['avg_obj_size']} B, data {stats['size']} B, on disk {stats['storage_size']} B")
+
+    before = await collection_stats(db)
+    report(before, "orders")
+    if args.migrate:
+        totals = await run_migration(
+            db, max(1, args.batch_size),
+            progress=lambda t: print(f"⏳ {t['scanned']} scanned, {t['converted']} converted")
+        )
+        after = await collection_stats(db)
+        report(after, "after migration")
+        print(f"✅ Converted {totals['converted']} orders; "
+              f"data size {before['size']} B -> {after['size']} B (storage is reclaimed by compact)")
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,150 @@
+"""
+Keyset (cursor) pagination over (created_at, id), newest first.
+
+A cursor is the opaque, URL-safe encoding of the last row of the previous
+page. The next page is a range query on the (created_at, id) index, so page
+500 costs the same as page 1, unlike skip().
+
+Change tokens for delta sync use the same encoding over (updated_at, id),
+oldest change first. A row can commit after a token has moved past its
+`updated_at` (concurrent writers, write-behind ingestion), so tokens never
+advance beyond CHANGES_SAFETY_LAG_SECONDS ago: rows changed within that
+window are sent again on the next call, and readers apply them by id.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+from fastapi import HTTPException, status
+import base64
+import json
+import os
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+CHANGES_SAFETY_LAG_SECONDS = float(os.getenv('CHANGES_SAFETY_LAG_SECONDS', '10'))
+
+# Sort order matching the (created_at, id) indexes in services/indexes.py
+KEYSET_SORT = [("created_at", -1), ("id", -1)]
+# Sort order matching the (updated_at, id) index
+CHANGES_SORT = [("updated_at", 1), ("id", 1)]
+
+
+def _to_millis(value: datetime) -> int:
+    if value.tzinfo is None:
+        # MongoDB hands back naive datetimes that are UTC
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - EPOCH) // timedelta(milliseconds=1)
+
+
+def encode_cursor(created_at: datetime, doc_id: str) -> str:
+    raw = json.dumps({"t": _to_millis(created_at), "i": doc_id or ""}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return EPOCH + timedelta(milliseconds=int(data["t"])), str(data["i"])
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+def keyset_query(query: dict, cursor: Optional[str]) -> dict:
+    """Restrict `query` to rows strictly after `cursor` in KEYSET_SORT order"""
+    if not cursor:
+        return query
+    created_at, doc_id = decode_cursor(cursor)
+    after = {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "id": {"$lt": doc_id}},
+    ]}
+    return {"$and": [query, after]} if query else after
+
+
+async def fetch_page(collection, query: dict, cursor: Optional[str], limit: int,
+                     projection: Optional[dict] = None) -> Tuple[List[dict], Optional[str]]:
+    """
+    Read one page and the cursor of the page after it.
+
+    One extra row is fetched to learn whether another page exists, so the
+    last page never hands out a cursor to an empty page.
+    """
+    docs = await collection.find(keyset_query(query, cursor), projection) \
+        .sort(KEYSET_SORT) \
+        .limit(limit + 1) \
+        .to_list(limit + 1)
+
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        last = docs[-1]
+        if isinstance(last.get("created_at"), datetime):
+            next_cursor = encode_cursor(last["created_at"], last.get("id", ""))
+    return docs, next_cursor
+
+
+def changes_query(query: dict, since: Optional[str]) -> dict:
+    """Restrict `query` to rows changed strictly after the `since` token"""
+    if not since:
+        return query
+    updated_at, doc_id = decode_cursor(since)
+    after = {"$or": [
+        {"updated_at": {"$gt": updated_at}},
+        {"updated_at": updated_at, "id": {"$gt": doc_id}},
+    ]}
+    return {"$and": [query, after]} if query else after
+
+
+def _held_back(updated_at: datetime, doc_id: str, horizon: datetime) -> Tuple[str, bool]:
+    """Token for a row, capped at `horizon`; whether the cap applied"""
+    if _to_millis(updated_at) > _to_millis(horizon):
+        return encode_cursor(horizon, ""), True
+    return encode_cursor(updated_at, doc_id), False
+
+
+async def fetch_changes(collection, since: Optional[str], limit: int,
+                        projection: Optional[dict] = None,
+                        lag_seconds: float = CHANGES_SAFETY_LAG_SECONDS) -> Tuple[List[dict], Optional[str], bool]:
+    """
+    Read up to `limit` rows changed after `since`, oldest change first.
+
+    Returns the rows, the token to pass as `since` next time, and whether
+    more changes are waiting. Without `since`, no rows are returned and the
+    token points at the latest change, so a client that has just loaded the
+    full list can start syncing from there.
+
+    Tokens stop `lag_seconds` short of now, so the rows changed since then
+    come back again next time. Once the page reaches that window `has_more`
+    is false; anything beyond the page is newer still and follows on later
+    calls.
+    """
+    horizon = datetime.now(timezone.utc) - timedelta(seconds=lag_seconds)
+    if not since:
+        latest = await collection.find({"updated_at": {"$type": "date"}}, {"updated_at": 1, "id": 1}) \
+            .sort([(field, -direction) for field, direction in CHANGES_SORT]) \
+            .limit(1) \
+            .to_list(1)
+        if not latest:
+            return [], encode_cursor(EPOCH, ""), False
+        token, _ = _held_back(latest[0]["updated_at"], latest[0].get("id", ""), horizon)
+        return [], token, False
+
+    docs = await collection.find(changes_query({}, since), projection) \
+        .sort(CHANGES_SORT) \
+        .limit(limit + 1) \
+        .to_list(limit + 1)
+
+    has_more = len(docs) > limit
+    docs = docs[:limit]
+    token = since
+    if docs and isinstance(docs[-1].get("updated_at"), datetime):
+        candidate, held_back = _held_back(docs[-1]["updated_at"], docs[-1].get("id", ""), horizon)
+        # Never step back behind a token already handed out
+        if decode_cursor(candidate) > decode_cursor(since):
+            token = candidate
+        if held_back:
+            has_more = False
+    return docs, token, has_more
@@ -0,0 +1,105 @@
+"""
+Bounded worker pool for bcrypt hashing and verification.
+
+A 12-round bcrypt call takes 200-300 ms of CPU. Run inline in an async
+handler it freezes the event loop and every order in flight with it, so
+password work goes to a dedicated thread pool instead (bcrypt releases the
+GIL while hashing). When more calls are waiting than the pool can absorb,
+new calls are rejected with 503 rather than queued without limit.
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+from fastapi import HTTPException, status
+import asyncio
+import os
+import time
+
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', '2'))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv('PASSWORD_HASH_MAX_QUEUE', '16'))
+
+LATENCY_SAMPLES = 256
+
+
+class PasswordWorkerPool:
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_queue: int = PASSWORD_HASH_MAX_QUEUE):
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self._hash_ms = deque(maxlen=LATENCY_SAMPLES)
+        self._wait_ms = deque(maxlen=LATENCY_SAMPLES)
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    @property
+    def queued(self) -> int:
+        return max(0, self.in_flight - self.workers)
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        """Run `fn(*args)` on the pool; 503 when the queue is full"""
+        if self.in_flight >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication is busy, please retry shortly",
+                headers={"Retry-After": "1"}
+            )
+
+        submitted = time.perf_counter()
+        timings = {}
+
+        def timed():
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                timings["wait"] = started - submitted
+                timings["run"] = time.perf_counter() - started
+
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, timed)
+        finally:
+            self.in_flight -= 1
+            if timings:
+                self.completed += 1
+                self._wait_ms.append(timings["wait"] * 1000)
+                self._hash_ms.append(timings["run"] * 1000)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    @staticmethod
+    def _summary(samples) -> dict:
+        if not samples:
+            return {"avg_ms": 0.0, "p95_ms": 0.0}
+        ordered = sorted(samples)
+        return {
+            "avg_ms": round(sum(ordered) / len(ordered), 2),
+            "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+        }
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queued,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "hash_latency": self._summary(self._hash_ms),
+            "queue_wait": self._summary(self._wait_ms),
+        }
+
+
+password_pool = PasswordWorkerPool()
@@ -0,0 +1,176 @@
+"""
+Non-blocking payment gateway adapter.
+
+The Razorpay SDK is synchronous and would block the event loop for the whole
+round trip to the gateway. RazorpayGateway talks to the Razorpay REST API
+over a pooled httpx.AsyncClient with per-call timeouts instead. Only calls
+that never reached the gateway (connect failures) are retried, with jitter:
+after a read timeout or a 5xx the gateway may already have created the
+order, and Razorpay has no idempotency key to make a second POST safe. FakePaymentGateway implements the same interface for tests and
+local development without gateway credentials.
+"""
+
+from abc import ABC, abstractmethod
+from typing import List, Optional
+import asyncio
+import hashlib
+import hmac
+import itertools
+import logging
+import os
+import random
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+RAZORPAY_KEY_ID = os.getenv("RAZORPAY_KEY_ID", "")
+RAZORPAY_KEY_SECRET = os.getenv("RAZORPAY_KEY_SECRET", "")
+RAZORPAY_API_URL = os.getenv("RAZORPAY_API_URL", "https://api.razorpay.com/v1")
+RAZORPAY_TIMEOUT_SECONDS = float(os.getenv("RAZORPAY_TIMEOUT_SECONDS", "8"))
+RAZORPAY_MAX_RETRIES = int(os.getenv("RAZORPAY_MAX_RETRIES", "2"))
+RAZORPAY_MAX_CONNECTIONS = int(os.getenv("RAZORPAY_MAX_CONNECTIONS", "20"))
+
+RETRY_BASE_DELAY_SECONDS = 0.2
+# Raised before the request is sent, so retrying cannot duplicate it
+UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class PaymentGatewayError(Exception):
+    """The gateway could not be reached or rejected the call"""
+
+
+class PaymentGateway(ABC):
+    """Interface every gateway implementation provides"""
+
+    key_id: str = ""
+    key_secret: str = ""
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.key_id and self.key_secret)
+
+    @abstractmethod
+    async def create_order(self, amount_paise: int, receipt: str, currency: str = "INR") -> dict:
+        """Create a gateway order for `amount_paise` and return its JSON"""
+
+    def verify_signature(self, order_id: str, payment_id: str, signature: str) -> bool:
+        expected = hmac.new(
+            self.key_secret.encode(),
+            f"{order_id}|{payment_id}".encode(),
+            hashlib.sha256
+        ).hexdigest()
+        return hmac.compare_digest(expected, signature or "")
+
+    async def close(self):
+        pass
+
+
+class RazorpayGateway(PaymentGateway):
+    def __init__(
+        self,
+        key_id: str = RAZORPAY_KEY_ID,
+        key_secret: str = RAZORPAY_KEY_SECRET,
+        base_url: str = RAZORPAY_API_URL,
+        timeout_seconds: float = RAZORPAY_TIMEOUT_SECONDS,
+        max_retries: int = RAZORPAY_MAX_RETRIES,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.key_id = key_id
+        self.key_secret = key_secret
+        self.base_url = base_url
+        self.timeout_seconds = timeout_seconds
+        self.max_retries = max(0, max_retries)
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Created lazily so it binds to the running event loop
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                auth=(self.key_id, self.key_secret),
+                timeout=httpx.Timeout(self.timeout_seconds, connect=min(self.timeout_seconds, 3.0)),
+                limits=httpx.Limits(
+                    max_connections=RAZORPAY_MAX_CONNECTIONS,
+                    max_keepalive_connections=RAZORPAY_MAX_CONNECTIONS
+                ),
+                transport=self._transport
+            )
+        return self._client
+
+    async def _post(self, path: str, payload: dict) -> dict:
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                # Full jitter keeps retries from many workers from lining up
+                await asyncio.sleep(random.uniform(0, RETRY_BASE_DELAY_SECONDS * 2 ** attempt))
+            try:
+                response = await self.client.post(path, json=payload)
+            except UNSENT_ERRORS as e:
+                last_error = f"{type(e).__name__}: {str(e)}"
+                logger.warning(f"Razorpay {path} attempt {attempt + 1} failed: {last_error}")
+                continue
+            except httpx.TransportError as e:
+                raise PaymentGatewayError(f"Razorpay {path} failed: {type(e).__name__}: {str(e)}")
+
+            if response.status_code >= 400:
+                raise PaymentGatewayError(f"Razorpay rejected {path}: HTTP {response.status_code} {response.text[:200]}")
+            return response.json()
+
+        raise PaymentGatewayError(f"Razorpay {path} failed after {self.max_retries + 1} attempts: {last_error}")
+
+    async def create_order(self, amount_paise: int, receipt: str, currency: str = "INR") -> dict:
+        return await self._post("/orders", {
+            "amount": amount_paise,
+            "currency": currency,
+            "receipt": receipt,
+            "payment_capture": 1
+        })
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class FakePaymentGateway(PaymentGateway):
+    """In-process stand-in that records calls and never leaves the machine"""
+
+    def __init__(self, key_id: str = "rzp_test_fake", key_secret: str = "fake_secret"):
+        self.key_id = key_id
+        self.key_secret = key_secret
+        self.orders: List[dict] = []
+        self._ids = itertools.count(1)
+
+    async def create_order(self, amount_paise: int, receipt: str, currency: str = "INR") -> dict:
+        order = {
+            "id": f"order_fake{next(self._ids):010d}",
+            "amount": amount_paise,
+            "currency": currency,
+            "receipt": receipt,
+            "status": "created"
+        }
+        self.orders.append(order)
+        return order
+
+    def sign(self, order_id: str, payment_id: str) -> str:
+        """Signature the real checkout widget would hand back"""
+        return hmac.new(
+            self.key_secret.encode(),
+            f"{order_id}|{payment_id}".encode(),
+            hashlib.sha256
+        ).hexdigest()
+
+
+_gateway: PaymentGateway = RazorpayGateway()
+
+
+def get_gateway() -> PaymentGateway:
+    return _gateway
+
+
+def set_gateway(gateway: PaymentGateway):
+    global _gateway
+    _gateway = gateway
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Incrementally maintained sales rollups.
+
+One `sales_rollups` row per (day, hour, status, payment_method, order_type),
+bucketed by the order's UTC creation time, holding order counts and revenue
+(order `total`). Every write path reports new orders and status/payment
+changes through services/order_events.py; the change is recorded as
+"remove the order from its old bucket, add it to its new one". Deltas are
+summed in memory and written with one unordered bulk of $inc upserts every
+SALES_ROLLUP_FLUSH_SECONDS, so order handlers keep their single round trip.
+
+The dashboard and sales report read these rows instead of scanning orders.
+Deltas not yet flushed when a worker dies are lost; rebuild the rollups
+from history (orders and orders_archive) with:
+
+Usage:
+    python -m backend.services.sales_rollups --rebuild
+"""
+
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional, Tuple
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from backend.services.archival import ARCHIVE_COLLECTION
+import argparse
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+SALES_ROLLUP_FLUSH_SECONDS = float(os.getenv('SALES_ROLLUP_FLUSH_SECONDS', '1'))
+
+ROLLUP_COLLECTION = "sales_rollups"
+KEY_FIELDS = ("day", "hour", "status", "payment_method", "order_type")
+COUNTER_FIELDS = ("orders", "revenue", "paid_orders", "paid_revenue")
+
+# What a missing field means, as in OrderResponse
+KEY_DEFAULTS = {"status": "pending", "payment_method": "cod", "order_type": "delivery"}
+
+REBUILD_PIPELINE = [
+    {"$match": {"created_at": {"$type": "date"}}},
+    {"$group": {
+        "_id": {
+            "day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}},
+            "hour": {"$hour": "$created_at"},
+            **{field: {"$ifNull": [f"${field}", default]} for field, default in KEY_DEFAULTS.items()},
+        },
+        "orders": {"$sum": 1},
+        "revenue": {"$sum": {"$ifNull": ["$total", 0]}},
+        "paid_orders": {"$sum": {"$cond": [{"$eq": ["$payment_status", "paid"]}, 1, 0]}},
+        "paid_revenue": {"$sum": {"$cond": [{"$eq": ["$payment_status", "paid"]}, {"$ifNull": ["$total", 0]}, 0]}},
+    }},
+]
+
+
+def rollup_key(order: dict) -> Optional[Tuple]:
+    created_at = order.get("created_at")
+    if not isinstance(created_at, datetime):
+        return None
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc)
+    values = {field: order.get(field) for field in KEY_DEFAULTS}
+    return (
+        created_at.strftime("%Y-%m-%d"),
+        created_at.hour,
+        *(default if values[field] is None else values[field] for field, default in KEY_DEFAULTS.items()),
+    )
+
+
+class SalesRollups:
+    def __init__(self, flush_seconds: float = SALES_ROLLUP_FLUSH_SECONDS):
+        self.flush_seconds = flush_seconds
+        self._db = None
+        self._pending = {}
+        self._task: Optional[asyncio.Task] = None
+        self.recorded = 0
+        self.flushes = 0
+        self.flush_errors = 0
+
+    def set_database(self, database):
+        self._db = database
+        self._pending = {}
+
+    def record(self, before: Optional[dict], after: Optional[dict]):
+        """Move an order's contribution from `before` (None for a new order) to `after`"""
+        for order, sign in ((before, -1), (after, 1)):
+            if order is None:
+                continue
+            key = rollup_key(order)
+            if key is None:
+                continue
+            total = order.get("total") or 0
+            paid = order.get("payment_status") == "paid"
+            delta = self._pending.setdefault(key, dict.fromkeys(COUNTER_FIELDS, 0))
+            delta["orders"] += sign
+            delta["revenue"] += sign * total
+            delta["paid_orders"] += sign * paid
+            delta["paid_revenue"] += sign * total * paid
+        self.recorded += 1
+
+    def _restore(self, deltas: dict):
+        for key, delta in deltas.items():
+            pending = self._pending.setdefault(key, dict.fromkeys(COUNTER_FIELDS, 0))
+            for field, value in delta.items():
+                pending[field] += value
+
+    async def flush(self) -> int:
+        """Write pending deltas; returns how many rollup rows were touched"""
+        if self._db is None:
+            return 0
+        # Swap before awaiting so changes recorded meanwhile go to the next flush
+        pending, self._pending = self._pending, {}
+        deltas = {key: delta for key, delta in pending.items() if any(delta.values())}
+        if not deltas:
+            return 0
+
+        keys = list(deltas)
+        operations = [
+            UpdateOne(dict(zip(KEY_FIELDS, key)), {"$inc": deltas[key]}, upsert=True)
+            for key in keys
+        ]
+        try:
+            await self._db[ROLLUP_COLLECTION].bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            failed = {err["index"] for err in e.details.get("writeErrors", [])}
+            self._restore({keys[i]: deltas[keys[i]] for i in failed})
+            self.flush_errors += 1
+            logger.error(f"{len(failed)} sales rollup rows could not be updated; retrying next flush")
+            return len(keys) - len(failed)
+        except Exception as e:
+            self._restore(deltas)
+            self.flush_errors += 1
+            logger.error(f"Sales rollup flush failed: {str(e)}")
+            return 0
+        self.flushes += 1
+        return len(keys)
+
+    def start(self, db):
+        self._db = db
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.flush_seconds)
+            await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "flush_seconds": self.flush_seconds,
+            "recorded": self.recorded,
+            "pending_rows": len(self._pending),
+            "flushes": self.flushes,
+            "flush_errors": self.flush_errors,
+        }
+
+
+sales_rollups = SalesRollups()
+
+
+async def rebuild_rollups(db) -> int:
+    """
+    Recompute every rollup row from orders and orders_archive.
+
+    Changes flushed by running workers while this runs can be lost, so
+    rebuild while order traffic is quiet.
+    """
+    rows = {}
+    for collection in ("orders", ARCHIVE_COLLECTION):
+        async for group in db[collection].aggregate(REBUILD_PIPELINE):
+            key = tuple(group["_id"][field] for field in KEY_FIELDS)
+            row = rows.setdefault(key, dict.fromkeys(COUNTER_FIELDS, 0))
+            for field in COUNTER_FIELDS:
+                row[field] += group[field]
+
+    await db[ROLLUP_COLLECTION].delete_many({})
+    if rows:
+        await db[ROLLUP_COLLECTION].insert_many([
+            {**dict(zip(KEY_FIELDS, key)), **counters} for key, counters in rows.items()
+        ])
+    logger.info(f"Rebuilt {len(rows)} sales rollup rows")
+    return len(rows)
+
+
+async def main():
+    """CLI: rebuild the rollups from order history"""
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Maintain the sales_rollups collection")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute every rollup row from orders")
+    args = parser.parse_args()
+    if not args.rebuild:
+        parser.print_help()
+        return
+
+    load_dotenv(Path(__file__).parent.parent / '.env')
+    client = AsyncIOMotorClient(os.getenv('MONGO_URL', 'mongodb://localhost:27017'))
+    db = client[os.getenv('DB_NAME', 'restaurant_db')]
+
+    rows = await rebuild_rollups(db)
+    print(f"✅ Rebuilt {rows} sales rollup rows")
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+"""
+Fast JSON responses for documents read back from our own database.
+
+Inbound payloads are validated by their Pydantic models as before. Documents
+read from MongoDB were built from validated input when they were written, so
+read paths skip a second round of validation:
+
+- `construct(Model, doc)` builds one response model with `model_construct`,
+- `project(Model, docs)` reduces a list of documents to the model's fields
+  as plain dicts (what model_construct does, minus building the objects),
+  using a field table cached per model,
+- `FastJSONResponse` encodes with orjson instead of jsonable_encoder +
+  json.dumps, and returning it directly also skips FastAPI's validation of
+  the return value against `response_model` (kept on the route for the
+  OpenAPI schema).
+
+Either way missing optional fields get their defaults and storage-only keys
+(`_id`, `status_times`, ...) are left out. The bytes match FastAPI's default
+encoding for the types we store: datetimes as ISO 8601 (UTC as `Z`, as
+Pydantic writes it), floats in shortest round-trip form, UTF-8 without
+escaping. Response models here have no aliases or custom serializers; one
+that does should keep going through FastAPI's own serialization.
+"""
+
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, List, Tuple, Type, TypeVar
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+import orjson
+
+M = TypeVar("M", bound=BaseModel)
+
+
+def _default(value: Any) -> Any:
+    # Called by orjson for types it does not encode itself
+    if isinstance(value, BaseModel):
+        return dict(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def encode_json(payload: Any) -> bytes:
+    """Encode a payload the way FastAPI's default JSONResponse would, with orjson"""
+    return orjson.dumps(payload, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z)
+
+
+def construct(model: Type[M], doc: dict) -> M:
+    """Response model for a document we wrote ourselves; no validation"""
+    return model.model_construct(**doc)
+
+
+@lru_cache(maxsize=None)
+def _fields(model: Type[BaseModel]) -> Tuple[tuple, ...]:
+    return tuple((name, field.is_required(), field) for name, field in model.model_fields.items())
+
+
+def project(model: Type[BaseModel], docs: List[dict]) -> List[dict]:
+    """Documents we wrote ourselves, reduced to `model`'s fields; no validation"""
+    fields = _fields(model)
+    shaped = []
+    for doc in docs:
+        item = {}
+        for name, required, field in fields:
+            if name in doc:
+                item[name] = doc[name]
+            elif not required:
+                item[name] = field.get_default(call_default_factory=True)
+        shaped.append(item)
+    return shaped
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return encode_json(content)
@@ -0,0 +1,143 @@
+"""
+Pre-serialized JSON snapshots for hot public list endpoints.
+
+A snapshot holds the final encoded body of one distinct query (plus a gzip
+copy for large bodies) tagged with the collection version it was built
+from. Until the collection version moves, the endpoint answers with the
+stored bytes and skips validation and JSON encoding entirely.
+"""
+
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional
+from fastapi import Response, status
+import gzip
+import os
+
+from backend.services.content_versions import content_versions, etag_matches
+from backend.services.serialization import encode_json
+
+RESPONSE_SNAPSHOTS_ENABLED = os.getenv('RESPONSE_SNAPSHOTS_ENABLED', 'true').lower() == 'true'
+SNAPSHOT_MAX_ENTRIES = int(os.getenv('SNAPSHOT_MAX_ENTRIES', '128'))
+SNAPSHOT_GZIP_MIN_BYTES = int(os.getenv('SNAPSHOT_GZIP_MIN_BYTES', '1024'))
+
+
+def _quality(params: str) -> float:
+    for param in params.split(";"):
+        name, _, value = param.strip().partition("=")
+        if name.strip().lower() == "q":
+            try:
+                return float(value)
+            except ValueError:
+                return 0.0
+    return 1.0
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """Whether gzip is acceptable; an explicit gzip entry wins over `*`"""
+    if not accept_encoding:
+        return False
+    qualities = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        qualities.setdefault(coding.strip().lower(), _quality(params))
+    quality = qualities.get("gzip", qualities.get("*", 0.0))
+    return quality > 0
+
+
+class Snapshot:
+    """Encoded body of one query at one collection version"""
+
+    __slots__ = ("version", "etag", "body", "gzip_body")
+
+    def __init__(self, version: int, etag: str, body: bytes, gzip_min_bytes: int = SNAPSHOT_GZIP_MIN_BYTES):
+        self.version = version
+        self.etag = etag
+        self.body = body
+        self.gzip_body = None
+        if len(body) >= gzip_min_bytes:
+            compressed = gzip.compress(body, compresslevel=6, mtime=0)
+            if len(compressed) < len(body):
+                self.gzip_body = compressed
+
+    def to_response(self, accept_encoding: Optional[str] = None) -> Response:
+        headers = {"ETag": self.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        body = self.body
+        if self.gzip_body is not None and accepts_gzip(accept_encoding):
+            body = self.gzip_body
+            headers["Content-Encoding"] = "gzip"
+        return Response(content=body, media_type="application/json", headers=headers)
+
+
+class SnapshotStore:
+    """Bounded LRU of snapshots keyed by (collection, query key)"""
+
+    def __init__(self, max_entries: int = SNAPSHOT_MAX_ENTRIES, enabled: bool = RESPONSE_SNAPSHOTS_ENABLED):
+        self.max_entries = max(1, max_entries)
+        self.enabled = enabled
+        self._entries: "OrderedDict[Hashable, Snapshot]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.builds = 0
+
+    def get(self, collection: str, key: tuple, version: int) -> Optional[Snapshot]:
+        if not self.enabled:
+            return None
+        snapshot = self._entries.get((collection, key))
+        if snapshot is None or snapshot.version != version:
+            self.misses += 1
+            return None
+        self._entries.move_to_end((collection, key))
+        self.hits += 1
+        return snapshot
+
+    def put(self, collection: str, key: tuple, snapshot: Snapshot):
+        self.builds += 1
+        if not self.enabled or snapshot.version != content_versions.current(collection):
+            return
+        self._entries[(collection, key)] = snapshot
+        self._entries.move_to_end((collection, key))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "builds": self.builds,
+            "bytes": sum(len(s.body) + len(s.gzip_body or b"") for s in self._entries.values()),
+        }
+
+
+snapshot_store = SnapshotStore()
+
+
+async def snapshot_response(
+    collection: str,
+    key: tuple,
+    build: Callable[[], Awaitable[Any]],
+    if_none_match: Optional[str] = None,
+    accept_encoding: Optional[str] = None,
+) -> Response:
+    """
+    Answer a public list read from its snapshot.
+
+    Order of work: 304 on a matching ETag, then the stored bytes, and only
+    when the collection changed since the last build, `build()` + encode.
+    """
+    version = content_versions.current(collection)
+    etag = content_versions.etag(collection, *key)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    snapshot = snapshot_store.get(collection, key, version)
+    if snapshot is None:
+        payload = await build()
+        snapshot = Snapshot(version, etag, encode_json(payload))
+        snapshot_store.put(collection, key, snapshot)
+    return snapshot.to_response(accept_encoding)
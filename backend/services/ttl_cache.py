@@ -0,0 +1,67 @@
+"""
+Small async TTL cache with single-flight loading.
+
+Concurrent misses for the same key share one loader call, so a room full of
+admin screens refreshing at once costs a single database round trip per
+TTL window.
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+import asyncio
+import time
+
+
+class TTLCache:
+    def __init__(self, ttl_seconds: float, max_entries: int = 256):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        self._entries.clear()
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > now:
+            self.hits += 1
+            return entry[1]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.hits += 1
+            return await asyncio.shield(inflight)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters re-raise it; keep the loop from logging it as unretrieved
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        if self.ttl_seconds > 0:
+            if len(self._entries) >= self.max_entries:
+                self._entries = {k: v for k, v in self._entries.items() if v[0] > now}
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        future.set_result(value)
+        return value
+
+    def stats(self) -> dict:
+        return {
+            "ttl_seconds": self.ttl_seconds,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
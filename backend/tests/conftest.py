@@ -22,12 +22,16 @@ import jwt
 JWT_SECRET = 'test-secret-key-minimum-32-characters-for-testing'
 os.environ['JWT_SECRET'] = JWT_SECRET
 
+# Tests insert menu documents directly, so serve every read from MongoDB
+os.environ['MENU_CACHE_ENABLED'] = 'false'
+os.environ['RESPONSE_SNAPSHOTS_ENABLED'] = 'false'
+
 # Ensure parent directory is in sys.path for absolute imports
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
 # Import after path configuration and JWT_SECRET is set
 from backend.server import app
-from backend.routes import auth, orders, menu, payment, specials, admin
+from backend.routes import auth, orders, menu, payment, specials, admin, kitchen
 
 # Configuration
 TEST_MONGO_URL = os.getenv('TEST_MONGO_URL', 'mongodb://localhost:27017')
@@ -78,6 +82,7 @@ async def client(test_db):
     payment.set_database(test_db)
     specials.set_database(test_db)
     admin.set_database(test_db)
+    kitchen.set_database(test_db)
     
     # Create async client with ASGI transport
     async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
@@ -297,3 +297,233 @@ class TestAdminHealth:
         assert data["status"] == "healthy"
         assert data["admin"] == "testadmin"
         assert "operational" in data["message"].lower()
+
+
+class TestAdminDashboardStats:
+    """Test dashboard figures and their short-lived cache."""
+    
+    async def test_dashboard_counts(self, client, admin_token, test_db):
+        """Test that the rollup aggregation reports correct counts and revenue."""
+        from backend.services.sales_rollups import rebuild_rollups
+        
+        await test_db.orders.insert_many([
+            {"order_id": "order1", "status": "pending", "total": 80.0, "created_at": datetime.now(timezone.utc)},
+            {"order_id": "order2", "status": "pending", "created_at": datetime.now(timezone.utc)},
+            {"order_id": "order3", "status": "completed", "total": 120.0, "created_at": datetime.now(timezone.utc)}
+        ])
+        await test_db.menu.insert_one({"name": "Item", "category": "mains", "price": 100, "available": True})
+        await rebuild_rollups(test_db)
+        
+        response = await client.get(
+            "/api/admin/dashboard",
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_orders"] == 3
+        assert data["pending_orders"] == 2
+        assert data["completed_orders"] == 1
+        assert data["total_revenue"] == 120.0
+        assert data["menu_items_count"] == 1
+    
+    async def test_concurrent_misses_share_one_load(self):
+        """Test that simultaneous refreshes trigger a single database load."""
+        import asyncio
+        from backend.services.ttl_cache import TTLCache
+        
+        cache = TTLCache(ttl_seconds=5)
+        calls = []
+        
+        async def loader():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"total_orders": 1}
+        
+        results = await asyncio.gather(*[cache.get_or_load("dashboard", loader) for _ in range(10)])
+        
+        assert len(calls) == 1
+        assert all(result == {"total_orders": 1} for result in results)
+        assert await cache.get_or_load("dashboard", loader) == {"total_orders": 1}
+        assert len(calls) == 1
+
+
+class TestAdminOrderChanges:
+    """Test delta sync of admin orders."""
+    
+    async def test_changes_since_token(self, client, admin_token, test_db):
+        """Test that only orders updated after the token come back."""
+        from datetime import datetime, timedelta
+        
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        base = datetime(2024, 1, 1, 12, 0, 0)
+        await test_db.orders.insert_many([
+            {"id": f"order{n}", "status": "pending", "created_at": base, "updated_at": base + timedelta(seconds=n)}
+            for n in range(3)
+        ])
+        
+        start = await client.get("/api/admin/orders/changes", headers=headers)
+        assert start.status_code == 200
+        assert start.json()["orders"] == []
+        
+        await client.put(
+            "/api/admin/orders/order0/status",
+            headers=headers,
+            json={"status": "ready"}
+        )
+        
+        response = await client.get(
+            f"/api/admin/orders/changes?since={start.json()['token']}",
+            headers=headers
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert [order["id"] for order in data["orders"]] == ["order0"]
+        assert data["orders"][0]["status"] == "ready"
+        assert data["has_more"] is False
+        
+        # order0 changed within the safety lag, so it is sent once more
+        again = await client.get(f"/api/admin/orders/changes?since={data['token']}", headers=headers)
+        assert [order["id"] for order in again.json()["orders"]] == ["order0"]
+    
+    async def test_late_commit_not_skipped(self, client, admin_token, test_db):
+        """Test that a row committed after the token, with an older updated_at, still arrives."""
+        from datetime import datetime, timedelta
+        
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        now = datetime.utcnow()
+        await test_db.orders.insert_one(
+            {"id": "order1", "status": "pending", "created_at": now, "updated_at": now - timedelta(seconds=1)}
+        )
+        start = (await client.get("/api/admin/orders/changes", headers=headers)).json()["token"]
+        first = (await client.get(f"/api/admin/orders/changes?since={start}", headers=headers)).json()
+        
+        # Stamped before order1 but written after the token was issued (e.g. a journaled order)
+        await test_db.orders.insert_one(
+            {"id": "order2", "status": "pending", "created_at": now, "updated_at": now - timedelta(seconds=2)}
+        )
+        second = (await client.get(f"/api/admin/orders/changes?since={first['token']}", headers=headers)).json()
+        
+        assert [order["id"] for order in first["orders"]] == ["order1"]
+        assert [order["id"] for order in second["orders"]] == ["order2", "order1"]
+        assert second["has_more"] is False
+    
+    async def test_changes_paged(self, client, admin_token, test_db):
+        """Test that a backlog larger than the limit is returned in order over several calls."""
+        from datetime import datetime, timedelta
+        from backend.services.pagination import EPOCH, encode_cursor
+        
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        base = datetime(2024, 1, 1, 12, 0, 0)
+        await test_db.orders.insert_many([
+            {"id": f"order{n}", "status": "pending", "created_at": base, "updated_at": base + timedelta(seconds=n)}
+            for n in range(5)
+        ])
+        
+        token, seen, has_more = encode_cursor(EPOCH, ""), [], True
+        while has_more:
+            data = (await client.get(
+                f"/api/admin/orders/changes?since={token}&limit=2",
+                headers=headers
+            )).json()
+            seen += [order["id"] for order in data["orders"]]
+            token, has_more = data["token"], data["has_more"]
+        
+        assert seen == [f"order{n}" for n in range(5)]
+    
+    async def test_changes_invalid_token(self, client, admin_token):
+        """Test that a malformed token is rejected."""
+        response = await client.get(
+            "/api/admin/orders/changes?since=not-a-token",
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        
+        assert response.status_code == 400
+
+
+class TestAdminOrderExport:
+    """Test streaming order export."""
+    
+    @staticmethod
+    async def seed(test_db):
+        from datetime import datetime
+        
+        await test_db.orders.insert_many([
+            {
+                "id": f"order{n}",
+                "order_number": f"ORD-2024010{n}-000001",
+                "customer_name": f"Customer {n}",
+                "cart_items": [{"item_name": "Dosa", "quantity": n}],
+                "total": 100.0 * n,
+                "status": "completed",
+                "created_at": datetime(2024, 1, n, 12, 0, 0)
+            }
+            for n in range(1, 5)
+        ])
+    
+    async def test_export_requires_auth(self, client):
+        """Test that export requires authentication."""
+        response = await client.get("/api/admin/orders/export")
+        assert response.status_code == 401
+    
+    async def test_export_ndjson_date_range(self, client, admin_token, test_db):
+        """Test NDJSON export of a half-open date range with selected fields."""
+        import json
+        
+        await self.seed(test_db)
+        response = await client.get(
+            "/api/admin/orders/export?format=ndjson&from=2024-01-02&to=2024-01-04&fields=order_number,total",
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert rows == [
+            {"order_number": "ORD-20240102-000001", "total": 200.0},
+            {"order_number": "ORD-20240103-000001", "total": 300.0},
+        ]
+    
+    async def test_export_csv_gzip(self, client, admin_token, test_db):
+        """Test gzip-compressed CSV export with nested fields as JSON cells."""
+        import csv
+        import io
+        
+        await self.seed(test_db)
+        response = await client.get(
+            "/api/admin/orders/export?format=csv&fields=id,created_at,cart_items",
+            headers={"Authorization": f"Bearer {admin_token}", "Accept-Encoding": "gzip"}
+        )
+        
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "attachment" in response.headers["content-disposition"]
+        rows = list(csv.reader(io.StringIO(response.text)))
+        assert rows[0] == ["id", "created_at", "cart_items"]
+        assert len(rows) == 5
+        assert rows[1][:2] == ["order1", "2024-01-01T12:00:00"]
+        assert '"quantity": 1' in rows[1][2]
+    
+    async def test_export_rejects_unknown_field(self, client, admin_token):
+        """Test that only whitelisted fields can be exported."""
+        response = await client.get(
+            "/api/admin/orders/export?fields=order_number,password_hash",
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        
+        assert response.status_code == 400
+    
+    async def test_export_chunks_bounded(self):
+        """Test that rows are emitted in bounded chunks rather than one body."""
+        from backend.services.order_export import export_chunks
+        
+        async def cursor():
+            for n in range(2000):
+                yield {"id": f"order{n}", "customer_name": "Customer " + "x" * 50}
+        
+        chunks = [chunk async for chunk in export_chunks(cursor(), "ndjson", ["id", "customer_name"], chunk_bytes=4096)]
+        
+        assert len(chunks) > 10
+        assert max(len(chunk) for chunk in chunks) < 4096 + 200
+        assert sum(chunk.count(b"\n") for chunk in chunks) == 2000
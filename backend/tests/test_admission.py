@@ -0,0 +1,130 @@
+"""
+Test suite for kitchen-capacity admission control.
+
+Tests:
+- Orders admitted below capacity, turned away with a structured 503 above it
+- Stale open orders do not count toward capacity
+- Burst limit per time window, slots of failed orders handed back
+- Idempotent replays of accepted orders are not turned away
+- Pickup slot rounding
+"""
+
+from datetime import datetime, timedelta
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.services.admission import INTAKE_RATE, KITCHEN_FULL, admission, next_slot
+from backend.services.kitchen_queue import kitchen_queue
+
+PAYLOAD = {
+    "customer_name": "Busy Customer",
+    "phone": "9123456789",
+    "order_type": "pickup",
+    "address": "SRM University, Potheri, Chennai",
+    "items": "Dosa x4",
+    "cart_items": [{"item_name": "Dosa", "quantity": 4, "price": 60, "subtotal": 240}],
+}
+
+
+def fill_kitchen(count):
+    for n in range(count):
+        kitchen_queue.apply({"id": f"busy{n}", "status": "preparing", "created_at": datetime.utcnow()})
+
+
+class TestAdmission:
+    """Test admission control on order intake."""
+
+    def test_next_slot(self):
+        """Test that pickup slots are rounded up to the slot size."""
+        assert next_slot(datetime(2024, 1, 1, 12, 7), 15) == datetime(2024, 1, 1, 12, 15)
+        assert next_slot(datetime(2024, 1, 1, 12, 50), 15) == datetime(2024, 1, 1, 13, 0)
+        assert next_slot(datetime(2024, 1, 1, 12, 30), 15) == datetime(2024, 1, 1, 12, 30)
+
+    async def test_full_kitchen_returns_busy(self, client, test_db, monkeypatch):
+        """Test that a full kitchen turns orders away before they are stored."""
+        monkeypatch.setattr(admission, "max_active", 3)
+        await kitchen_queue.ensure_loaded()
+        fill_kitchen(3)
+
+        response = await client.post("/api/orders", json=PAYLOAD)
+
+        assert response.status_code == 503
+        detail = response.json()["detail"]
+        assert detail["reason"] == KITCHEN_FULL
+        assert detail["retry_after_minutes"] >= 1
+        assert "pickup_slot" in detail
+        assert response.headers["Retry-After"] == str(detail["retry_after_minutes"] * 60)
+        assert await test_db.orders.count_documents({}) == 0
+        assert admission.stats()["rejected"][KITCHEN_FULL] == 1
+
+    async def test_below_capacity_is_admitted(self, client, monkeypatch):
+        """Test that orders are accepted while the kitchen has room."""
+        monkeypatch.setattr(admission, "max_active", 3)
+        await kitchen_queue.ensure_loaded()
+        fill_kitchen(2)
+
+        response = await client.post("/api/orders", json=PAYLOAD)
+
+        assert response.status_code == 201
+        assert admission.stats()["admitted"] == 1
+
+    async def test_stale_orders_do_not_block(self, client, test_db, monkeypatch):
+        """Test that old pending orders nobody closed do not fill the kitchen."""
+        monkeypatch.setattr(admission, "max_active", 40)
+        for age in (timedelta(days=90), timedelta(hours=5)):
+            await test_db.orders.insert_many([
+                {"id": f"stale{age.days}-{n}", "status": "pending", "payment_method": "cod",
+                 "payment_status": "pending", "created_at": datetime.utcnow() - age}
+                for n in range(45)
+            ])
+
+        response = await client.post("/api/orders", json=PAYLOAD)
+
+        assert response.status_code == 201
+        assert admission.stats()["active_orders"] == 1
+
+    async def test_failed_order_releases_slot(self, client, monkeypatch):
+        """Test that an order failing after admission does not use the window's allowance."""
+        monkeypatch.setattr(admission, "max_per_window", 1)
+
+        async def broken(db, order):
+            raise RuntimeError("insert failed")
+        monkeypatch.setattr("backend.routes.orders.encode_order", broken)
+        failed = await client.post("/api/orders", json=PAYLOAD)
+        monkeypatch.undo()
+        monkeypatch.setattr(admission, "max_per_window", 1)
+        accepted = await client.post("/api/orders", json=PAYLOAD)
+
+        assert failed.status_code == 500
+        assert accepted.status_code == 201
+        assert admission.stats()["admitted"] == 1
+
+    async def test_burst_limit_per_window(self, client, monkeypatch):
+        """Test that a burst is cut off once the window's allowance is used."""
+        monkeypatch.setattr(admission, "max_per_window", 2)
+        statuses = [
+            (await client.post("/api/orders", json={**PAYLOAD, "phone": f"912345678{n}"})).status_code
+            for n in range(3)
+        ]
+
+        assert statuses == [201, 201, 503]
+        assert admission.stats()["rejected"][INTAKE_RATE] == 1
+        assert admission.stats()["window_orders"] == 2
+
+    async def test_replay_is_not_rejected(self, client, monkeypatch):
+        """Test that retrying an accepted order still gets its stored response."""
+        monkeypatch.setattr(admission, "max_per_window", 1)
+        headers = {"Idempotency-Key": "admission-replay"}
+        first = await client.post("/api/orders", json=PAYLOAD, headers=headers)
+        again = await client.post("/api/orders", json=PAYLOAD, headers=headers)
+
+        assert first.status_code == 201
+        assert again.status_code == 201
+        assert again.json()["id"] == first.json()["id"]
+
+    async def test_admission_in_metrics(self, client, admin_token):
+        """Test that admission counters are reported."""
+        response = await client.get("/api/admin/metrics", headers={"Authorization": f"Bearer {admin_token}"})
+
+        assert response.status_code == 200
+        assert "admission" in response.json()
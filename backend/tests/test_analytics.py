@@ -0,0 +1,140 @@
+"""
+Test suite for materialized sales analytics.
+
+Tests:
+- Full build and incremental refresh of the item sales view
+- Archived orders counted once
+- Item, category and heatmap endpoints
+"""
+
+from datetime import datetime, timedelta
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.services.analytics import ITEM_SALES_COLLECTION, item_sales, refresh_item_sales
+
+DAY1 = datetime(2024, 1, 1, 12)  # a Monday
+DAY2 = datetime(2024, 1, 2, 19)
+
+
+def order(n, created_at, cart, status="completed", **extra):
+    return {
+        "id": f"order{n}",
+        "status": status,
+        "payment_method": "cod",
+        "cart_items": [{"item_name": name, "quantity": quantity, "price": price} for name, quantity, price in cart],
+        "total": sum(quantity * price for _, quantity, price in cart),
+        "created_at": created_at,
+        "updated_at": created_at,
+        **extra,
+    }
+
+
+def by_name(items):
+    return {item["item_name"]: (item["quantity"], item["revenue"]) for item in items}
+
+
+class TestItemSalesRefresh:
+    """Test maintaining the item sales view."""
+
+    async def test_full_build_counts_sold_items(self, test_db):
+        """Test that the first refresh covers history and skips unsold orders."""
+        await test_db.orders.insert_many([
+            order(1, DAY1, [("Dosa", 2, 60.0), ("Coffee", 1, 30.0)]),
+            order(2, DAY2, [("Dosa", 1, 60.0)]),
+            order(3, DAY2, [("Dosa", 5, 60.0)], status="cancelled"),
+            order(4, DAY2, [("Dosa", 5, 60.0)], payment_method="razorpay", payment_status="pending"),
+        ])
+
+        summary = await refresh_item_sales(test_db)
+
+        assert summary["full"] is True
+        assert by_name(await item_sales(test_db)) == {"Dosa": (3, 180.0), "Coffee": (1, 30.0)}
+        assert by_name(await item_sales(test_db, "2024-01-02", "2024-01-02")) == {"Dosa": (1, 60.0)}
+
+    async def test_incremental_refresh_recomputes_changed_days(self, test_db):
+        """Test that only days with changed orders are recomputed, dropping rows that lost their sales."""
+        await test_db.orders.insert_many([
+            order(1, DAY1, [("Dosa", 2, 60.0)]),
+            order(2, DAY2, [("Coffee", 1, 30.0)]),
+        ])
+        await refresh_item_sales(test_db)
+        day1_row = await test_db[ITEM_SALES_COLLECTION].find_one({"day": "2024-01-01"})
+
+        await test_db.orders.update_one(
+            {"id": "order2"},
+            {"$set": {"status": "cancelled", "updated_at": datetime.utcnow()}}
+        )
+        summary = await refresh_item_sales(test_db)
+
+        assert summary == {"full": False, "days": 1}
+        assert by_name(await item_sales(test_db)) == {"Dosa": (2, 120.0)}
+        # Day 1 was left alone
+        assert await test_db[ITEM_SALES_COLLECTION].find_one({"day": "2024-01-01"}) == day1_row
+
+    async def test_archived_orders_counted_once(self, test_db):
+        """Test that a day with hot and archived orders adds both, once."""
+        from backend.services.archival import run_archival
+
+        old = datetime.utcnow() - timedelta(days=60)
+        await test_db.orders.insert_many([
+            order(1, old, [("Dosa", 1, 60.0)]),
+            order(2, old, [("Dosa", 2, 60.0)], status="pending"),
+        ])
+        await refresh_item_sales(test_db)
+        await run_archival(test_db, after_days=30)
+        await test_db.orders.update_one({"id": "order2"}, {"$set": {"updated_at": datetime.utcnow()}})
+
+        await refresh_item_sales(test_db)
+
+        assert by_name(await item_sales(test_db)) == {"Dosa": (3, 180.0)}
+
+
+class TestAnalyticsEndpoints:
+    """Test the admin analytics endpoints."""
+
+    async def test_items_and_categories(self, client, admin_token, test_db):
+        """Test top items by revenue and their categories."""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        await test_db.menu.insert_many([
+            {"id": "m1", "name": "Dosa", "category": "tiffin", "price": 60.0},
+            {"id": "m2", "name": "Coffee", "category": "beverages", "price": 30.0},
+        ])
+        await test_db.orders.insert_one(order(1, DAY1, [("Dosa", 1, 60.0), ("Coffee", 3, 30.0)]))
+
+        refreshed = await client.post("/api/admin/analytics/refresh", headers=headers)
+        items = await client.get("/api/admin/analytics/items?sort=revenue&limit=1", headers=headers)
+        categories = await client.get("/api/admin/analytics/categories", headers=headers)
+
+        assert refreshed.json()["full"] is True
+        assert items.json() == [{"item_name": "Coffee", "category": "beverages", "quantity": 3, "revenue": 90.0, "orders": 1}]
+        assert [row["category"] for row in categories.json()] == ["beverages", "tiffin"]
+
+    async def test_invalid_sort(self, client, admin_token):
+        """Test that unknown sort keys are rejected."""
+        response = await client.get(
+            "/api/admin/analytics/items?sort=price",
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        assert response.status_code == 400
+
+    async def test_heatmap(self, client, admin_token, test_db):
+        """Test that the heatmap has every hour of the week and reads the rollups."""
+        from backend.services.sales_rollups import rebuild_rollups
+
+        await test_db.orders.insert_many([
+            order(1, DAY1, [("Dosa", 1, 60.0)]),
+            order(2, DAY1 + timedelta(minutes=5), [("Dosa", 1, 60.0)], status="cancelled"),
+        ])
+        await rebuild_rollups(test_db)
+
+        response = await client.get(
+            "/api/admin/analytics/heatmap",
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+
+        cells = response.json()
+        assert len(cells) == 168
+        monday_noon = next(cell for cell in cells if cell["weekday"] == 0 and cell["hour"] == 12)
+        assert monday_noon == {"weekday": 0, "hour": 12, "orders": 1, "revenue": 60.0}
+        assert sum(cell["orders"] for cell in cells) == 1
@@ -0,0 +1,167 @@
+"""
+Test suite for hot/cold order archival.
+
+Tests:
+- Compact archive format round trip
+- Only finished, old orders move
+- Re-running after an interrupted move
+- Read endpoints, dashboard and export see archived orders
+"""
+
+from datetime import datetime, timedelta
+import copy
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.services.archival import (
+    ARCHIVE_COLLECTION,
+    compact_order,
+    expand_order,
+    run_archival,
+)
+
+OLD = datetime.utcnow() - timedelta(days=90)
+
+
+def order(n, status="completed", created_at=OLD, **extra):
+    return {
+        "id": f"order{n}",
+        "order_number": f"ORD-20240101-{n:06d}",
+        "customer_name": f"Customer {n}",
+        "phone": "9123456789",
+        "address": "SRM University, Potheri, Chennai",
+        "landmark": "",
+        "items": "1x Dosa",
+        "cart_items": [{"item_name": "Dosa", "quantity": 2, "price": 60.0, "subtotal": 120.0}],
+        "notes": None,
+        "order_type": "delivery",
+        "delivery_area": "SRM",
+        "delivery_charge": 20.0,
+        "subtotal": 120.0,
+        "total": 140.0,
+        "payment_method": "cod",
+        "payment_status": "pending",
+        "estimated_delivery_time": "45-60 minutes",
+        "status": status,
+        "created_at": created_at,
+        "updated_at": created_at,
+        **extra,
+    }
+
+
+class TestCompactFormat:
+    """Test the compact archive document format."""
+
+    def test_compact_drops_defaults(self):
+        """Test that defaults and derived subtotals are not stored."""
+        compact = compact_order(order(1))
+
+        for key in ("notes", "payment_method", "payment_status", "estimated_delivery_time"):
+            assert key not in compact
+        assert "subtotal" not in compact["cart_items"][0]
+        assert compact["total"] == 140.0
+
+    def test_expand_restores_response_fields(self):
+        """Test that an expanded archive document is a valid order response."""
+        from backend.models import OrderResponse
+
+        expanded = expand_order(compact_order(order(1)))
+
+        assert expanded["cart_items"][0]["subtotal"] == 120.0
+        assert expanded["payment_method"] == "cod"
+        OrderResponse(**expanded)
+
+    def test_round_trip_is_exact(self):
+        """Test that empty strings, empty maps and odd-typed amounts read back unchanged."""
+        original = order(1, status_times={}, delivery_charge=0, admin_notes="")
+        original["cart_items"].append({"item_name": "Vada", "quantity": 1, "price": 30, "subtotal": 30.0})
+
+        expanded = expand_order(compact_order(copy.deepcopy(original)))
+
+        assert expanded == original
+        assert type(expanded["delivery_charge"]) is int
+        assert type(expanded["cart_items"][1]["subtotal"]) is float
+
+
+class TestArchivalJob:
+    """Test moving orders between the hot and archive collections."""
+
+    async def test_moves_only_finished_old_orders(self, test_db):
+        """Test that recent or active orders stay hot."""
+        await test_db.orders.insert_many([
+            order(1),
+            order(2, status="cancelled"),
+            order(3, status="pending"),
+            order(4, created_at=datetime.utcnow()),
+        ])
+
+        moved = await run_archival(test_db, after_days=30, batch_size=1)
+
+        assert moved == 2
+        assert sorted(await test_db.orders.distinct("id")) == ["order3", "order4"]
+        assert sorted(await test_db[ARCHIVE_COLLECTION].distinct("id")) == ["order1", "order2"]
+
+    async def test_rerun_after_interrupted_move(self, test_db):
+        """Test that an order copied but not yet deleted is finished without duplicating it."""
+        await test_db.orders.insert_one(order(1))
+        copied = await test_db.orders.find_one({"id": "order1"})
+        await test_db[ARCHIVE_COLLECTION].insert_one(compact_order(copied))
+
+        await run_archival(test_db, after_days=30)
+
+        assert await test_db.orders.count_documents({}) == 0
+        assert await test_db[ARCHIVE_COLLECTION].count_documents({}) == 1
+
+
+class TestArchivedReads:
+    """Test that archived orders stay visible."""
+
+    async def test_get_order_falls_back_to_archive(self, client, test_db):
+        """Test lookups by id and by order number after archiving."""
+        await test_db.orders.insert_one(order(1))
+        await run_archival(test_db, after_days=30)
+
+        by_id = await client.get("/api/orders/order1")
+        by_number = await client.get("/api/orders/number/ORD-20240101-000001")
+
+        assert by_id.status_code == 200
+        assert by_id.json()["cart_items"][0]["subtotal"] == 120.0
+        assert by_number.json()["id"] == "order1"
+
+    async def test_get_missing_order(self, client):
+        """Test that an unknown id is a 404."""
+        response = await client.get("/api/orders/missing")
+        assert response.status_code == 404
+
+    async def test_dashboard_counts_archived_orders(self, client, admin_token, test_db):
+        """Test that archiving does not change dashboard totals."""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        from backend.services.sales_rollups import rebuild_rollups
+
+        await test_db.orders.insert_many([order(1), order(2, status="pending")])
+        await rebuild_rollups(test_db)
+        before = (await client.get("/api/admin/dashboard", headers=headers)).json()
+
+        await run_archival(test_db, after_days=30)
+        from backend.routes import admin
+        admin.dashboard_cache.clear()
+        after = (await client.get("/api/admin/dashboard", headers=headers)).json()
+
+        assert before["total_orders"] == 2
+        assert before["total_revenue"] == 140.0
+        assert after == before
+
+    async def test_export_includes_archive(self, client, admin_token, test_db):
+        """Test that exports cover archived and hot orders."""
+        import json
+
+        await test_db.orders.insert_many([order(1), order(2, created_at=datetime.utcnow())])
+        await run_archival(test_db, after_days=30)
+
+        response = await client.get(
+            "/api/admin/orders/export?fields=id,payment_method",
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert rows == [{"id": "order1", "payment_method": "cod"}, {"id": "order2", "payment_method": "cod"}]
@@ -320,3 +320,55 @@ class TestLogout:
         )
         
         assert response.status_code == 401
+
+
+class TestPasswordWorkerPool:
+    """Test that bcrypt work stays off the event loop."""
+    
+    async def test_event_loop_stays_responsive(self):
+        """Test that the loop keeps ticking while a hash is computed."""
+        import asyncio
+        import time
+        from backend.services.password_pool import PasswordWorkerPool
+        
+        pool = PasswordWorkerPool(workers=1, max_queue=1)
+        finished = {}
+        
+        async def hash_call():
+            await pool.run(time.sleep, 0.2)
+            finished["hash"] = time.perf_counter()
+        
+        async def ticker():
+            for _ in range(5):
+                await asyncio.sleep(0.01)
+            finished["ticker"] = time.perf_counter()
+        
+        try:
+            await asyncio.gather(hash_call(), ticker())
+        finally:
+            pool.shutdown()
+        
+        # A blocked loop could only finish the ticker after the hash
+        assert finished["ticker"] < finished["hash"]
+        assert pool.stats()["completed"] == 1
+    
+    async def test_saturated_pool_rejects_with_503(self):
+        """Test that calls beyond workers + queue are rejected."""
+        import asyncio
+        import time
+        from fastapi import HTTPException
+        from backend.services.password_pool import PasswordWorkerPool
+        
+        pool = PasswordWorkerPool(workers=1, max_queue=1)
+        try:
+            running = [asyncio.ensure_future(pool.run(time.sleep, 0.05)) for _ in range(2)]
+            await asyncio.sleep(0)
+            with pytest.raises(HTTPException) as exc_info:
+                await pool.run(time.sleep, 0)
+            assert exc_info.value.status_code == 503
+            await asyncio.gather(*running)
+        finally:
+            pool.shutdown()
+        
+        assert pool.stats()["rejected"] == 1
+        assert pool.stats()["in_flight"] == 0
@@ -0,0 +1,84 @@
+"""
+Test suite for ETag / If-None-Match handling on menu and specials reads.
+
+Tests:
+- Version-derived ETags
+- If-None-Match matching rules
+- 304 responses from the public list endpoints
+"""
+
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.services.content_versions import ContentVersions, etag_matches
+
+
+class TestContentVersions:
+    """Test the version counters behind the ETags."""
+
+    def test_etag_stable_until_bump(self):
+        """Test that the ETag only changes when the collection changes."""
+        versions = ContentVersions()
+        etag = versions.etag("menu", None, True)
+        assert versions.etag("menu", None, True) == etag
+        versions.bump("menu")
+        assert versions.etag("menu", None, True) != etag
+
+    def test_etag_depends_on_query(self):
+        """Test that different query parameters get different ETags."""
+        versions = ContentVersions()
+        assert versions.etag("specials", True) != versions.etag("specials", False)
+
+    def test_collections_are_independent(self):
+        """Test that bumping one collection keeps other ETags valid."""
+        versions = ContentVersions()
+        etag = versions.etag("specials", True)
+        versions.bump("menu")
+        assert versions.etag("specials", True) == etag
+
+    def test_etag_matches(self):
+        """Test If-None-Match parsing."""
+        assert etag_matches('"abc"', '"abc"')
+        assert etag_matches('W/"abc"', '"abc"')
+        assert etag_matches('"x", "abc"', '"abc"')
+        assert etag_matches('*', '"abc"')
+        assert not etag_matches(None, '"abc"')
+        assert not etag_matches('"abd"', '"abc"')
+
+
+class TestConditionalEndpoints:
+    """Test 304 responses from the public read endpoints."""
+
+    async def test_specials_not_modified(self, client):
+        """Test that a matching If-None-Match returns 304 with no body."""
+        first = await client.get("/api/specials")
+        assert first.status_code == 200
+        etag = first.headers["etag"]
+
+        second = await client.get("/api/specials", headers={"If-None-Match": etag})
+        assert second.status_code == 304
+        assert second.content == b""
+
+    async def test_specials_etag_changes_after_write(self, client):
+        """Test that creating a special invalidates the previous ETag."""
+        first = await client.get("/api/specials?active_only=false")
+        etag = first.headers["etag"]
+
+        await client.post("/api/specials", json={
+            "name": "Paneer Tikka",
+            "description": "Chargrilled cottage cheese",
+            "original_price": 200,
+            "special_price": 150
+        })
+
+        second = await client.get("/api/specials?active_only=false", headers={"If-None-Match": etag})
+        assert second.status_code == 200
+        assert second.headers["etag"] != etag
+
+    async def test_menu_not_modified(self, client):
+        """Test that the menu listing honours If-None-Match."""
+        first = await client.get("/api/menu")
+        etag = first.headers["etag"]
+
+        second = await client.get("/api/menu", headers={"If-None-Match": etag})
+        assert second.status_code == 304
@@ -0,0 +1,121 @@
+"""
+Test suite for the timestamp string -> date migration.
+
+Tests:
+- String timestamps converted in batches, other values left alone
+- Resume from the checkpoint, restart from scratch
+- New special writes store dates and reads need no parsing
+"""
+
+from datetime import datetime
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.services.datetime_migration import migrate_collection, migrate_datetimes, parse_timestamp
+
+
+def legacy_special(n, created_at="2024-01-01T12:30:00.250000+05:30"):
+    return {
+        "id": f"special{n}",
+        "name": f"Special {n}",
+        "description": "Chef's special",
+        "original_price": 200.0,
+        "special_price": 150.0,
+        "discount_percent": 25,
+        "is_active": True,
+        "badge": "Today's Special",
+        "created_at": created_at,
+        "updated_at": created_at,
+    }
+
+
+class TestMigration:
+    """Test converting stored strings."""
+
+    def test_parse_timestamp(self):
+        """Test that offsets are normalised to naive UTC and junk is rejected."""
+        assert parse_timestamp("2024-01-01T12:30:00+05:30") == datetime(2024, 1, 1, 7, 0)
+        assert parse_timestamp("2024-01-01T12:30:00") == datetime(2024, 1, 1, 12, 30)
+        assert parse_timestamp("yesterday") is None
+
+    async def test_converts_in_batches(self, test_db):
+        """Test that every string becomes a date and progress is reported per batch."""
+        await test_db.specials.insert_many([legacy_special(n) for n in range(5)])
+        await test_db.specials.insert_one(legacy_special(9, created_at="not a date"))
+        batches = []
+
+        totals = await migrate_collection(
+            test_db, "specials", ("created_at", "updated_at"), batch_size=2,
+            progress=lambda collection, counts: batches.append(dict(counts))
+        )
+
+        assert totals == {"scanned": 6, "converted": 5, "unparseable": 2}
+        assert len(batches) == 3
+        converted = await test_db.specials.find_one({"id": "special0"})
+        assert converted["created_at"] == datetime(2024, 1, 1, 7, 0, 0, 250000)
+        assert isinstance(converted["updated_at"], datetime)
+        assert (await test_db.specials.find_one({"id": "special9"}))["created_at"] == "not a date"
+
+    async def test_resume_and_restart(self, test_db):
+        """Test that a second run resumes after the checkpoint and --restart rescans."""
+        await test_db.status_checks.insert_many([
+            {"id": f"check{n}", "client_name": "probe", "timestamp": "2024-01-01T00:00:00+00:00"}
+            for n in range(3)
+        ])
+        first = await migrate_datetimes(test_db, ["status_checks"])
+        await test_db.status_checks.update_one({"id": "check0"}, {"$set": {"timestamp": "2024-02-01T00:00:00"}})
+
+        resumed = await migrate_datetimes(test_db, ["status_checks"])
+        restarted = await migrate_datetimes(test_db, ["status_checks"], restart=True)
+
+        assert first["status_checks"]["converted"] == 3
+        assert resumed["status_checks"]["converted"] == 3
+        assert restarted["status_checks"]["converted"] == 1
+        assert (await test_db.status_checks.find_one({"id": "check0"}))["timestamp"] == datetime(2024, 2, 1)
+
+
+class TestNativeDates:
+    """Test that write paths store dates."""
+
+    async def test_special_writes_store_dates(self, client, test_db):
+        """Test that created and updated specials keep dates, and reads return them."""
+        created = (await client.post("/api/specials", json={
+            "name": "Paneer Tikka", "description": "Chef's special tikka",
+            "original_price": 200, "special_price": 150
+        })).json()
+        await client.put(f"/api/specials/{created['id']}", json={"badge": "New"})
+        await client.patch(f"/api/specials/{created['id']}/toggle")
+
+        stored = await test_db.specials.find_one({"id": created["id"]})
+        fetched = await client.get(f"/api/specials/{created['id']}")
+
+        assert isinstance(stored["created_at"], datetime)
+        assert isinstance(stored["updated_at"], datetime)
+        assert fetched.status_code == 200
+        assert fetched.json()["badge"] == "New"
+
+    async def test_reads_keep_utc_offset(self, client, test_db):
+        """Test that stored dates (and strings not yet migrated) are served with the UTC suffix."""
+        await test_db.specials.insert_many([
+            {**legacy_special(1), "created_at": datetime(2024, 1, 1, 7, 0), "updated_at": datetime(2024, 1, 1, 7, 0)},
+            legacy_special(2),
+        ])
+
+        listed = (await client.get("/api/specials?active_only=false")).json()
+        single = (await client.get("/api/specials/special1")).json()
+        updated = (await client.put("/api/specials/special1", json={"badge": "New"})).json()
+
+        assert {special["created_at"] for special in listed} == {"2024-01-01T07:00:00Z", "2024-01-01T07:00:00.250000Z"}
+        assert single["created_at"] == "2024-01-01T07:00:00Z"
+        assert updated["created_at"] == "2024-01-01T07:00:00Z"
+        assert updated["updated_at"].endswith("Z")
+
+    async def test_status_checks_keep_utc_offset(self, client, test_db, monkeypatch):
+        """Test that status check timestamps are served with the UTC suffix."""
+        from backend import server
+        monkeypatch.setattr(server, "db", test_db)
+        await test_db.status_checks.insert_one({"id": "check1", "client_name": "probe", "timestamp": datetime(2024, 1, 1)})
+
+        checks = (await client.get("/api/status")).json()
+
+        assert checks == [{"id": "check1", "client_name": "probe", "timestamp": "2024-01-01T00:00:00Z"}]
@@ -0,0 +1,167 @@
+"""
+Test suite for the delivery ETA model.
+
+Tests:
+- Estimates from defaults, queue depth and order type
+- Stale open orders and runaway queues do not inflate the estimate
+- Learning from status changes and from order history
+- Orders carry the estimate and their status times
+"""
+
+from datetime import datetime, timedelta
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.services.eta import (
+    ETA_DEFAULT_DELIVERY_MINUTES,
+    ETA_DEFAULT_PREP_MINUTES,
+    ETA_KITCHEN_CAPACITY,
+    ETA_MAX_WAIT_MINUTES,
+    ETA_MIN_SAMPLES,
+    EtaModel,
+    eta_model,
+    format_range,
+)
+from backend.services.kitchen_queue import kitchen_queue
+
+START = datetime(2024, 1, 1, 12)
+
+
+def at(minutes):
+    return START + timedelta(minutes=minutes)
+
+
+def history_order(n, kitchen, travel, area="SRM"):
+    return {
+        "id": f"order{n}",
+        "status": "delivered",
+        "delivery_area": area,
+        "status_times": {
+            "pending": at(0),
+            "preparing": at(2),
+            "out_for_delivery": at(kitchen),
+            "delivered": at(kitchen + travel),
+        },
+        "created_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow(),
+    }
+
+
+class TestEstimates:
+    """Test estimates from the in-memory model."""
+
+    def test_format_range(self):
+        """Test that estimates are shown as 15 minute ranges."""
+        assert format_range(42.3) == "40-55 minutes"
+        assert format_range(1) == "5-20 minutes"
+
+    def test_defaults_and_pickup(self):
+        """Test that an untrained model uses the defaults and pickup skips travel."""
+        model = EtaModel()
+
+        delivery = model.estimate("delivery", "SRM")
+        pickup = model.estimate("pickup")
+
+        assert delivery["delivery_minutes"] == ETA_DEFAULT_DELIVERY_MINUTES
+        assert pickup["delivery_minutes"] == 0
+        assert pickup["estimated_delivery_time"] == format_range(ETA_DEFAULT_PREP_MINUTES)
+
+    async def test_queue_depth_adds_wait(self, client):
+        """Test that a full kitchen pushes the estimate out."""
+        model = EtaModel()
+        quiet = model.estimate("pickup")["kitchen_minutes"]
+
+        for n in range(ETA_KITCHEN_CAPACITY):
+            kitchen_queue.apply({"id": f"busy{n}", "status": "preparing", "created_at": datetime.utcnow()})
+        busy = model.estimate("pickup")
+
+        assert busy["queue_depth"] == ETA_KITCHEN_CAPACITY
+        assert busy["kitchen_minutes"] == quiet * 2
+
+    async def test_stale_orders_not_counted(self, client, test_db):
+        """Test that old orders never moved out of pending do not count as queue depth."""
+        old = datetime.utcnow() - timedelta(days=90)
+        await test_db.orders.insert_many([
+            {"id": f"old{n}", "status": "pending", "payment_method": "cod", "created_at": old, "updated_at": old}
+            for n in range(45)
+        ])
+        await kitchen_queue.ensure_loaded()
+
+        estimate = (await client.get("/api/orders/eta?order_type=pickup")).json()
+
+        assert estimate["queue_depth"] == 0
+        assert estimate["estimated_time"] == format_range(ETA_DEFAULT_PREP_MINUTES)
+
+    async def test_wait_is_capped(self, client):
+        """Test that a very long queue cannot push the estimate past the cap."""
+        model = EtaModel()
+        for n in range(ETA_KITCHEN_CAPACITY * 50):
+            kitchen_queue.apply({"id": f"busy{n}", "status": "preparing", "created_at": datetime.utcnow()})
+
+        busy = model.estimate("pickup")
+
+        assert busy["kitchen_minutes"] == ETA_DEFAULT_PREP_MINUTES + ETA_MAX_WAIT_MINUTES
+
+
+class TestLearning:
+    """Test learning durations."""
+
+    def test_observe_status_changes(self):
+        """Test that live status changes teach kitchen time once enough samples exist."""
+        model = EtaModel()
+        for n in range(ETA_MIN_SAMPLES):
+            previous = {"status": "preparing", "status_times": {"pending": at(0), "preparing": at(3)}}
+            model.observe(previous, {"status": "ready", "updated_at": at(30)})
+
+        assert model.stats()["kitchen_minutes"] == 30
+        assert model.stats()["learned"]["preparing/ready"] == 27
+
+    async def test_refresh_from_history(self, test_db):
+        """Test that recent orders' status times train kitchen and per-area delivery time."""
+        await test_db.orders.insert_many(
+            [history_order(n, kitchen=18, travel=12) for n in range(ETA_MIN_SAMPLES)]
+            + [history_order(10 + n, kitchen=18, travel=40, area="Guduvanchery") for n in range(ETA_MIN_SAMPLES)]
+        )
+        model = EtaModel()
+        model.set_database(test_db)
+
+        assert await model.refresh() == 2 * ETA_MIN_SAMPLES
+        assert model.estimate("delivery", "SRM")["delivery_minutes"] == 12
+        assert model.estimate("delivery", "Guduvanchery")["delivery_minutes"] == 40
+        assert model.estimate("delivery", "Elsewhere")["delivery_minutes"] == ETA_DEFAULT_DELIVERY_MINUTES
+        assert model.stats()["kitchen_minutes"] == 18
+
+
+class TestOrderEta:
+    """Test estimates on orders and the read endpoint."""
+
+    async def test_eta_endpoint(self, client):
+        """Test the public estimate endpoint."""
+        response = await client.get("/api/orders/eta?order_type=delivery&delivery_area=SRM")
+
+        assert response.status_code == 200
+        assert response.json() == eta_model.estimate("delivery", "SRM")
+
+    async def test_order_gets_estimate_and_status_times(self, client, admin_token, test_db):
+        """Test that new orders carry the model's estimate and status changes are timestamped."""
+        payload = {
+            "customer_name": "Eta Customer",
+            "phone": "9123456789",
+            "order_type": "delivery",
+            "address": "SRM University, Potheri, Chennai",
+            "delivery_area": "SRM",
+            "items": "Dosa x4",
+            "cart_items": [{"item_name": "Dosa", "quantity": 4, "price": 60, "subtotal": 240}],
+        }
+        created = (await client.post("/api/orders", json=payload)).json()
+        await client.put(
+            f"/api/admin/orders/{created['id']}/status",
+            json={"status": "preparing"},
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+
+        stored = await test_db.orders.find_one({"id": created["id"]})
+        assert created["estimated_delivery_time"] == eta_model.estimate("delivery", "SRM")["estimated_delivery_time"]
+        assert created["estimated_time"] == eta_model.estimate("delivery", "SRM")["estimated_time"]
+        assert set(stored["status_times"]) == {"pending", "preparing"}
+        assert eta_model.stats()["observed"] >= 1
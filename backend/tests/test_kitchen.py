@@ -0,0 +1,140 @@
+"""
+Test suite for the kitchen display queue.
+
+Tests:
+- Queue rebuilt from MongoDB, oldest first, unpaid online orders excluded
+- Stale open orders left out and aged out
+- Order write paths update the queue in memory
+- Change-feed sync picks up writes from other workers
+- ETag / 304 on repeated polls
+"""
+
+from datetime import datetime, timedelta
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.services.kitchen_queue import ORDER_REMOVED, kitchen_queue
+
+PAYLOAD = {
+    "customer_name": "Kitchen Customer",
+    "phone": "9123456789",
+    "order_type": "pickup",
+    "address": "SRM University, Potheri, Chennai",
+    "items": "Dosa x4",
+    "cart_items": [{"item_name": "Dosa", "quantity": 4, "price": 60, "subtotal": 240}],
+}
+
+
+def order(n, status="pending", minutes_ago=0, **extra):
+    at = datetime.utcnow() - timedelta(minutes=minutes_ago)
+    return {
+        "id": f"order{n}",
+        "order_number": f"ORD-20240101-{n:06d}",
+        "customer_name": f"Customer {n}",
+        "phone": "9123456789",
+        "cart_items": [{"item_name": "Dosa", "quantity": 1, "price": 60.0, "subtotal": 60.0}],
+        "payment_method": "cod",
+        "status": status,
+        "created_at": at,
+        "updated_at": at,
+        **extra,
+    }
+
+
+class TestKitchenQueue:
+    """Test the kitchen queue endpoint and its in-memory index."""
+
+    async def test_requires_admin(self, client):
+        """Test that the queue is not public."""
+        response = await client.get("/api/kitchen/queue")
+        assert response.status_code == 401
+
+    async def test_rebuilt_from_database(self, client, admin_token, test_db):
+        """Test that the first read loads active orders, oldest first."""
+        await test_db.orders.insert_many([
+            order(1, minutes_ago=5),
+            order(2, status="preparing", minutes_ago=20),
+            order(3, status="completed", minutes_ago=30),
+            order(4, payment_method="razorpay", payment_status="pending", minutes_ago=40),
+            order(5, status="confirmed", payment_method="razorpay", payment_status="paid", minutes_ago=10),
+        ])
+
+        response = await client.get("/api/kitchen/queue", headers={"Authorization": f"Bearer {admin_token}"})
+
+        assert response.status_code == 200
+        queue = response.json()
+        assert [entry["id"] for entry in queue] == ["order2", "order5", "order1"]
+        assert "phone" not in queue[0]
+
+    async def test_stale_open_orders_excluded(self, client, admin_token, test_db):
+        """Test that abandoned orders still marked pending stay off the queue, on rebuild and sync."""
+        await test_db.orders.insert_many(
+            [order(n, minutes_ago=90 * 24 * 60) for n in range(1, 46)] + [order(50, minutes_ago=5)]
+        )
+
+        await kitchen_queue.ensure_loaded()
+        # An old order touched by another worker comes through the change feed, but stays out
+        await test_db.orders.update_one(
+            {"id": "order1"}, {"$set": {"notes": "edited", "updated_at": datetime.utcnow()}}
+        )
+        await kitchen_queue.sync()
+
+        assert [entry["id"] for entry in kitchen_queue.orders()] == ["order50"]
+
+    async def test_orders_age_out(self, client, test_db, monkeypatch):
+        """Test that an order leaves the queue once it passes the age cutoff."""
+        from backend.services import kitchen_queue as kitchen_module
+        await test_db.orders.insert_one(order(1, minutes_ago=30))
+        await kitchen_queue.ensure_loaded()
+        subscription = kitchen_queue.feed.subscribe()
+
+        monkeypatch.setattr(kitchen_module, "KITCHEN_MAX_AGE_MINUTES", 20)
+        await kitchen_queue.ensure_loaded()
+
+        assert len(kitchen_queue) == 0
+        assert subscription.queue.get_nowait()[1] == ORDER_REMOVED
+        kitchen_queue.feed.unsubscribe(subscription)
+
+    async def test_write_paths_update_queue(self, client, admin_token, test_db):
+        """Test that created and completed orders enter and leave the queue without a reload."""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        await kitchen_queue.ensure_loaded()
+        rebuilds = kitchen_queue.stats()["rebuilds"]
+
+        created = (await client.post("/api/orders", json=PAYLOAD)).json()
+        assert [entry["id"] for entry in kitchen_queue.orders()] == [created["id"]]
+
+        await client.put(f"/api/admin/orders/{created['id']}/status", json={"status": "completed"}, headers=headers)
+        response = await client.get("/api/kitchen/queue", headers=headers)
+
+        assert response.json() == []
+        assert kitchen_queue.stats()["rebuilds"] == rebuilds
+
+    async def test_sync_applies_other_workers_changes(self, client, test_db):
+        """Test that changes written elsewhere arrive through the change feed."""
+        await test_db.orders.insert_one(order(1, minutes_ago=5))
+        await kitchen_queue.ensure_loaded()
+
+        await test_db.orders.insert_one(order(2, minutes_ago=1))
+        await test_db.orders.update_one(
+            {"id": "order1"},
+            {"$set": {"status": "cancelled", "updated_at": datetime.utcnow() + timedelta(seconds=1)}}
+        )
+        await kitchen_queue.sync()
+
+        assert [entry["id"] for entry in kitchen_queue.orders()] == ["order2"]
+
+    async def test_unchanged_queue_is_304(self, client, admin_token, test_db):
+        """Test that a screen polling with its ETag gets 304 until the queue changes."""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        await test_db.orders.insert_one(order(1))
+
+        first = await client.get("/api/kitchen/queue", headers=headers)
+        etag = first.headers["ETag"]
+        again = await client.get("/api/kitchen/queue", headers={**headers, "If-None-Match": etag})
+        kitchen_queue.apply(order(2))
+        changed = await client.get("/api/kitchen/queue", headers={**headers, "If-None-Match": etag})
+
+        assert again.status_code == 304
+        assert changed.status_code == 200
+        assert len(changed.json()) == 2
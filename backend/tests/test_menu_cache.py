@@ -0,0 +1,68 @@
+"""
+Test suite for the in-process menu catalog cache.
+
+Tests:
+- Hit/miss accounting
+- LRU bound
+- Invalidation and stale-write protection
+- Disabled switch
+"""
+
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.services.menu_cache import MenuCatalogCache
+
+
+class TestMenuCatalogCache:
+    """Test the menu catalog cache directly."""
+
+    def test_miss_then_hit(self):
+        """Test that a stored listing is served on the next lookup."""
+        cache = MenuCatalogCache(max_entries=4, enabled=True)
+        assert cache.get_items("mains", True) is None
+        cache.put_items("mains", True, ["item"], cache.generation)
+        assert cache.get_items("mains", True) == ["item"]
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_keys_include_available_only(self):
+        """Test that available_only is part of the cache key."""
+        cache = MenuCatalogCache(max_entries=4, enabled=True)
+        cache.put_items(None, True, ["available"], cache.generation)
+        assert cache.get_items(None, False) is None
+
+    def test_bounded_size(self):
+        """Test that the least recently used entry is evicted."""
+        cache = MenuCatalogCache(max_entries=2, enabled=True)
+        cache.put_items("a", True, [1], cache.generation)
+        cache.put_items("b", True, [2], cache.generation)
+        cache.get_items("a", True)
+        cache.put_items("c", True, [3], cache.generation)
+        assert cache.get_items("b", True) is None
+        assert cache.get_items("a", True) == [1]
+        assert cache.stats()["evictions"] == 1
+
+    def test_invalidate_drops_entries(self):
+        """Test that a menu write clears listings and categories."""
+        cache = MenuCatalogCache(max_entries=4, enabled=True)
+        cache.put_items(None, True, [1], cache.generation)
+        cache.put_categories(["mains"], cache.generation)
+        cache.invalidate()
+        assert cache.get_items(None, True) is None
+        assert cache.get_categories() is None
+
+    def test_stale_read_not_stored(self):
+        """Test that a read started before a write is not cached."""
+        cache = MenuCatalogCache(max_entries=4, enabled=True)
+        generation = cache.generation
+        cache.invalidate()
+        cache.put_items(None, True, ["stale"], generation)
+        assert cache.get_items(None, True) is None
+
+    def test_disabled_cache(self):
+        """Test that a disabled cache never stores or serves entries."""
+        cache = MenuCatalogCache(max_entries=4, enabled=False)
+        cache.put_items(None, True, [1], cache.generation)
+        assert cache.get_items(None, True) is None
+        assert cache.stats()["misses"] == 0
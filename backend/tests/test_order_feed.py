@@ -0,0 +1,198 @@
+"""
+Test suite for the live admin order feed.
+
+Tests:
+- Bounded per-client buffers and resync on overflow
+- Client limit
+- Events published by order creation and status updates
+- Stream authentication
+"""
+
+import pytest
+import asyncio
+from datetime import datetime, timezone
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from fastapi import HTTPException
+from backend.routes.auth import STREAM_TICKETS_COLLECTION, get_stream_admin, redeem_stream_ticket
+from backend.services.events import RESYNC, EventBroker, format_sse, sse_stream
+from backend.services.order_events import ORDER_CREATED, ORDER_STATUS_CHANGED, order_feed
+
+
+def drain(subscription):
+    events = []
+    while not subscription.queue.empty():
+        events.append(subscription.queue.get_nowait())
+    return events
+
+
+@pytest.fixture
+def feed():
+    """Subscribe to the order feed for the duration of a test."""
+    subscription = order_feed.subscribe()
+    yield subscription
+    subscription.close()
+
+
+class TestEventBroker:
+    """Test the in-process broker."""
+
+    async def test_publish_reaches_every_subscriber(self):
+        """Test that each subscriber gets its own copy of an event."""
+        broker = EventBroker("test", buffer_size=4)
+        first, second = broker.subscribe(), broker.subscribe()
+
+        broker.publish("ping", {"n": 1})
+
+        assert [e[1:] for e in drain(first)] == [("ping", {"n": 1})]
+        assert [e[1:] for e in drain(second)] == [("ping", {"n": 1})]
+
+    async def test_slow_subscriber_gets_resync(self):
+        """Test that an overflowing buffer is replaced by one resync event."""
+        broker = EventBroker("test", buffer_size=3)
+        slow = broker.subscribe()
+
+        for n in range(10):
+            broker.publish("ping", {"n": n})
+
+        events = drain(slow)
+        assert len(events) <= 3
+        assert RESYNC in [e[1] for e in events]
+        assert broker.stats()["dropped"] > 0
+
+    async def test_client_limit(self):
+        """Test that subscribers beyond the limit are turned away."""
+        broker = EventBroker("test", max_clients=1)
+        broker.subscribe()
+
+        with pytest.raises(HTTPException) as exc:
+            broker.subscribe()
+        assert exc.value.status_code == 503
+
+    async def test_stream_unsubscribes_on_exit(self):
+        """Test that the SSE generator frames events and releases its slot."""
+        broker = EventBroker("test")
+        subscription = broker.subscribe()
+        broker.publish("ping", {"n": 1})
+
+        async def disconnected():
+            return True
+
+        frames = [frame async for frame in sse_stream(subscription, disconnected, heartbeat_seconds=0.01)]
+
+        assert format_sse(1, "ping", {"n": 1}) in frames
+        assert broker.stats()["clients"] == 0
+
+
+class TestOrderFeedEvents:
+    """Test that order writes are announced on the feed."""
+
+    async def test_create_order_publishes(self, client, test_db, feed):
+        """Test that a new order is announced."""
+        response = await client.post("/api/orders", json={
+            "customer_name": "Test Customer",
+            "phone": "9123456789",
+            "order_type": "pickup",
+            "address": "Counter pickup",
+            "items": "Test Item x1",
+            "cart_items": [{"item_name": "Test Item", "quantity": 1, "price": 120, "subtotal": 120}]
+        })
+        assert response.status_code == 201
+
+        events = drain(feed)
+        assert [e[1] for e in events] == [ORDER_CREATED]
+        assert events[0][2]["id"] == response.json()["id"]
+        assert "_id" not in events[0][2]
+
+    async def test_admin_status_update_publishes(self, client, admin_token, test_db, feed):
+        """Test that an admin status change is announced with the new status."""
+        await test_db.orders.insert_one({
+            "order_id": "order1",
+            "customer_name": "Customer 1",
+            "status": "pending",
+            "created_at": datetime.now(timezone.utc)
+        })
+
+        response = await client.put(
+            "/api/admin/orders/order1/status",
+            headers={"Authorization": f"Bearer {admin_token}"},
+            json={"status": "ready", "notes": None}
+        )
+
+        assert response.status_code == 200
+        events = drain(feed)
+        assert [e[1] for e in events] == [ORDER_STATUS_CHANGED]
+        assert events[0][2]["status"] == "ready"
+
+    async def test_patch_status_by_id(self, client, admin_token, test_db, feed):
+        """Test the panel's PATCH route updates by application id."""
+        await test_db.orders.insert_one({"id": "abc", "status": "pending"})
+
+        response = await client.patch(
+            "/api/orders/abc/status",
+            headers={"Authorization": f"Bearer {admin_token}"},
+            json={"status": "confirmed"}
+        )
+
+        assert response.status_code == 200
+        assert (await test_db.orders.find_one({"id": "abc"}))["status"] == "confirmed"
+        assert [e[1] for e in drain(feed)] == [ORDER_STATUS_CHANGED]
+
+    async def test_failed_update_publishes_nothing(self, client, admin_token, feed):
+        """Test that updating a missing order is a 404 with no event."""
+        response = await client.put(
+            "/api/admin/orders/missing/status",
+            headers={"Authorization": f"Bearer {admin_token}"},
+            json={"status": "ready"}
+        )
+
+        assert response.status_code == 404
+        assert drain(feed) == []
+
+
+class TestOrderStreamAuth:
+    """Test authentication on the stream endpoint."""
+
+    async def test_stream_requires_token(self, client):
+        """Test that the stream rejects anonymous clients."""
+        response = await client.get("/api/admin/orders/stream")
+        assert response.status_code == 401
+
+    async def test_stream_rejects_query_jwt(self, client, admin_token):
+        """Test that a bearer token is not accepted in the query string."""
+        response = await client.get(f"/api/admin/orders/stream?token={admin_token}")
+        assert response.status_code == 401
+
+    async def test_stream_rejects_bad_ticket(self, client):
+        """Test that an unknown ?ticket= is rejected."""
+        response = await client.get("/api/admin/orders/stream?ticket=garbage")
+        assert response.status_code == 401
+
+    async def test_ticket_requires_admin(self, client):
+        """Test that tickets are only issued to authenticated admins."""
+        response = await client.post("/api/admin/orders/stream-ticket")
+        assert response.status_code == 401
+
+    async def test_ticket_is_single_use(self, client, admin_token, test_db):
+        """Test that a ticket opens the stream once and only its hash is stored."""
+        response = await client.post(
+            "/api/admin/orders/stream-ticket", headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        ticket = response.json()["ticket"]
+
+        assert response.status_code == 200
+        assert await test_db[STREAM_TICKETS_COLLECTION].count_documents({"_id": ticket}) == 0
+        assert await get_stream_admin(authorization=None, ticket=ticket) == {"username": "testadmin"}
+        with pytest.raises(HTTPException) as exc:
+            await get_stream_admin(authorization=None, ticket=ticket)
+        assert exc.value.status_code == 401
+
+    async def test_expired_ticket_rejected(self, client, admin_token, test_db):
+        """Test that a ticket past its expiry cannot be redeemed."""
+        ticket = (await client.post(
+            "/api/admin/orders/stream-ticket", headers={"Authorization": f"Bearer {admin_token}"}
+        )).json()["ticket"]
+        await test_db[STREAM_TICKETS_COLLECTION].update_many({}, {"$set": {"expires_at": datetime(2020, 1, 1)}})
+
+        assert await redeem_stream_ticket(ticket) is None
@@ -0,0 +1,187 @@
+"""
+Test suite for write-behind order ingestion.
+
+Tests:
+- Appends are durable in the journal before MongoDB sees them
+- Batched flush to MongoDB and segment cleanup
+- Retry after a failed flush
+- Replay of leftover segments on startup
+- create_order in journal mode
+- Lookups and status changes before the order is flushed
+"""
+
+import pytest
+import asyncio
+from datetime import datetime, timedelta
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from bson import json_util
+from backend.services.order_journal import OrderJournal, read_segment
+
+
+def order(n):
+    return {"id": f"order{n}", "order_number": f"ORD-20240101-{n:06d}", "status": "pending",
+            "created_at": datetime(2024, 1, 1, 12, 0, n)}
+
+
+class UnavailableOrders:
+    """Stands in for a stalled MongoDB."""
+
+    async def insert_many(self, docs, ordered=True):
+        raise ConnectionError("server selection timeout")
+
+
+class TestOrderJournal:
+    """Test the journal against the test database."""
+
+    async def test_append_is_journaled_before_flush(self, tmp_path, test_db):
+        """Test that an acknowledged order is on disk but not yet in MongoDB."""
+        journal = OrderJournal(str(tmp_path), batch_size=100, flush_seconds=60, enabled=True)
+        await journal.start(test_db)
+        try:
+            await asyncio.gather(*[journal.append(order(n)) for n in range(3)])
+
+            segments = list(tmp_path.glob("orders-*.jsonl"))
+            assert len(segments) == 1
+            assert [doc["id"] for doc in read_segment(segments[0])] == ["order0", "order1", "order2"]
+            assert await test_db.orders.count_documents({}) == 0
+        finally:
+            await journal.stop()
+
+    async def test_flush_writes_batch_and_removes_segment(self, tmp_path, test_db):
+        """Test that a flush inserts every pending order and deletes its segment."""
+        journal = OrderJournal(str(tmp_path), batch_size=100, flush_seconds=60, enabled=True)
+        await journal.start(test_db)
+        try:
+            for n in range(5):
+                await journal.append(order(n))
+
+            assert await journal.flush() == 5
+            assert await test_db.orders.count_documents({}) == 5
+            assert list(tmp_path.glob("orders-*.jsonl")) == []
+            assert journal.pending == 0
+        finally:
+            await journal.stop()
+
+    async def test_batch_size_triggers_flush(self, tmp_path, test_db):
+        """Test that a full batch is written without waiting for the timer."""
+        journal = OrderJournal(str(tmp_path), batch_size=2, flush_seconds=60, enabled=True)
+        await journal.start(test_db)
+        try:
+            await journal.append(order(1))
+            await journal.append(order(2))
+            for _ in range(50):
+                if await test_db.orders.count_documents({}) == 2:
+                    break
+                await asyncio.sleep(0.01)
+
+            assert await test_db.orders.count_documents({}) == 2
+        finally:
+            await journal.stop()
+
+    async def test_failed_flush_keeps_orders(self, tmp_path, test_db):
+        """Test that orders survive a MongoDB stall and are written afterwards."""
+        journal = OrderJournal(str(tmp_path), batch_size=100, flush_seconds=60, enabled=True)
+        await journal.start(test_db)
+        try:
+            await journal.append(order(1))
+            journal._db = type("StalledDb", (), {"orders": UnavailableOrders()})()
+
+            assert await journal.flush() == 0
+            assert journal.pending == 1
+            assert len(list(tmp_path.glob("orders-*.jsonl"))) == 1
+
+            journal._db = test_db
+            assert await journal.flush() == 1
+            assert await test_db.orders.count_documents({}) == 1
+        finally:
+            await journal.stop()
+
+    async def test_replay_on_start(self, tmp_path, test_db):
+        """Test that leftover segments are written on startup, skipping orders already inserted."""
+        await test_db.orders.create_index("id", unique=True, sparse=True)
+        await test_db.orders.insert_one(order(1))
+        lines = [json_util.dumps(order(n)) for n in (1, 2)]
+        (tmp_path / "orders-00000001.jsonl").write_text("\n".join(lines) + "\n{\"id\": \"torn")
+
+        journal = OrderJournal(str(tmp_path), enabled=True)
+        await journal.start(test_db)
+        await journal.stop()
+
+        assert sorted(await test_db.orders.distinct("id")) == ["order1", "order2"]
+        assert await test_db.orders.count_documents({}) == 2
+        assert list(tmp_path.glob("orders-*.jsonl")) == []
+
+
+class TestJournaledOrderCreation:
+    """Test create_order with ORDER_INGEST_MODE=journal."""
+
+    @pytest.fixture
+    async def journal(self, tmp_path, test_db, monkeypatch):
+        journal = OrderJournal(str(tmp_path), batch_size=100, flush_seconds=60, enabled=True)
+        await journal.start(test_db)
+        from backend.routes import orders
+        monkeypatch.setattr(orders, "order_journal", journal)
+        yield journal
+        await journal.stop()
+
+    async def test_create_order_acknowledged_from_journal(self, client, test_db, journal):
+        """Test that the order is returned before it is in MongoDB and lands after a flush."""
+        response = await client.post("/api/orders", json={
+            "customer_name": "Test Customer",
+            "phone": "9123456789",
+            "order_type": "pickup",
+            "address": "Counter pickup",
+            "items": "Test Item x1",
+            "cart_items": [{"item_name": "Test Item", "quantity": 1, "price": 120, "subtotal": 120}]
+        })
+
+        assert response.status_code == 201
+        assert await test_db.orders.count_documents({}) == 0
+
+        await journal.flush()
+        stored = await test_db.orders.find_one({"id": response.json()["id"]})
+        assert stored["order_number"] == response.json()["order_number"]
+
+    async def test_pending_order_readable_and_status_change_deferred(self, client, admin_token, test_db, journal):
+        """Test that an unflushed order can be read, and a status change gets 409 until it is written."""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        created = (await client.post("/api/orders", json={
+            "customer_name": "Test Customer",
+            "phone": "9123456780",
+            "order_type": "pickup",
+            "address": "Counter pickup",
+            "items": "Test Item x1",
+            "cart_items": [{"item_name": "Test Item", "quantity": 1, "price": 120, "subtotal": 120}]
+        })).json()
+
+        by_number = await client.get(f"/api/orders/number/{created['order_number']}")
+        by_id = await client.get(f"/api/orders/{created['id']}")
+        patched = await client.patch(f"/api/orders/{created['id']}/status", json={"status": "preparing"}, headers=headers)
+        admin_put = await client.put(f"/api/admin/orders/{created['id']}/status", json={"status": "preparing"}, headers=headers)
+
+        assert by_number.status_code == 200
+        assert by_number.json()["id"] == created["id"]
+        assert by_id.json()["order_number"] == created["order_number"]
+        assert patched.status_code == 409
+        assert patched.headers["Retry-After"] == str(journal.retry_after_seconds)
+        assert admin_put.status_code == 409
+        assert await test_db.orders.count_documents({}) == 0
+
+        await journal.flush()
+        patched = await client.patch(f"/api/orders/{created['id']}/status", json={"status": "preparing"}, headers=headers)
+
+        assert patched.status_code == 200
+        assert (await client.get(f"/api/orders/{created['id']}")).json()["status"] == "preparing"
+
+    async def test_flush_restamps_updated_at(self, test_db, journal):
+        """Test that a flushed order carries the time it was written, not the time it was accepted."""
+        accepted = datetime.utcnow() - timedelta(minutes=5)
+        await journal.append({**order(1), "updated_at": accepted})
+
+        await journal.flush()
+
+        stored = await test_db.orders.find_one({"id": "order1"})
+        assert stored["updated_at"] > accepted + timedelta(minutes=4)
+        assert journal.find_pending({"id": "order1"}) is None
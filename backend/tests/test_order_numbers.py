@@ -0,0 +1,96 @@
+"""
+Test suite for the order number allocator.
+
+Tests:
+- Number format and ordering
+- One counter round trip per leased block
+- Uniqueness across workers and concurrent requests
+"""
+
+import asyncio
+import re
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.services.order_numbers import OrderNumberAllocator
+
+ORDER_NUMBER_PATTERN = re.compile(r"^ORD-\d{8}-\d{6}$")
+
+
+def allocator(db, block_size=10):
+    numbers = OrderNumberAllocator(block_size=block_size)
+    numbers.set_database(db)
+    return numbers
+
+
+class TestOrderNumberAllocator:
+    """Test block leasing against the counters collection."""
+
+    async def test_numbers_are_short_and_sequential(self, test_db):
+        """Test that one worker hands out 1, 2, 3... in sortable form."""
+        numbers = allocator(test_db)
+
+        issued = [await numbers.next_number() for _ in range(3)]
+
+        assert all(ORDER_NUMBER_PATTERN.match(number) for number in issued)
+        assert [number[-6:] for number in issued] == ["000001", "000002", "000003"]
+        assert issued == sorted(issued)
+
+    async def test_one_lease_per_block(self, test_db):
+        """Test that the counter is only touched once per block."""
+        numbers = allocator(test_db, block_size=10)
+
+        for _ in range(25):
+            await numbers.next_number()
+
+        assert numbers.leases == 3
+        counter = await test_db.counters.find_one({})
+        assert counter["value"] == 30
+
+    async def test_workers_never_collide(self, test_db):
+        """Test that two workers sharing a counter lease disjoint blocks."""
+        first, second = allocator(test_db, block_size=5), allocator(test_db, block_size=5)
+
+        issued = []
+        for _ in range(12):
+            issued.append(await first.next_number())
+            issued.append(await second.next_number())
+
+        assert len(set(issued)) == len(issued)
+
+    async def test_concurrent_requests_unique(self, test_db):
+        """Test that simultaneous orders on one worker get distinct numbers."""
+        numbers = allocator(test_db, block_size=4)
+
+        issued = await asyncio.gather(*[numbers.next_number() for _ in range(20)])
+
+        assert len(set(issued)) == 20
+
+    async def test_new_day_starts_new_sequence(self, test_db):
+        """Test that a block leased for another day is not reused."""
+        numbers = allocator(test_db)
+        await numbers.next_number()
+        numbers._day = "19990101"
+
+        number = await numbers.next_number()
+
+        assert number.endswith("-000011")
+        assert numbers.leases == 2
+
+
+class TestOrderNumbersOnOrders:
+    """Test that the order endpoint uses the allocator."""
+
+    async def test_created_order_number(self, client, test_db):
+        """Test that a new order gets an allocated number."""
+        response = await client.post("/api/orders", json={
+            "customer_name": "Test Customer",
+            "phone": "9123456789",
+            "order_type": "pickup",
+            "address": "Counter pickup",
+            "items": "Test Item x1",
+            "cart_items": [{"item_name": "Test Item", "quantity": 1, "price": 120, "subtotal": 120}]
+        })
+
+        assert response.status_code == 201
+        assert ORDER_NUMBER_PATTERN.match(response.json()["order_number"])
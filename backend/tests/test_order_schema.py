@@ -0,0 +1,176 @@
+"""
+Test suite for the compact (v2) order layout.
+
+Tests:
+- Pack / unpack round trip, derived items text, interned names
+- New orders stored as v2 and read back unchanged
+- Mixed v1 / v2 reads, status changes and the kitchen queue
+- Background migration of v1 orders
+- Item sales analytics over both layouts
+"""
+
+from datetime import datetime
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import bson
+from backend.services.analytics import item_sales, refresh_item_sales
+from backend.services.kitchen_queue import kitchen_queue
+from backend.services.order_schema import (
+    CART_FIELD,
+    ITEM_NAMES_COLLECTION,
+    SCHEMA_FIELD,
+    decode_orders,
+    encode_order,
+    pack_order,
+    run_migration,
+    unpack_order,
+)
+
+NOW = datetime(2024, 1, 1, 12, 30)
+
+PAYLOAD = {
+    "customer_name": "Compact Customer",
+    "phone": "9123456789",
+    "order_type": "pickup",
+    "address": "SRM University, Potheri, Chennai",
+    "items": "3x Masala Dosa, 2x Filter Coffee",
+    "cart_items": [
+        {"item_name": "Masala Dosa", "quantity": 3, "price": 60, "subtotal": 180},
+        {"item_name": "Filter Coffee", "quantity": 2, "price": 30, "subtotal": 60},
+    ],
+}
+
+
+def v1_order(n=1, **extra):
+    return {
+        "id": f"order{n}",
+        "order_number": f"ORD-20240101-{n:06d}",
+        "customer_name": "Priya Raman",
+        "phone": "9123456789",
+        "address": "SRM University, Potheri, Chennai",
+        "landmark": None,
+        "items": "2x Masala Dosa, 1x Filter Coffee",
+        "cart_items": [
+            {"item_name": "Masala Dosa", "quantity": 2, "price": 60.0, "subtotal": 120.0},
+            {"item_name": "Filter Coffee", "quantity": 1, "price": 30.0, "subtotal": 30.0},
+        ],
+        "notes": None,
+        "admin_notes": None,
+        "order_type": "delivery",
+        "delivery_area": "SRM",
+        "delivery_charge": 20.0,
+        "subtotal": 150.0,
+        "total": 170.0,
+        "payment_method": "cod",
+        "payment_status": "pending",
+        "status": "pending",
+        "estimated_time": "20-35 minutes",
+        "estimated_delivery_time": "45-60 minutes",
+        "status_times": {"pending": NOW},
+        "created_at": NOW,
+        "updated_at": NOW,
+        **extra,
+    }
+
+
+class TestPacking:
+    """Test the v1 <-> v2 conversion."""
+
+    def test_round_trip(self):
+        """Test that packing drops derivable values and unpacking restores them."""
+        order = v1_order()
+        codes = {"Masala Dosa": 1, "Filter Coffee": 2}
+
+        packed = pack_order(order, codes)
+
+        assert packed[SCHEMA_FIELD] == 2
+        assert packed[CART_FIELD] == [[1, 2, 60.0], [2, 1, 30.0]]
+        for dropped in ("items", "cart_items", "payment_method", "notes", "estimated_delivery_time", "address"):
+            assert dropped not in packed
+        assert unpack_order(packed, {1: "Masala Dosa", 2: "Filter Coffee"}) == order
+        assert len(bson.encode(packed)) < len(bson.encode(order)) * 0.7
+
+    def test_unusual_values_kept(self):
+        """Test that free-text items, odd subtotals and int amounts survive the round trip."""
+        order = v1_order(items="Dosa x2 and a coffee", delivery_charge=0)
+        order["cart_items"][0]["subtotal"] = 100.0
+
+        unpacked = unpack_order(pack_order(order, {"Masala Dosa": 1, "Filter Coffee": 2}), {1: "Masala Dosa", 2: "Filter Coffee"})
+
+        assert unpacked["items"] == "Dosa x2 and a coffee"
+        assert unpacked["cart_items"][0]["subtotal"] == 100.0
+        assert type(unpacked["delivery_charge"]) is int
+
+    async def test_names_interned_once(self, client, test_db):
+        """Test that repeated item names share one code."""
+        first = await encode_order(test_db, v1_order(1))
+        second = await encode_order(test_db, v1_order(2))
+
+        assert [line[0] for line in first[CART_FIELD]] == [line[0] for line in second[CART_FIELD]]
+        assert await test_db[ITEM_NAMES_COLLECTION].count_documents({}) == 2
+
+
+class TestStoredOrders:
+    """Test the API over v2 documents."""
+
+    async def test_new_order_stored_compact(self, client, test_db):
+        """Test that a new order is stored as v2 and reads back as created."""
+        created = (await client.post("/api/orders", json=PAYLOAD)).json()
+
+        stored = await test_db.orders.find_one({"id": created["id"]})
+        fetched = (await client.get(f"/api/orders/{created['id']}")).json()
+
+        assert stored[SCHEMA_FIELD] == 2
+        assert "cart_items" not in stored and "items" not in stored
+        # Timestamps come back at BSON's millisecond precision
+        assert {k: v for k, v in fetched.items() if not k.endswith("_at")} == \
+            {k: v for k, v in created.items() if not k.endswith("_at")}
+        assert fetched["items"] == "3x Masala Dosa, 2x Filter Coffee"
+
+    async def test_mixed_layouts_and_status_change(self, client, admin_token, test_db):
+        """Test that v1 and v2 orders read alike, and a v2 order moves through the kitchen."""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        await test_db.orders.insert_one(v1_order(1))
+        created = (await client.post("/api/orders", json=PAYLOAD)).json()
+
+        listed = (await client.get("/api/orders")).json()
+        await client.put(f"/api/admin/orders/{created['id']}/status", json={"status": "preparing"}, headers=headers)
+        admin_listed = (await client.get("/api/admin/orders", headers=headers)).json()
+
+        assert {order["items"] for order in listed} == {"2x Masala Dosa, 1x Filter Coffee", "3x Masala Dosa, 2x Filter Coffee"}
+        compact = next(order for order in admin_listed if order["id"] == created["id"])
+        assert compact["status"] == "preparing"
+        assert compact["cart_items"][0]["item_name"] == "Masala Dosa"
+        kitchen_entry = next(entry for entry in kitchen_queue.orders() if entry["id"] == created["id"])
+        assert kitchen_entry["cart_items"][0] == {"item_name": "Masala Dosa", "quantity": 3}
+
+
+class TestMigration:
+    """Test converting stored v1 orders."""
+
+    async def test_run_migration(self, client, test_db):
+        """Test that every v1 order is converted in batches and reads back the same."""
+        await test_db.orders.insert_many([v1_order(n) for n in range(5)])
+        before = await test_db.orders.find({}, {"_id": 0}).sort("id", 1).to_list(None)
+
+        totals = await run_migration(test_db, batch_size=2)
+        again = await run_migration(test_db, batch_size=2)
+
+        after = await test_db.orders.find({}, {"_id": 0}).sort("id", 1).to_list(None)
+        assert totals == {"scanned": 5, "converted": 5}
+        assert again == {"scanned": 0, "converted": 0}
+        assert all(doc[SCHEMA_FIELD] == 2 for doc in after)
+        assert await decode_orders(test_db, after) == before
+
+    async def test_item_sales_over_both_layouts(self, client, test_db):
+        """Test that item sales resolve interned names and merge them with spelled-out ones."""
+        await test_db.orders.insert_many([
+            v1_order(1, status="completed"),
+            await encode_order(test_db, v1_order(2, status="completed")),
+        ])
+
+        await refresh_item_sales(test_db)
+        sales = {item["item_name"]: item["quantity"] for item in await item_sales(test_db)}
+
+        assert sales == {"Masala Dosa": 4, "Filter Coffee": 2}
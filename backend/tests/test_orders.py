@@ -272,6 +272,110 @@ class TestOrderRetrieval:
             assert data["customer_name"] == "Customer 1"
 
 
+class TestOrderPagination:
+    """Test keyset pagination of the order list."""
+
+    def test_cursor_round_trip(self):
+        """Test that a cursor decodes to the row it was built from."""
+        from backend.services.pagination import encode_cursor, decode_cursor
+        created_at = datetime(2026, 2, 28, 12, 30, 15, 123000, tzinfo=timezone.utc)
+        assert decode_cursor(encode_cursor(created_at, "order1")) == (created_at, "order1")
+
+    async def test_invalid_cursor(self, client):
+        """Test that a garbage cursor is rejected."""
+        response = await client.get("/api/orders?cursor=not-a-cursor")
+        assert response.status_code == 400
+
+    async def test_pages_cover_all_orders(self, client, test_db):
+        """Test that following X-Next-Cursor visits every order exactly once."""
+        created_at = datetime(2026, 2, 28, 12, 0, tzinfo=timezone.utc)
+        await test_db.orders.insert_many([
+            {
+                "id": f"order{i}",
+                "order_number": f"ORD-20260228-{i:06d}",
+                "customer_name": f"Customer {i}",
+                "phone": "9123456789",
+                "order_type": "pickup",
+                "address": "Counter pickup",
+                "items": "1x Test Item",
+                "status": "pending",
+                # two orders share each timestamp to exercise the id tie-break
+                "created_at": created_at.replace(minute=i // 2),
+                "updated_at": created_at
+            }
+            for i in range(5)
+        ])
+
+        seen = []
+        cursor = None
+        for _ in range(5):
+            url = "/api/orders?limit=2" + (f"&cursor={cursor}" if cursor else "")
+            response = await client.get(url)
+            assert response.status_code == 200
+            seen.extend(order["id"] for order in response.json())
+            cursor = response.headers.get("x-next-cursor")
+            if not cursor:
+                break
+
+        assert seen == ["order4", "order3", "order2", "order1", "order0"]
+
+
+class TestOrderIdempotency:
+    """Test retry and duplicate-submit suppression on order creation."""
+
+    @staticmethod
+    def order_payload(quantity=2):
+        return {
+            "customer_name": "Test Customer",
+            "phone": "9123456789",
+            "order_type": "delivery",
+            "address": "SRM University, Potheri, Chennai",
+            "delivery_area": "SRM",
+            "items": "Test Item x2",
+            "cart_items": [
+                {"item_name": "Test Item", "quantity": quantity, "price": 120, "subtotal": 120 * quantity}
+            ]
+        }
+
+    async def test_retry_with_same_key_replays(self, client, test_db):
+        """Test that a retried request returns the first order without writing again."""
+        headers = {"Idempotency-Key": "checkout-1"}
+        first = await client.post("/api/orders", json=self.order_payload(), headers=headers)
+        second = await client.post("/api/orders", json=self.order_payload(), headers=headers)
+
+        assert first.status_code == 201
+        assert second.status_code == 201
+        assert second.json()["id"] == first.json()["id"]
+        assert second.headers["idempotent-replayed"] == "true"
+        assert await test_db.orders.count_documents({}) == 1
+
+    async def test_key_reused_for_different_order(self, client):
+        """Test that a key cannot be reused for a different cart."""
+        headers = {"Idempotency-Key": "checkout-2"}
+        await client.post("/api/orders", json=self.order_payload(2), headers=headers)
+        response = await client.post("/api/orders", json=self.order_payload(3), headers=headers)
+
+        assert response.status_code == 422
+
+    async def test_duplicate_submit_without_key(self, client, test_db):
+        """Test that an identical submission inside the window is suppressed."""
+        first = await client.post("/api/orders", json=self.order_payload())
+        second = await client.post("/api/orders", json=self.order_payload())
+
+        assert second.json()["order_number"] == first.json()["order_number"]
+        assert await test_db.orders.count_documents({}) == 1
+
+    async def test_failed_attempt_can_be_retried(self, client, test_db):
+        """Test that a rejected order does not poison its key."""
+        headers = {"Idempotency-Key": "checkout-3"}
+        rejected = await client.post("/api/orders", json=self.order_payload(1), headers=headers)
+        assert rejected.status_code == 400  # below the delivery minimum
+
+        accepted = await client.post("/api/orders", json=self.order_payload(2), headers=headers)
+        assert accepted.status_code == 201
+        assert await test_db.orders.count_documents({}) == 1
+
+
 class TestOrderUpdate:
     """Test order updates via API."""
     
@@ -353,3 +457,79 @@ class TestOrderValidation:
         
         # May or may not allow very long names
         assert response.status_code in [200, 201, 400, 422]
+
+
+class TestOrderBatch:
+    """Test bulk order import."""
+    
+    @staticmethod
+    def order_payload(name="Phone Customer"):
+        return {
+            "customer_name": name,
+            "phone": "9123456789",
+            "order_type": "pickup",
+            "address": "Counter pickup",
+            "items": "Test Item x1",
+            "cart_items": [{"item_name": "Test Item", "quantity": 1, "price": 120, "subtotal": 120}]
+        }
+    
+    async def test_batch_requires_admin(self, client):
+        """Test that anonymous clients cannot import orders."""
+        response = await client.post("/api/orders/batch", json={"orders": [self.order_payload()]})
+        assert response.status_code == 401
+    
+    async def test_batch_reports_each_order(self, client, admin_token, test_db):
+        """Test that valid orders are written and invalid ones are reported by position."""
+        invalid_schema = {"customer_name": "X"}
+        below_minimum = dict(self.order_payload(), order_type="delivery", delivery_area="SRM",
+                             address="SRM University, Potheri, Chennai")
+        
+        response = await client.post(
+            "/api/orders/batch",
+            headers={"Authorization": f"Bearer {admin_token}"},
+            json={"orders": [self.order_payload("First"), invalid_schema, below_minimum, self.order_payload("Last")]}
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["created"] == 2
+        assert data["failed"] == 2
+        assert [result["status"] for result in data["results"]] == ["created", "error", "error", "created"]
+        assert any("Minimum order" in error for error in data["results"][2]["errors"])
+        assert data["results"][1]["errors"]
+        
+        stored = await test_db.orders.find({}, {"_id": 0, "customer_name": 1}).to_list(10)
+        assert sorted(doc["customer_name"] for doc in stored) == ["First", "Last"]
+        numbers = [result["order_number"] for result in data["results"] if result["order_number"]]
+        assert len(set(numbers)) == 2
+    
+    async def test_batch_write_error_is_per_order(self, client, admin_token, test_db):
+        """Test that a rejected write fails only its own order."""
+        from datetime import datetime
+        from backend.services.order_numbers import format_order_number
+        
+        await test_db.orders.create_index("order_number", unique=True, sparse=True)
+        taken = format_order_number(datetime.utcnow().strftime("%Y%m%d"), 1)
+        await test_db.orders.insert_one({"id": "legacy", "order_number": taken})
+        
+        response = await client.post(
+            "/api/orders/batch",
+            headers={"Authorization": f"Bearer {admin_token}"},
+            json={"orders": [self.order_payload("First"), self.order_payload("Second")]}
+        )
+        
+        data = response.json()
+        assert [result["status"] for result in data["results"]] == ["error", "created"]
+        assert await test_db.orders.count_documents({}) == 2
+    
+    async def test_batch_size_limit(self, client, admin_token):
+        """Test that oversized batches are refused."""
+        from backend.routes import orders
+        
+        response = await client.post(
+            "/api/orders/batch",
+            headers={"Authorization": f"Bearer {admin_token}"},
+            json={"orders": [self.order_payload()] * (orders.ORDER_BATCH_MAX_SIZE + 1)}
+        )
+        
+        assert response.status_code == 400
@@ -0,0 +1,182 @@
+"""
+Test suite for the payment endpoints and gateway adapter.
+
+Tests:
+- Retry with backoff when the gateway could not be reached
+- No retry on client errors, 5xx or timeouts that may have created an order
+- Order creation and verification through the fake gateway
+"""
+
+import pytest
+import httpx
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.services import payment_gateway
+from backend.services.payment_gateway import (
+    FakePaymentGateway,
+    PaymentGateway,
+    PaymentGatewayError,
+    RazorpayGateway,
+)
+
+
+@pytest.fixture
+def fake_gateway():
+    """Swap the Razorpay gateway for the in-process fake."""
+    previous = payment_gateway.get_gateway()
+    fake = FakePaymentGateway()
+    payment_gateway.set_gateway(fake)
+    yield fake
+    payment_gateway.set_gateway(previous)
+
+
+@pytest.fixture
+def razorpay_payload():
+    """Checkout payload for a delivery order above the minimum."""
+    return {
+        "customer_name": "Test Customer",
+        "phone": "9123456789",
+        "address": "SRM University, Potheri, Chennai",
+        "cart_items": [{"item_name": "Test Item", "quantity": 2, "price": 120}],
+        "order_type": "delivery",
+        "delivery_area": "SRM"
+    }
+
+
+class TestRazorpayGateway:
+    """Test the async Razorpay adapter against a mock transport."""
+
+    def test_incomplete_gateway_cannot_be_constructed(self):
+        """Test that a gateway without create_order fails when built, not at checkout."""
+        class IncompleteGateway(PaymentGateway):
+            pass
+
+        with pytest.raises(TypeError):
+            IncompleteGateway()
+
+    async def test_retries_transient_failures(self):
+        """Test that a connect failure followed by success returns the order."""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            if len(calls) == 1:
+                raise httpx.ConnectError("connection refused")
+            return httpx.Response(200, json={"id": "order_123", "amount": 26000})
+
+        gateway = RazorpayGateway("key", "secret", base_url="https://gateway.test", max_retries=2,
+                                  transport=httpx.MockTransport(handler))
+        try:
+            order = await gateway.create_order(26000, receipt="ORD-1")
+        finally:
+            await gateway.close()
+
+        assert order["id"] == "order_123"
+        assert len(calls) == 2
+
+    async def test_client_error_not_retried(self):
+        """Test that a 400 fails immediately."""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(400, json={"error": {"description": "bad amount"}})
+
+        gateway = RazorpayGateway("key", "secret", base_url="https://gateway.test", max_retries=2,
+                                  transport=httpx.MockTransport(handler))
+        try:
+            with pytest.raises(PaymentGatewayError):
+                await gateway.create_order(0, receipt="ORD-1")
+        finally:
+            await gateway.close()
+
+        assert len(calls) == 1
+
+    @pytest.mark.parametrize("failure", [httpx.Response(503), httpx.ReadTimeout("read timed out")])
+    async def test_sent_request_not_retried(self, failure):
+        """Test that a 5xx or read timeout, after which the order may exist, is not retried."""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            if isinstance(failure, Exception):
+                raise failure
+            return failure
+
+        gateway = RazorpayGateway("key", "secret", base_url="https://gateway.test", max_retries=2,
+                                  transport=httpx.MockTransport(handler))
+        try:
+            with pytest.raises(PaymentGatewayError):
+                await gateway.create_order(26000, receipt="ORD-1")
+        finally:
+            await gateway.close()
+
+        assert len(calls) == 1
+
+    async def test_gives_up_after_retries(self):
+        """Test that persistent transport errors raise after the last attempt."""
+        def handler(request):
+            raise httpx.ConnectError("connection refused")
+
+        gateway = RazorpayGateway("key", "secret", base_url="https://gateway.test", max_retries=1,
+                                  transport=httpx.MockTransport(handler))
+        try:
+            with pytest.raises(PaymentGatewayError):
+                await gateway.create_order(26000, receipt="ORD-1")
+        finally:
+            await gateway.close()
+
+
+class TestPaymentEndpoints:
+    """Test the payment routes with the fake gateway."""
+
+    async def test_create_razorpay_order(self, client, test_db, fake_gateway, razorpay_payload):
+        """Test that a gateway order is created and linked to the stored order."""
+        response = await client.post("/api/payment/create-razorpay-order", json=razorpay_payload)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["razorpay_order_id"] == fake_gateway.orders[0]["id"]
+        assert fake_gateway.orders[0]["amount"] == 26000
+
+        order = await test_db.orders.find_one({"order_number": data["order_number"]})
+        assert order["razorpay_order_id"] == data["razorpay_order_id"]
+
+    async def test_verify_payment(self, client, test_db, fake_gateway, razorpay_payload):
+        """Test that a correctly signed payment marks the order paid."""
+        created = (await client.post("/api/payment/create-razorpay-order", json=razorpay_payload)).json()
+
+        response = await client.post("/api/payment/verify-payment", json={
+            "razorpay_order_id": created["razorpay_order_id"],
+            "razorpay_payment_id": "pay_1",
+            "razorpay_signature": fake_gateway.sign(created["razorpay_order_id"], "pay_1"),
+            "order_number": created["order_number"]
+        })
+
+        assert response.status_code == 200
+        order = await test_db.orders.find_one({"order_number": created["order_number"]})
+        assert order["payment_status"] == "paid"
+
+    async def test_verify_payment_bad_signature(self, client, fake_gateway, razorpay_payload):
+        """Test that a forged signature is rejected."""
+        created = (await client.post("/api/payment/create-razorpay-order", json=razorpay_payload)).json()
+
+        response = await client.post("/api/payment/verify-payment", json={
+            "razorpay_order_id": created["razorpay_order_id"],
+            "razorpay_payment_id": "pay_1",
+            "razorpay_signature": "forged",
+            "order_number": created["order_number"]
+        })
+
+        assert response.status_code == 400
+
+    async def test_retry_does_not_create_second_gateway_order(self, client, test_db, fake_gateway, razorpay_payload):
+        """Test that a retried checkout replays instead of calling the gateway again."""
+        headers = {"Idempotency-Key": "pay-checkout-1"}
+        first = await client.post("/api/payment/create-razorpay-order", json=razorpay_payload, headers=headers)
+        second = await client.post("/api/payment/create-razorpay-order", json=razorpay_payload, headers=headers)
+
+        assert second.json() == first.json()
+        assert len(fake_gateway.orders) == 1
+        assert await test_db.orders.count_documents({}) == 1
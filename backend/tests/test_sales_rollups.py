@@ -0,0 +1,139 @@
+"""
+Test suite for the incrementally maintained sales rollups.
+
+Tests:
+- New orders and status changes move counts between buckets
+- Dashboard revenue comes from order totals
+- Rebuild from history matches the incremental rows
+- Failed flushes keep their deltas
+- Sales report endpoint
+"""
+
+from datetime import datetime
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.services.sales_rollups import (
+    ROLLUP_COLLECTION,
+    SalesRollups,
+    rebuild_rollups,
+    rollup_key,
+    sales_rollups,
+)
+
+PAYLOAD = {
+    "customer_name": "Rollup Customer",
+    "phone": "9123456789",
+    "order_type": "delivery",
+    "address": "SRM University, Potheri, Chennai",
+    "delivery_area": "SRM",
+    "items": "Dosa x4",
+    "cart_items": [{"item_name": "Dosa", "quantity": 4, "price": 60, "subtotal": 240}],
+}
+
+
+async def rollup_rows(db):
+    rows = await db[ROLLUP_COLLECTION].find({"orders": {"$ne": 0}}, {"_id": 0}).to_list(None)
+    return sorted(rows, key=lambda row: (row["day"], row["hour"], row["status"]))
+
+
+class TestRollupKey:
+    """Test bucketing orders."""
+
+    def test_key_uses_creation_hour_and_defaults(self):
+        """Test that missing dimensions fall back to the order defaults."""
+        key = rollup_key({"created_at": datetime(2024, 1, 2, 13, 45), "status": "completed"})
+        assert key == ("2024-01-02", 13, "completed", "cod", "delivery")
+
+    def test_order_without_date_is_skipped(self):
+        """Test that legacy documents without a created_at date are not counted."""
+        assert rollup_key({"status": "pending"}) is None
+
+
+class TestIncrementalRollups:
+    """Test rollups kept up to date by the order write paths."""
+
+    async def test_status_change_moves_order(self, client, admin_token, test_db):
+        """Test that completing an order moves it to the completed bucket with its revenue."""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        created = (await client.post("/api/orders", json=PAYLOAD)).json()
+        await client.post("/api/orders", json={**PAYLOAD, "phone": "9876543210"})
+
+        await client.put(
+            f"/api/admin/orders/{created['id']}/status",
+            json={"status": "completed"},
+            headers=headers
+        )
+        dashboard = (await client.get("/api/admin/dashboard", headers=headers)).json()
+
+        assert dashboard["total_orders"] == 2
+        assert dashboard["pending_orders"] == 1
+        assert dashboard["completed_orders"] == 1
+        assert dashboard["total_revenue"] == created["total"]
+
+    async def test_rebuild_matches_incremental(self, client, admin_token, test_db):
+        """Test that a rebuild from history reproduces the incremental rows."""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        created = (await client.post("/api/orders", json=PAYLOAD)).json()
+        await client.post("/api/orders", json={**PAYLOAD, "order_type": "pickup"})
+        await client.patch(
+            f"/api/orders/{created['id']}/status",
+            json={"status": "cancelled"},
+            headers=headers
+        )
+        await sales_rollups.flush()
+        incremental = await rollup_rows(test_db)
+
+        rows = await rebuild_rollups(test_db)
+
+        assert rows == 2
+        assert await rollup_rows(test_db) == incremental
+
+    async def test_flush_failure_keeps_deltas(self):
+        """Test that deltas survive a failed write and go out with the next flush."""
+        class FailingCollection:
+            async def bulk_write(self, operations, ordered=True):
+                raise ConnectionError("connection reset")
+
+        rollups = SalesRollups()
+        rollups.set_database({ROLLUP_COLLECTION: FailingCollection()})
+        rollups.record(None, {"created_at": datetime(2024, 1, 2, 13), "total": 50})
+
+        assert await rollups.flush() == 0
+        assert rollups.stats()["pending_rows"] == 1
+        assert rollups.stats()["flush_errors"] == 1
+
+
+class TestSalesReport:
+    """Test the sales report read from the rollups."""
+
+    async def test_daily_sales(self, client, admin_token, test_db):
+        """Test per-day figures for a date range."""
+        await test_db.orders.insert_many([
+            {"id": "o1", "status": "completed", "total": 100.0, "payment_status": "paid", "created_at": datetime(2024, 1, 1, 9)},
+            {"id": "o2", "status": "completed", "total": 50.0, "created_at": datetime(2024, 1, 1, 20)},
+            {"id": "o3", "status": "cancelled", "total": 70.0, "created_at": datetime(2024, 1, 2, 12)},
+            {"id": "o4", "status": "completed", "total": 30.0, "created_at": datetime(2024, 1, 3, 12)},
+        ])
+        await rebuild_rollups(test_db)
+
+        response = await client.get(
+            "/api/admin/sales?from=2024-01-01&to=2024-01-02",
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+
+        assert response.status_code == 200
+        assert response.json() == [
+            {"day": "2024-01-01", "orders": 2, "completed_orders": 2, "cancelled_orders": 0,
+             "revenue": 150.0, "paid_orders": 1, "paid_revenue": 100.0},
+            {"day": "2024-01-02", "orders": 1, "completed_orders": 0, "cancelled_orders": 1,
+             "revenue": 0, "paid_orders": 0, "paid_revenue": 0},
+        ]
+
+    async def test_invalid_group_by(self, client, admin_token):
+        """Test that only day and hour grouping are accepted."""
+        response = await client.get(
+            "/api/admin/sales?group_by=week",
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        assert response.status_code == 400
@@ -0,0 +1,128 @@
+"""
+Test suite for the fast response layer.
+
+Tests:
+- orjson output matches FastAPI's default encoding
+- Constructed models and projected lists match validated ones
+- Read endpoints return the same JSON as before
+"""
+
+from datetime import datetime, timedelta, timezone
+import json
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from backend.models import MenuItemResponse, OrderResponse
+from backend.services.serialization import construct, encode_json, project
+
+
+def stored_order(n=1):
+    at = datetime(2024, 1, 1, 12, 30, 15, 123000)
+    return {
+        "_id": f"oid{n}",
+        "id": f"order{n}",
+        "order_number": f"ORD-20240101-{n:06d}",
+        "customer_name": "Priya Raman",
+        "phone": "9123456789",
+        "address": "SRM University, Potheri, Chennai",
+        "items": "4x Masala Dosa",
+        "cart_items": [{"item_name": "Masala Dosa", "quantity": 4, "price": 60.0, "subtotal": 240.0}],
+        "notes": "Less spicy – no onions",
+        "order_type": "delivery",
+        "delivery_area": "SRM",
+        "delivery_charge": 0.0,
+        "subtotal": 240.0,
+        "total": 240.0,
+        "status": "pending",
+        "payment_method": "cod",
+        "payment_status": "pending",
+        "status_times": {"pending": at},
+        "created_at": at,
+        "updated_at": at,
+    }
+
+
+def fastapi_encode(payload) -> bytes:
+    # What JSONResponse renders after FastAPI's serialization
+    return json.dumps(
+        jsonable_encoder(payload), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class TestEncoding:
+    """Test that the fast path produces the same bytes."""
+
+    def test_matches_fastapi_encoding(self):
+        """Test that plain payloads encode byte for byte like FastAPI's."""
+        payload = {
+            "naive": datetime(2024, 1, 1, 12, 0),
+            "price": 180.5,
+            "count": 3,
+            "text": "Café ₹",
+            "missing": None,
+            "nested": [{"a": 1.0}],
+        }
+        assert encode_json(payload) == fastapi_encode(payload)
+
+    def test_aware_datetimes_match_pydantic(self):
+        """Test that aware datetimes encode like FastAPI's response models write them."""
+        class Stamped(BaseModel):
+            at: datetime
+
+        for at in (
+            datetime(2024, 1, 1, 12, 0, 0, 500, tzinfo=timezone.utc),
+            datetime(2024, 1, 1, 12, 0, tzinfo=timezone(timedelta(0))),
+            datetime(2024, 1, 1, 12, 0, tzinfo=timezone(timedelta(hours=5, minutes=30))),
+        ):
+            validated = Stamped(at=at)
+            assert encode_json(construct(Stamped, {"at": at})) == fastapi_encode(validated)
+        assert encode_json(Stamped(at=datetime(2024, 1, 1, tzinfo=timezone.utc))).endswith(b'Z"}')
+
+    def test_constructed_model_matches_validated(self):
+        """Test that a constructed response encodes like a validated one."""
+        doc = stored_order()
+        validated = OrderResponse(**{k: v for k, v in doc.items() if k != "_id"})
+
+        assert encode_json(construct(OrderResponse, doc)) == fastapi_encode(validated)
+
+    def test_construct_fills_defaults_and_drops_unknown_keys(self):
+        """Test that defaults are filled in and storage-only fields left out."""
+        item = construct(MenuItemResponse, {
+            "_id": "x", "id": "m1", "category": "Dosa", "name": "Plain Dosa", "price": 50.0,
+            "available": True, "created_at": datetime(2024, 1, 1)
+        })
+
+        assert dict(item) == {
+            "id": "m1", "category": "Dosa", "name": "Plain Dosa", "price": 50.0,
+            "description": None, "image": None, "available": True,
+        }
+
+    def test_project_matches_construct(self):
+        """Test that list projection gives the same JSON as constructed models."""
+        docs = [stored_order(1), {**stored_order(2), "notes": None, "cart_items": []}]
+
+        assert encode_json(project(OrderResponse, docs)) == encode_json([construct(OrderResponse, d) for d in docs])
+
+
+class TestEndpoints:
+    """Test read endpoints on the fast path."""
+
+    async def test_order_list_and_detail(self, client, test_db):
+        """Test that order reads return the stored documents in the response shape."""
+        await test_db.orders.insert_many([stored_order(1), stored_order(2)])
+        expected = json.loads(fastapi_encode(OrderResponse(**{k: v for k, v in stored_order(1).items() if k != "_id"})))
+
+        listed = await client.get("/api/orders")
+        detail = await client.get("/api/orders/order1")
+
+        assert listed.status_code == 200
+        assert expected in listed.json()
+        assert detail.json() == expected
+        assert "status_times" not in detail.json()
+
+    async def test_inbound_payloads_still_validated(self, client):
+        """Test that request bodies are validated as before."""
+        response = await client.post("/api/orders", json={"customer_name": "A", "phone": "1"})
+        assert response.status_code == 422
@@ -0,0 +1,69 @@
+"""
+Test suite for pre-serialized response snapshots.
+
+Tests:
+- Snapshot reuse until the collection version changes
+- gzip variant selection
+- Accept-Encoding parsing
+"""
+
+import gzip
+import json
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.services.content_versions import content_versions
+from backend.services.snapshots import Snapshot, SnapshotStore, accepts_gzip, encode_json
+
+
+class TestSnapshotStore:
+    """Test the snapshot store directly."""
+
+    def test_snapshot_reused_until_version_changes(self):
+        """Test that a bump of the collection version retires the snapshot."""
+        store = SnapshotStore(max_entries=4, enabled=True)
+        version = content_versions.current("snapshot-test")
+        store.put("snapshot-test", ("k",), Snapshot(version, '"e"', b"[]"))
+        assert store.get("snapshot-test", ("k",), version) is not None
+
+        new_version = content_versions.bump("snapshot-test")
+        assert store.get("snapshot-test", ("k",), new_version) is None
+
+    def test_stale_build_not_stored(self):
+        """Test that a snapshot built from an old version is discarded."""
+        store = SnapshotStore(max_entries=4, enabled=True)
+        version = content_versions.current("snapshot-test")
+        content_versions.bump("snapshot-test")
+        store.put("snapshot-test", ("k",), Snapshot(version, '"e"', b"[]"))
+        assert store.stats()["entries"] == 0
+
+    def test_gzip_variant(self):
+        """Test that large bodies carry a gzip copy served on request."""
+        body = encode_json([{"name": "Chicken Biryani", "price": 180.0}] * 200)
+        snapshot = Snapshot(1, '"e"', body, gzip_min_bytes=100)
+        assert snapshot.gzip_body is not None
+
+        response = snapshot.to_response("gzip, deflate")
+        assert response.headers["content-encoding"] == "gzip"
+        assert json.loads(gzip.decompress(response.body)) == json.loads(body)
+
+        plain = snapshot.to_response(None)
+        assert "content-encoding" not in plain.headers
+        assert plain.body == body
+
+    def test_small_bodies_not_compressed(self):
+        """Test that tiny bodies skip gzip."""
+        snapshot = Snapshot(1, '"e"', b"[]", gzip_min_bytes=100)
+        assert snapshot.gzip_body is None
+
+    def test_accepts_gzip(self):
+        """Test Accept-Encoding parsing."""
+        assert accepts_gzip("gzip")
+        assert accepts_gzip("br, gzip;q=0.8")
+        assert not accepts_gzip("gzip;q=0")
+        assert not accepts_gzip("gzip; q=0.000")
+        assert accepts_gzip("*;q=0, gzip")
+        assert not accepts_gzip("gzip;q=0, *")
+        assert accepts_gzip("br, *;q=0.5")
+        assert not accepts_gzip("br")
+        assert not accepts_gzip(None)
@@ -0,0 +1,97 @@
+"""
+Test suite for specials and menu mutations.
+
+Tests:
+- Discount recalculated from the stored prices on update
+- Atomic toggle of is_active
+- Menu item update returns the updated document
+- 404 on missing documents
+"""
+
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+
+def special_payload(**overrides):
+    payload = {
+        "name": "Paneer Tikka",
+        "description": "Chef's special tikka",
+        "original_price": 200,
+        "special_price": 150
+    }
+    payload.update(overrides)
+    return payload
+
+
+class TestSpecialUpdates:
+    """Test single-operation special updates."""
+
+    async def test_update_recalculates_discount(self, client, test_db):
+        """Test that changing one price recomputes the discount from both."""
+        created = (await client.post("/api/specials", json=special_payload())).json()
+        assert created["discount_percent"] == 25
+
+        response = await client.put(f"/api/specials/{created['id']}", json={"special_price": 133})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["special_price"] == 133
+        assert data["discount_percent"] == 33
+        stored = await test_db.specials.find_one({"id": created["id"]})
+        assert stored["discount_percent"] == 33
+
+    async def test_update_keeps_literal_values(self, client):
+        """Test that field values are stored as given, never read as expressions."""
+        created = (await client.post("/api/specials", json=special_payload())).json()
+
+        response = await client.put(f"/api/specials/{created['id']}", json={"badge": "$special_price"})
+
+        assert response.json()["badge"] == "$special_price"
+
+    async def test_update_missing_special(self, client):
+        """Test that updating a missing special is a 404."""
+        response = await client.put("/api/specials/missing", json={"name": "Nothing"})
+        assert response.status_code == 404
+
+    async def test_toggle_flips_is_active(self, client, test_db):
+        """Test that toggling twice returns to the original state."""
+        created = (await client.post("/api/specials", json=special_payload())).json()
+
+        first = await client.patch(f"/api/specials/{created['id']}/toggle")
+        second = await client.patch(f"/api/specials/{created['id']}/toggle")
+
+        assert first.json()["is_active"] is False
+        assert second.json()["is_active"] is True
+        assert (await test_db.specials.find_one({"id": created["id"]}))["is_active"] is True
+
+    async def test_toggle_missing_special(self, client):
+        """Test that toggling a missing special is a 404."""
+        response = await client.patch("/api/specials/missing/toggle")
+        assert response.status_code == 404
+
+
+class TestMenuItemUpdates:
+    """Test single-operation menu item writes."""
+
+    async def test_create_and_update(self, client):
+        """Test that create and update return the stored item."""
+        created = await client.post("/api/menu", json={
+            "category": "Starters",
+            "name": "Spring Rolls",
+            "price": 90
+        })
+        assert created.status_code == 201
+        item_id = created.json()["id"]
+
+        response = await client.patch(f"/api/menu/{item_id}", json={"price": 110, "available": False})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["price"] == 110
+        assert data["available"] is False
+        assert data["name"] == "Spring Rolls"
+
+    async def test_update_missing_item(self, client):
+        """Test that updating a missing item is a 404."""
+        response = await client.patch("/api/menu/missing", json={"price": 110})
+        assert response.status_code == 404
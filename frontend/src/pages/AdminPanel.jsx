@@ -56,6 +56,99 @@ const AdminPanel = () => {
     }
   }, []);
 
+  // Live order feed: apply pushed changes instead of refetching the list
+  useEffect(() => {
+    if (!isAuthenticated) return undefined;
+
+    let source = null;
+    let reconnectTimer = null;
+    let stopped = false;
+
+    // On every (re)connect, fetch only what changed meanwhile
+    let syncToken = null;
+    const catchUp = async () => {
+      try {
+        let hasMore = true;
+        while (hasMore) {
+          const response = await axios.get(`${API}/api/admin/orders/changes`, {
+            headers: getAuthHeaders(),
+            params: syncToken ? { since: syncToken } : {}
+          });
+          const changed = response.data.orders;
+          if (changed.length) {
+            setOrders((current) => {
+              const byId = new Map(changed.map((order) => [order.id, order]));
+              const merged = current.map((existing) =>
+                byId.has(existing.id) ? { ...existing, ...byId.get(existing.id) } : existing
+              );
+              const known = new Set(current.map((existing) => existing.id));
+              const added = changed.filter((order) => !known.has(order.id));
+              return [...added.reverse(), ...merged];
+            });
+          }
+          syncToken = response.data.token;
+          hasMore = syncToken !== null && response.data.has_more;
+        }
+      } catch (error) {
+        fetchOrders();
+      }
+    };
+
+    const reconnect = () => {
+      if (!stopped) reconnectTimer = setTimeout(connect, 3000);
+    };
+
+    // Stream tickets are single-use, so EventSource's own reconnect (same URL)
+    // would be refused; every connect exchanges the JWT for a fresh ticket
+    const connect = async () => {
+      let ticket;
+      try {
+        const response = await axios.post(
+          `${API}/api/admin/orders/stream-ticket`, null, { headers: getAuthHeaders() }
+        );
+        ticket = response.data.ticket;
+      } catch (error) {
+        if (error.response?.status !== 401) reconnect();
+        return;
+      }
+      if (stopped) return;
+
+      source = new EventSource(
+        `${API}/api/admin/orders/stream?ticket=${encodeURIComponent(ticket)}`
+      );
+
+      source.addEventListener('order_created', (event) => {
+        const order = JSON.parse(event.data);
+        setOrders((current) =>
+          current.some((existing) => existing.id === order.id) ? current : [order, ...current]
+        );
+      });
+
+      source.addEventListener('order_status_changed', (event) => {
+        const order = JSON.parse(event.data);
+        setOrders((current) =>
+          current.map((existing) => (existing.id === order.id ? { ...existing, ...order } : existing))
+        );
+      });
+
+      // Sent when this client fell too far behind and events were dropped
+      source.addEventListener('resync', () => fetchOrders());
+
+      source.addEventListener('open', catchUp);
+      source.addEventListener('error', () => {
+        source.close();
+        reconnect();
+      });
+    };
+    connect();
+
+    return () => {
+      stopped = true;
+      clearTimeout(reconnectTimer);
+      if (source) source.close();
+    };
+  }, [isAuthenticated]);
+
   const verifyToken = async (token) => {
     try {
       const response = await axios.get(`${API}/api/auth/verify`, {
@@ -187,7 +280,9 @@ const AdminPanel = () => {
         { headers: getAuthHeaders() }
       );
       toast.success('Order status updated');
-      fetchOrders();
+      setOrders((current) =>
+        current.map((order) => (order.id === orderId ? { ...order, status: newStatus } : order))
+      );
       setSelectedOrder(null);
     } catch (error) {
       toast.error('Failed to update status');
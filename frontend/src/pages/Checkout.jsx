@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useRef, useState } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { useCart } from '../contexts/CartContext';
 import { useLocation } from '../contexts/LocationContext';
@@ -19,6 +19,12 @@ import axios from 'axios';
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
 
+// The kitchen is at capacity: say when to retry and offer the suggested pickup slot
+const busyMessage = (detail) => {
+  const slot = new Date(`${detail.pickup_slot}Z`).toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' });
+  return `${detail.message} You can also plan a pickup around ${slot}.`;
+};
+
 const Checkout = () => {
   const navigate = useNavigate();
   const { items, clearCart, getCartTotal } = useCart();
@@ -36,11 +42,34 @@ const Checkout = () => {
   const [isSubmitting, setIsSubmitting] = useState(false);
   const [paymentMethod, setPaymentMethod] = useState('cod');
   const [couponCode, setCouponCode] = useState('');
+  const idempotencyRef = useRef({ payload: null, key: null });
+
+  // Same payload => same key, so a retried submit replays the first order
+  const getIdempotencyKey = (payload) => {
+    const serialized = JSON.stringify(payload);
+    if (idempotencyRef.current.payload !== serialized) {
+      const key = window.crypto?.randomUUID
+        ? window.crypto.randomUUID()
+        : `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+      idempotencyRef.current = { payload: serialized, key };
+    }
+    return idempotencyRef.current.key;
+  };
 
   const subtotal = calculateSubtotal(items);
   const deliveryCharge = getDeliveryCharge(selectedArea, deliveryType);
   const total = calculateTotal(subtotal, deliveryCharge);
-  const estimatedTime = getEstimatedDeliveryTime();
+  const [estimatedTime, setEstimatedTime] = useState(getEstimatedDeliveryTime());
+
+  // Live estimate from the kitchen queue; keep the static one if it fails
+  React.useEffect(() => {
+    if (!deliveryType) return;
+    axios.get(`${API}/orders/eta`, {
+      params: { order_type: deliveryType, delivery_area: selectedArea }
+    })
+      .then((response) => setEstimatedTime(response.data.estimated_delivery_time))
+      .catch(() => {});
+  }, [deliveryType, selectedArea]);
 
   // Redirect if cart is empty
   React.useEffect(() => {
@@ -107,7 +136,9 @@ const Checkout = () => {
           delivery_area: selectedArea
         };
 
-        const response = await axios.post(`${API}/orders`, orderData);
+        const response = await axios.post(`${API}/orders`, orderData, {
+          headers: { 'Idempotency-Key': getIdempotencyKey(orderData) }
+        });
         clearCart();
         toast.success('Order placed successfully!');
         navigate(`/order-success/${response.data.order_number}`);
@@ -120,6 +151,8 @@ const Checkout = () => {
     } catch (error) {
       if (error.response?.data?.detail?.errors) {
         toast.error(error.response.data.detail.errors.join(', '));
+      } else if (error.response?.data?.detail?.retry_after_minutes) {
+        toast.error(busyMessage(error.response.data.detail));
       } else {
         toast.error(error.response?.data?.detail || 'Failed to place order');
       }
@@ -145,7 +178,9 @@ const Checkout = () => {
         delivery_area: selectedArea
       };
 
-      const response = await axios.post(`${API}/payment/create-razorpay-order`, orderPayload);
+      const response = await axios.post(`${API}/payment/create-razorpay-order`, orderPayload, {
+        headers: { 'Idempotency-Key': getIdempotencyKey(orderPayload) }
+      });
 
       const options = {
         key: response.data.key_id,
@@ -194,7 +229,11 @@ const Checkout = () => {
 
     } catch (error) {
       setIsSubmitting(false);
-      toast.error(error.response?.data?.detail || 'Failed to initiate payment');
+      if (error.response?.data?.detail?.retry_after_minutes) {
+        toast.error(busyMessage(error.response.data.detail));
+      } else {
+        toast.error(error.response?.data?.detail || 'Failed to initiate payment');
+      }
     }
   };
 
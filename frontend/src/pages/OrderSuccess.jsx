@@ -18,14 +18,21 @@ const OrderSuccess = () => {
 
   useEffect(() => {
     const fetchOrderDetails = async () => {
-      try {
-        const response = await axios.get(`${API}/orders/number/${orderNumber}`);
-        setOrderDetails(response.data);
-      } catch (error) {
-        toast.error('Could not fetch order details');
-      } finally {
-        setLoading(false);
+      // A just-placed order may take a moment to reach every server; retry 404s briefly
+      for (let attempt = 1; ; attempt += 1) {
+        try {
+          const response = await axios.get(`${API}/orders/number/${orderNumber}`);
+          setOrderDetails(response.data);
+          break;
+        } catch (error) {
+          if (error.response?.status !== 404 || attempt === 4) {
+            toast.error('Could not fetch order details');
+            break;
+          }
+          await new Promise((resolve) => setTimeout(resolve, 1000));
+        }
       }
+      setLoading(false);
     };
 
     if (orderNumber) {